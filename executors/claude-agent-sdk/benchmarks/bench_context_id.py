@@ -0,0 +1,63 @@
+"""Micro-benchmark: contextId injection on large JSON-RPC responses.
+
+Compares the byte-level splice used by the scheduler proxy against a full
+json.loads/json.dumps round trip, for responses carrying large tool output.
+
+    uv run python benchmarks/bench_context_id.py
+"""
+
+import json
+import timeit
+import uuid
+
+from claude_agent_scheduler.envelope import inject_response_context_id, parse_request
+
+CONTEXT_ID = str(uuid.uuid4())
+SIZES_MB = (0.1, 1, 8)
+
+
+def _reserialize(body: bytes, context_id: str) -> bytes:
+    data = json.loads(body)
+    data["result"]["message"]["contextId"] = context_id
+    return json.dumps(data).encode()
+
+
+def _response(size_mb: float, context_id: str | None) -> bytes:
+    line = 'src/module.py:42: def handler(event: dict) -> None:  # "quoted" {braces}\n'
+    output = line * int(size_mb * 1024 * 1024 / len(line))
+    message = {} if context_id is None else {"contextId": context_id}
+    message.update({
+        "role": "agent", "messageId": str(uuid.uuid4()),
+        "parts": [{"kind": "text", "text": output}, {"kind": "data", "data": {"files": list(range(2000))}}],
+    })
+    return json.dumps({"jsonrpc": "2.0", "id": "1", "result": {"message": message}}).encode()
+
+
+def _time(fn, body: bytes) -> float:  # type: ignore[no-untyped-def]
+    runs = 5
+    return min(timeit.repeat(lambda: fn(body, CONTEXT_ID), number=1, repeat=runs)) * 1000
+
+
+def main() -> None:
+    print(f"{'response':>10} {'contextId':>10} {'reserialize ms':>15} {'splice ms':>10} {'speedup':>8}")
+    for size in SIZES_MB:
+        for label, context_id in (("missing", None), ("stale", "stale"), ("current", CONTEXT_ID)):
+            body = _response(size, context_id)
+            spliced = inject_response_context_id(body, CONTEXT_ID)
+            assert json.loads(spliced) == json.loads(_reserialize(body, CONTEXT_ID))
+            full = _time(_reserialize, body)
+            splice = _time(inject_response_context_id, body)
+            print(
+                f"{len(body) / 1024 / 1024:>8.1f}MB {label:>10} {full:>15.2f} {splice:>10.3f} {full / splice:>7.0f}x"
+            )
+
+    request = json.dumps({
+        "jsonrpc": "2.0", "id": "1", "method": "message/send",
+        "params": {"message": {"role": "user", "parts": [{"kind": "text", "text": "x" * 64 * 1024}]}},
+    }).encode()
+    per_request = min(timeit.repeat(lambda: parse_request(request), number=100, repeat=5)) * 10
+    print(f"parse_request with contextId generation (64KB body): {per_request:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Load benchmark: scheduler routing overhead against in-memory Kubernetes and sandbox stand-ins.
+
+Runs the real create_proxy_app and SandboxManager (watch indexes, admission,
+turn queue, activity writer) against FakeK8s, an in-memory stand-in for the
+SandboxClaim and Sandbox APIs with configurable latencies and watch events, and
+an in-process sandbox transport that answers after a fixed agent latency. Many
+conversations run concurrently, each a new-conversation message followed by
+resumed turns. Reported per request: routing overhead (end-to-end latency minus
+the simulated agent time), Kubernetes API calls, RSS growth and event-loop lag.
+
+The load generator and the stand-ins share the scheduler's event loop, so the
+numbers are an upper bound on scheduler overhead. Once the offered load
+saturates the loop (lag in the hundreds of milliseconds), overhead measures
+queueing rather than routing; lengthen --ramp to stay below that point.
+
+    uv run python benchmarks/bench_scheduler_load.py --conversations 2000 --turns 3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from functools import partial
+from unittest.mock import patch
+
+import httpx
+from kubernetes_asyncio.client import ApiException
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.proxy import create_proxy_app, warm_connection
+from claude_agent_scheduler.sandbox_manager import CLAIM_PLURAL, SANDBOX_PLURAL, SandboxManager
+
+NAMESPACE = "bench"
+LAG_INTERVAL = 0.01  # seconds between event-loop lag samples
+
+
+def _selected(obj: dict, label_selector: str) -> bool:  # type: ignore[type-arg]
+    labels = obj["metadata"].get("labels") or {}
+    for term in filter(None, label_selector.split(",")):
+        key, _, value = term.partition("=")
+        if labels.get(key) != value:
+            return False
+    return True
+
+
+class FakeK8s:
+    """In-memory SandboxClaim and Sandbox API with the interface of _AsyncK8sHelper.
+
+    Every call sleeps api_latency and is counted by (verb, plural). A created
+    claim is bound to a new Sandbox after bind_latency, which turns Ready after
+    ready_latency. Objects are replaced, never mutated, so watch events can
+    share them with the scheduler's indexes.
+    """
+
+    def __init__(self, api_latency: float, bind_latency: float, ready_latency: float) -> None:
+        self.calls: Counter[tuple[str, str]] = Counter()
+        self._api_latency = api_latency
+        self._bind_latency = bind_latency
+        self._ready_latency = ready_latency
+        self._objects: dict[str, dict[str, dict]] = {CLAIM_PLURAL: {}, SANDBOX_PLURAL: {}}  # type: ignore[type-arg]
+        self._watchers: dict[str, list[asyncio.Queue]] = {CLAIM_PLURAL: [], SANDBOX_PLURAL: []}  # type: ignore[type-arg]
+        self._resource_version = 0
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def _call(self, verb: str, plural: str) -> None:
+        self.calls[(verb, plural)] += 1
+        if self._api_latency:
+            await asyncio.sleep(self._api_latency)
+
+    def _store(self, plural: str, obj: dict, event_type: str = "MODIFIED") -> dict:  # type: ignore[type-arg]
+        self._resource_version += 1
+        obj = {**obj, "metadata": {**obj["metadata"], "resourceVersion": str(self._resource_version)}}
+        name = obj["metadata"]["name"]
+        if event_type == "DELETED":
+            self._objects[plural].pop(name, None)
+        else:
+            self._objects[plural][name] = obj
+        for queue in self._watchers[plural]:
+            queue.put_nowait({"type": event_type, "object": obj})
+        return obj
+
+    async def _provision(self, claim_name: str) -> None:
+        await asyncio.sleep(self._bind_latency)
+        claim = self._objects[CLAIM_PLURAL].get(claim_name)
+        if claim is None:
+            return
+        sandbox = {"metadata": {"name": claim_name}, "status": {"conditions": []}}
+        self._store(SANDBOX_PLURAL, sandbox, "ADDED")
+        self._store(CLAIM_PLURAL, {**claim, "status": {"sandbox": {"name": claim_name}}})
+        await asyncio.sleep(self._ready_latency)
+        if claim_name in self._objects[SANDBOX_PLURAL]:
+            octet = self._resource_version % 250 + 1
+            self._store(SANDBOX_PLURAL, {**sandbox, "status": {
+                "conditions": [{"type": "Ready", "status": "True"}], "podIPs": [f"10.0.0.{octet}"],
+            }})
+
+    async def create_sandbox_claim(
+        self, name: str, template: str, namespace: str, labels: dict[str, str] | None = None,
+    ) -> dict:  # type: ignore[type-arg]
+        await self._call("create", CLAIM_PLURAL)
+        if name in self._objects[CLAIM_PLURAL]:
+            raise ApiException(status=409)
+        claim = self._store(CLAIM_PLURAL, {
+            "metadata": {
+                "name": name, "labels": dict(labels or {}), "annotations": {},
+                "creationTimestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            },
+            "spec": {"sandboxTemplateRef": {"name": template}},
+            "status": {},
+        }, "ADDED")
+        task = asyncio.create_task(self._provision(name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return claim
+
+    async def get_sandbox_claim(self, name: str, namespace: str) -> dict | None:  # type: ignore[type-arg]
+        await self._call("get", CLAIM_PLURAL)
+        return self._objects[CLAIM_PLURAL].get(name)
+
+    def _patch_metadata(
+        self, name: str, resource_version: str, key: str, values: dict,  # type: ignore[type-arg]
+    ) -> dict:  # type: ignore[type-arg]
+        claim = self._objects[CLAIM_PLURAL].get(name)
+        if claim is None:
+            raise ApiException(status=404)
+        if resource_version and resource_version != claim["metadata"]["resourceVersion"]:
+            raise ApiException(status=409)
+        merged = {**claim["metadata"].get(key, {}), **values}
+        merged = {k: v for k, v in merged.items() if v is not None}
+        return self._store(CLAIM_PLURAL, {**claim, "metadata": {**claim["metadata"], key: merged}})
+
+    async def patch_claim_annotation(
+        self, name: str, namespace: str, annotations: dict[str, str | None], resource_version: str = "",
+    ) -> dict:  # type: ignore[type-arg]
+        await self._call("patch", CLAIM_PLURAL)
+        return self._patch_metadata(name, resource_version, "annotations", annotations)
+
+    async def bind_sandbox_claim(
+        self, name: str, namespace: str, resource_version: str, labels: dict[str, str | None],
+    ) -> dict:  # type: ignore[type-arg]
+        await self._call("patch", CLAIM_PLURAL)
+        return self._patch_metadata(name, resource_version, "labels", labels)
+
+    async def list_sandbox_claims(self, namespace: str, label_selector: str) -> list:  # type: ignore[type-arg]
+        await self._call("list", CLAIM_PLURAL)
+        return [c for c in self._objects[CLAIM_PLURAL].values() if _selected(c, label_selector)]
+
+    async def list_custom_objects(
+        self, group: str, version: str, plural: str, namespace: str, label_selector: str = "",
+    ) -> dict:  # type: ignore[type-arg]
+        await self._call("list", plural)
+        items = [o for o in self._objects[plural].values() if _selected(o, label_selector)]
+        return {"items": items, "metadata": {"resourceVersion": str(self._resource_version)}}
+
+    async def watch_custom_objects(
+        self, group: str, version: str, plural: str, namespace: str,
+        resource_version: str, timeout: int, label_selector: str = "",
+    ) -> AsyncIterator[dict]:  # type: ignore[type-arg]
+        self.calls[("watch", plural)] += 1
+        queue: asyncio.Queue[dict] = asyncio.Queue()  # type: ignore[type-arg]
+        self._watchers[plural].append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if _selected(event["object"], label_selector):
+                    yield event
+        finally:
+            self._watchers[plural].remove(queue)
+
+    async def resolve_sandbox_name(self, claim_name: str, namespace: str, timeout: int) -> str:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            claim = await self.get_sandbox_claim(claim_name, namespace)
+            name = ((claim or {}).get("status") or {}).get("sandbox", {}).get("name", "")
+            if name:
+                return str(name)
+            await asyncio.sleep(0.05)
+        raise TimeoutError(f"Claim '{claim_name}' not bound within {timeout}s")
+
+    async def wait_for_sandbox_ready(self, name: str, namespace: str, timeout: int) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            sandbox = await self.get_sandbox(name, namespace)
+            if SandboxManager._is_sandbox_ready(sandbox or {}):
+                return
+            await asyncio.sleep(0.05)
+        raise TimeoutError(f"Sandbox '{name}' not ready within {timeout}s")
+
+    async def get_sandbox(self, name: str, namespace: str) -> dict | None:  # type: ignore[type-arg]
+        await self._call("get", SANDBOX_PLURAL)
+        return self._objects[SANDBOX_PLURAL].get(name)
+
+    async def get_query(self, name: str, namespace: str) -> dict | None:  # type: ignore[type-arg]
+        await self._call("get", "queries")
+        return None
+
+    async def delete_sandbox_claim(self, name: str, namespace: str) -> None:
+        await self._call("delete", CLAIM_PLURAL)
+        for plural in (CLAIM_PLURAL, SANDBOX_PLURAL):
+            obj = self._objects[plural].get(name)
+            if obj is not None:
+                self._store(plural, obj, "DELETED")
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+
+
+def _sandbox_transport(agent_latency: float, requests: Counter[str]) -> httpx.MockTransport:
+    """Stand-in for sandbox executors: /health answers at once, A2A messages after agent_latency."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests[request.url.path] += 1
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "ok"})
+        await asyncio.sleep(agent_latency)
+        body = json.loads(request.content)
+        reply = {
+            "kind": "message", "messageId": f"r-{body['id']}", "role": "agent",
+            "contextId": body["params"]["message"]["contextId"], "parts": [{"kind": "text", "text": "ok"}],
+        }
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": reply})
+
+    return httpx.MockTransport(handler)
+
+
+def _message(request_id: int, context_id: str | None) -> dict:  # type: ignore[type-arg]
+    message: dict = {  # type: ignore[type-arg]
+        "role": "user", "messageId": f"m-{request_id}", "parts": [{"kind": "text", "text": "hello"}],
+    }
+    if context_id:
+        message["contextId"] = context_id
+    return {"jsonrpc": "2.0", "id": request_id, "method": "message/send", "params": {"message": message}}
+
+
+async def _sample_lag(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.monotonic()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(time.monotonic() - start - LAG_INTERVAL)
+
+
+def _percentiles(samples: list[float]) -> str:
+    if not samples:
+        return "n/a"
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    return f"p50 {p50:8.2f} ms  p99 {p99:8.2f} ms  max {ordered[-1] * 1000:8.2f} ms  (n={len(ordered)})"
+
+
+async def run(args: argparse.Namespace) -> None:
+    k8s = FakeK8s(args.api_latency, args.bind_latency, args.ready_latency)
+    config = SchedulerConfig(namespace=NAMESPACE, pod_ip_routing=args.pod_ip_routing, sandbox_ready_timeout=60)
+    sandbox_requests: Counter[str] = Counter()
+    upstream = httpx.AsyncClient(
+        transport=_sandbox_transport(args.agent_latency, sandbox_requests), timeout=httpx.Timeout(600.0),
+    )
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper", return_value=k8s):
+        manager = SandboxManager(config=config, connection_warmer=partial(warm_connection, upstream))
+    await manager.start()
+    app = create_proxy_app(sandbox_manager=manager, http_client=upstream)
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://scheduler", timeout=httpx.Timeout(600.0),
+    )
+
+    overhead: dict[str, list[float]] = {"new": [], "resumed": []}
+    failures: Counter[int] = Counter()
+    request_ids = iter(range(1, 1 << 62))
+
+    async def conversation() -> None:
+        await asyncio.sleep(random.uniform(0, args.ramp))
+        context_id = None
+        for turn in range(args.turns):
+            kind = "resumed" if context_id else "new"
+            start = time.monotonic()
+            response = await client.post("/", json=_message(next(request_ids), context_id))
+            elapsed = time.monotonic() - start
+            if response.status_code != 200:
+                failures[response.status_code] += 1
+                return
+            simulated = args.agent_latency + (args.bind_latency + args.ready_latency if kind == "new" else 0.0)
+            overhead[kind].append(max(elapsed - simulated, 0.0))
+            context_id = response.json()["result"]["contextId"]
+            if turn + 1 < args.turns:
+                await asyncio.sleep(random.uniform(0, args.think_time))
+
+    startup_calls = Counter(k8s.calls)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    lags: list[float] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_lag(lags, stop))
+    start = time.monotonic()
+    await asyncio.gather(*(conversation() for _ in range(args.conversations)))
+    duration = time.monotonic() - start
+    stop.set()
+    await sampler
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    requests = len(overhead["new"]) + len(overhead["resumed"])
+    calls = {key: count for key, count in (k8s.calls - startup_calls).items() if key[0] != "watch"}
+    api_calls = sum(calls.values())
+    print(
+        f"{args.conversations} conversations x {args.turns} turns in {duration:.1f}s "
+        f"({requests / duration:.0f} req/s)"
+    )
+    print(f"routing overhead, new:     {_percentiles(overhead['new'])}")
+    print(f"routing overhead, resumed: {_percentiles(overhead['resumed'])}")
+    print(f"event-loop lag:            {_percentiles(lags)}")
+    print(f"k8s API calls per request: {api_calls / max(requests, 1):.3f}  ({api_calls} total)")
+    for (verb, plural), count in sorted(calls.items()):
+        print(f"    {verb:>7} {plural:<14} {count}")
+    print(f"sandbox requests: {dict(sandbox_requests)}")
+    print(f"peak RSS growth: {(rss_after - rss_before) / 1024:.1f} MB (peak {rss_after / 1024:.1f} MB)")
+    if failures:
+        print(f"failed requests by status: {dict(failures)}")
+
+    await client.aclose()
+    await upstream.aclose()
+    await manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=3, help="messages per conversation, the first one new")
+    parser.add_argument("--ramp", type=float, default=20.0, help="seconds over which conversations start")
+    parser.add_argument("--think-time", type=float, default=1.0, help="max seconds between turns")
+    parser.add_argument("--api-latency", type=float, default=0.005, help="seconds per Kubernetes API call")
+    parser.add_argument("--bind-latency", type=float, default=0.2, help="seconds until a claim is bound to a sandbox")
+    parser.add_argument("--ready-latency", type=float, default=1.0, help="seconds until a bound sandbox is ready")
+    parser.add_argument("--agent-latency", type=float, default=0.05, help="seconds the sandbox takes per message")
+    parser.add_argument("--pod-ip-routing", action="store_true", help="route to pod IPs from Sandbox status")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
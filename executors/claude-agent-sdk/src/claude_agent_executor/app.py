@@ -1,14 +1,50 @@
+from typing import cast
+
 from ark_sdk.executor_app import ExecutorApp
-from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
 from .executor import ClaudeAgentExecutor
 
+
+class ClaudeAgentExecutorApp(ExecutorApp):
+    """ExecutorApp that also serves the executor's Prometheus metrics on /metrics.
+
+    It closes the executor when the server shuts down, so connected clients and
+    background tasks are stopped.
+    """
+
+    def build(self) -> ASGIApp:
+        app = super().build()
+        agent_executor = cast(ClaudeAgentExecutor, self.executor)
+
+        async def serve(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope["type"] == "lifespan":
+                async def receive_lifespan() -> Message:
+                    message = await receive()
+                    if message["type"] == "lifespan.shutdown":
+                        await agent_executor.close()
+                    return message
+
+                await app(scope, receive_lifespan, send)
+                return
+            if scope["type"] == "http" and scope["path"] == "/metrics":
+                content, content_type = metrics.render()
+                await Response(content=content, media_type=content_type)(scope, receive, send)
+                return
+            await app(scope, receive, send)
+
+        return serve
+
+
 executor = ClaudeAgentExecutor()
-app_instance = ExecutorApp(
+app_instance = ClaudeAgentExecutorApp(
     executor,
     "ClaudeAgentSDK",
     description="Claude Agent SDK executor with built-in tool access and session persistence",
 )
 
 
-def create_app() -> Starlette:
+def create_app() -> ASGIApp:
     return app_instance.create_app()
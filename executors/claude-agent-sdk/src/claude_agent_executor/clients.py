@@ -0,0 +1,218 @@
+"""Connected ClaudeSDKClients kept warm per conversation between turns."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional, Set
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds a connected client is kept after its last turn (0 = a new client per turn)
+WARM_CLIENT_IDLE_TIMEOUT = float(os.getenv("WARM_CLIENT_IDLE_TIMEOUT", "600"))
+# Estimated memory of one connected client: the CLI subprocess, its transcript and MCP connections
+WARM_CLIENT_MEMORY_MB = int(os.getenv("WARM_CLIENT_MEMORY_MB", "512"))
+DEFAULT_MAX_WARM_CLIENTS = 16  # when the container has no memory limit
+CGROUP_MEMORY_LIMITS = (Path("/sys/fs/cgroup/memory.max"), Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"))
+
+
+def fingerprint(**settings: Any) -> str:
+    """Digest of the settings a client was connected with. A different digest means the client must be replaced."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _memory_limit() -> Optional[int]:
+    """Container memory limit in bytes from cgroup v2 or v1, or None if unlimited or unknown."""
+    for path in CGROUP_MEMORY_LIMITS:
+        try:
+            raw = path.read_text().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a number close to 2^63
+        if raw.isdigit() and int(raw) < 1 << 60:
+            return int(raw)
+        return None
+    return None
+
+
+def default_max_clients() -> int:
+    """MAX_WARM_CLIENTS if set, else as many clients as the container memory limit has room for."""
+    configured = os.getenv("MAX_WARM_CLIENTS")
+    if configured:
+        return max(int(configured), 0)
+    limit = _memory_limit()
+    if limit is None:
+        return DEFAULT_MAX_WARM_CLIENTS
+    # One client's worth is left for the executor itself
+    return max(limit // (WARM_CLIENT_MEMORY_MB * 1024 * 1024) - 1, 1)
+
+
+class WarmClient:
+    """One conversation's client and the settings it was connected with."""
+
+    def __init__(self) -> None:
+        self.client: Any = None
+        self.fingerprint = ""
+        self.reused = False  # whether the current turn runs on a client connected for an earlier turn
+        self.retired = False  # set during a turn to disconnect the client after it
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self._connect: Optional[Callable[[], Any]] = None
+        self._stack: Optional[AsyncExitStack] = None
+
+    async def open(self, connect: Callable[[], Any], settings: str) -> None:
+        """Connect a new client from connect(), an unconnected ClaudeSDKClient."""
+        stack = AsyncExitStack()
+        start = time.monotonic()
+        self.client = await stack.enter_async_context(connect())
+        self._stack, self._connect, self.fingerprint = stack, connect, settings
+        self.retired = False
+        metrics.CLIENT_SPAWN_SECONDS.observe(time.monotonic() - start)
+
+    async def reconnect(self) -> None:
+        """Replace a client that failed, e.g. because its CLI subprocess exited while idle."""
+        connect, settings = self._connect, self.fingerprint
+        await self.close()
+        if connect is not None:
+            await self.open(connect, settings)
+        self.reused = False
+
+    async def close(self) -> None:
+        stack, self._stack, self.client = self._stack, None, None
+        if stack is None:
+            return
+        try:
+            await stack.aclose()
+        except Exception:
+            logger.warning("Failed to disconnect Claude SDK client", exc_info=True)
+
+
+class ClientRegistry:
+    """Connected clients per conversation, reused for its next turn.
+
+    A follow-up turn on a warm client skips the CLI start-up, the transcript
+    reload from disk and the MCP handshakes. A client is replaced when the
+    settings it was connected with change (model, API key, MCP servers or
+    prompt) and after a failed turn, since its state is then unknown. Clients
+    idle for longer than idle_timeout are disconnected, and past max_clients
+    the least recently used idle client is. Turns for one conversation run one
+    at a time on its client.
+    """
+
+    def __init__(self, idle_timeout: float = WARM_CLIENT_IDLE_TIMEOUT, max_clients: Optional[int] = None) -> None:
+        self._idle_timeout = idle_timeout
+        self._max_clients = default_max_clients() if max_clients is None else max_clients
+        self._clients: "OrderedDict[str, WarmClient]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._busy: Set[str] = set()  # conversations with a turn on a client that is not kept
+
+    @property
+    def enabled(self) -> bool:
+        return self._idle_timeout > 0 and self._max_clients > 0
+
+    def __len__(self) -> int:
+        return sum(1 for warm in self._clients.values() if warm.client is not None)
+
+    def active(self, conversation_id: str) -> bool:
+        """Whether the conversation has a turn running or a client kept for its next one."""
+        return conversation_id in self._clients or conversation_id in self._busy
+
+    @asynccontextmanager
+    async def session(
+        self, conversation_id: str, settings: str, connect: Callable[[], Any],
+    ) -> AsyncIterator[WarmClient]:
+        """A connected client for one turn of the conversation.
+
+        connect() returns an unconnected ClaudeSDKClient and is only called
+        when no client with the same settings is warm.
+        """
+        if not self.enabled:
+            warm = WarmClient()
+            self._busy.add(conversation_id)
+            try:
+                await warm.open(connect, settings)
+                yield warm
+            finally:
+                self._busy.discard(conversation_id)
+                await warm.close()
+            return
+
+        warm = self._clients.setdefault(conversation_id, WarmClient())
+        self._clients.move_to_end(conversation_id)
+        async with warm.lock:
+            if self._clients.setdefault(conversation_id, warm) is not warm:
+                # Replaced while this turn waited; the new entry owns the conversation from here
+                await warm.close()
+                warm = WarmClient()
+                one_shot = True
+            else:
+                one_shot = False
+            if warm.client is not None and warm.fingerprint != settings:
+                logger.info("Settings changed for conversation %s, replacing its client", conversation_id)
+                await warm.close()
+            if warm.client is None:
+                await warm.open(connect, settings)
+            else:
+                warm.reused = True
+            succeeded = False
+            try:
+                yield warm
+                succeeded = True
+            finally:
+                warm.last_used = time.monotonic()
+                if one_shot or not succeeded or warm.retired:
+                    await warm.close()
+        await self._evict_over_capacity()
+        self._ensure_sweeper()
+
+    async def close(self) -> None:
+        """Disconnect every client."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for warm in clients:
+            await warm.close()
+
+    async def _evict_over_capacity(self) -> None:
+        for conversation_id, warm in list(self._clients.items()):
+            if len(self) <= self._max_clients:
+                break
+            if warm.lock.locked():
+                continue
+            logger.info("Disconnecting least recently used client of conversation %s", conversation_id)
+            await self._drop(conversation_id, warm)
+
+    async def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self._idle_timeout
+        for conversation_id, warm in list(self._clients.items()):
+            if not warm.lock.locked() and warm.last_used < cutoff:
+                logger.info("Disconnecting client of conversation %s after %.0fs idle", conversation_id,
+                            time.monotonic() - warm.last_used)
+                await self._drop(conversation_id, warm)
+
+    async def _drop(self, conversation_id: str, warm: WarmClient) -> None:
+        if self._clients.get(conversation_id) is warm:
+            del self._clients[conversation_id]
+        await warm.close()
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def _sweep(self) -> None:
+        """Disconnect idle clients until none are left."""
+        while self._clients:
+            await asyncio.sleep(max(self._idle_timeout / 4, 1.0))
+            try:
+                await self._evict_idle()
+            except Exception:
+                logger.exception("Failed to disconnect idle clients")
@@ -1,18 +1,28 @@
 """Claude Agent SDK execution logic."""
 
+import asyncio
 import logging
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from ark_sdk.executor import BaseExecutor, MCPServerConfig, Message
 from ark_sdk.executor_app import is_otel_enabled
 from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient, list_sessions
-from claude_agent_sdk.types import AssistantMessage, TextBlock
+from claude_agent_sdk.types import (
+    AssistantMessage, ResultMessage, StreamEvent, TextBlock, ToolResultBlock, ToolUseBlock,
+)
+
+from . import maintenance, metrics, session_index
+from .clients import ClientRegistry, fingerprint
 
 logger = logging.getLogger(__name__)
 
 SESSIONS_DIR = Path(os.getenv("SESSIONS_DIR", "/data/sessions"))
+# Relay text as the model generates it rather than once each block is complete
+STREAM_PARTIAL_MESSAGES = os.getenv("STREAM_PARTIAL_MESSAGES", "true").lower() == "true"
+# Relay a short line when a tool starts and finishes, so tool-heavy turns show progress
+STREAM_TOOL_PROGRESS = os.getenv("STREAM_TOOL_PROGRESS", "false").lower() == "true"
 
 # Executor-specific instrumentation — only the Claude Agent SDK instrumentor
 if is_otel_enabled():
@@ -27,8 +37,12 @@ if is_otel_enabled():
 class ClaudeAgentExecutor(BaseExecutor):
     """Handles Claude Agent SDK execution with built-in tool access."""
 
+    _maintenance: Optional[asyncio.Task] = None
+
     def __init__(self) -> None:
         super().__init__("ClaudeAgentSDK")
+        self._clients = ClientRegistry()
+        self._rotations: Set[asyncio.Task] = set()
         logger.info("Claude Agent SDK executor initialized")
 
     @staticmethod
@@ -80,6 +94,105 @@ class ClaudeAgentExecutor(BaseExecutor):
 
         return sdk_servers, allowed_tools
 
+    async def close(self) -> None:
+        """Stop session maintenance and transcript rotations, then disconnect every client."""
+        tasks = [task for task in (self._maintenance, *self._rotations) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._maintenance = None
+        await self._clients.close()
+
+    def _ensure_maintenance(self) -> None:
+        """Start session maintenance with the first turn, once the server's event loop runs."""
+        if maintenance.SESSION_MAINTENANCE_INTERVAL <= 0:
+            return
+        if self._maintenance is None or self._maintenance.done():
+            self._maintenance = asyncio.create_task(maintenance.run_maintenance(SESSIONS_DIR, self._clients.active))
+
+    def _rotate_if_oversized(
+        self, conversation_id: str, settings: str, connect: Callable, session_dir: Path, session_id: str,
+    ) -> None:
+        if maintenance.SESSION_ROTATE_BYTES <= 0:
+            return
+        if maintenance.transcript_bytes(session_dir.resolve(), session_id) <= maintenance.SESSION_ROTATE_BYTES:
+            return
+        task = asyncio.create_task(self._rotate(SESSIONS_DIR, conversation_id, settings, connect, session_id))
+        self._rotations.add(task)
+        task.add_done_callback(self._rotations.discard)
+
+    async def _rotate(
+        self, root: Path, conversation_id: str, settings: str, connect: Callable, session_id: str,
+    ) -> None:
+        """Summarize an oversized session so the conversation's next turn starts a new one seeded with the summary.
+
+        Runs after the turn was answered, holding the conversation's client so a next turn waits for it.
+        The old transcript is deleted once its client is retired, as no turn resumes it again.
+        """
+        rotated = False
+        try:
+            async with self._clients.session(conversation_id, settings, connect) as warm:
+                entry = session_index.read(root, conversation_id)
+                if entry is None or entry.session_id != session_id:
+                    return
+                summary = ""
+                await warm.client.query(maintenance.SUMMARY_PROMPT)
+                async for message in warm.client.receive_response():
+                    if hasattr(message, "result") and message.result:
+                        summary = message.result
+                if not summary:
+                    raise RuntimeError("No summary generated")
+                session_index.write(root, conversation_id, "", turns=entry.turns, summary=summary)
+                warm.retired = True
+                rotated = True
+        except Exception:
+            metrics.SESSION_ROTATIONS.labels("error").inc()
+            logger.warning("Failed to rotate session %s of conversation %s", session_id, conversation_id, exc_info=True)
+        if rotated:
+            maintenance.remove_transcript((root / conversation_id).resolve(), session_id)
+            metrics.SESSION_ROTATIONS.labels("ok").inc()
+            logger.info(f"Rotated session {session_id} of conversation {conversation_id}")
+
+    @staticmethod
+    def _text_delta(event: dict) -> str:
+        """Text added by a raw stream event, or "" for any other event."""
+        if event.get("type") != "content_block_delta":
+            return ""
+        delta = event.get("delta") or {}
+        return delta.get("text", "") if delta.get("type") == "text_delta" else ""
+
+    async def _relay_response(self, client) -> Tuple[str, str]:
+        """Stream the turn's text as it arrives and return its (result, session ID)."""
+        result_text = ""
+        session_id = ""
+        streamed = False  # whether the message being generated was already relayed as deltas
+        tools: Dict[str, str] = {}
+        async for message in client.receive_response():
+            if isinstance(message, StreamEvent):
+                text = self._text_delta(message.event)
+                if text:
+                    streamed = True
+                    await self.stream_chunk(text)
+            elif isinstance(message, AssistantMessage):
+                for block in message.content:
+                    if isinstance(block, TextBlock) and block.text and not streamed:
+                        await self.stream_chunk(block.text)
+                    elif isinstance(block, ToolUseBlock) and STREAM_TOOL_PROGRESS:
+                        tools[block.id] = block.name
+                        await self.stream_chunk(f"\n[{block.name} started]\n")
+                streamed = False
+            elif STREAM_TOOL_PROGRESS and isinstance(getattr(message, "content", None), list):
+                # Tool results come back in a user message
+                for block in message.content:
+                    if isinstance(block, ToolResultBlock) and block.tool_use_id in tools:
+                        outcome = "failed" if getattr(block, "is_error", False) else "finished"
+                        await self.stream_chunk(f"[{tools.pop(block.tool_use_id)} {outcome}]\n")
+            if hasattr(message, "result") and message.result:
+                result_text = message.result
+            if isinstance(message, ResultMessage) and message.session_id:
+                session_id = message.session_id
+        return result_text, session_id
+
     async def execute_agent(self, request) -> List[Message]:
         """Execute agent using ClaudeSDKClient and return response messages."""
         conversation_id = request.conversationId
@@ -89,20 +202,11 @@ class ClaudeAgentExecutor(BaseExecutor):
             return [Message(role="assistant", content="Error: user input is required", name=request.agent.name)]
 
         model_name, api_key, base_url = self._resolve_model_config(request)
+        self._ensure_maintenance()
 
         logger.info(f"Executing Claude Agent SDK query for agent {request.agent.name} (model: {model_name}, conversation: {conversation_id})")
 
         session_dir = SESSIONS_DIR / conversation_id
-        session_dir.mkdir(parents=True, exist_ok=True)
-
-        # Find existing session to resume
-        previous_session_id = None
-        try:
-            sessions = list_sessions(directory=str(session_dir), limit=1)
-            if sessions:
-                previous_session_id = sessions[0].session_id
-        except Exception:
-            logger.debug("Could not list sessions for %s", session_dir, exc_info=True)
 
         mcp_kwargs: Dict = {}
         mcp_servers = getattr(request, "mcpServers", None) or []
@@ -124,37 +228,83 @@ class ClaudeAgentExecutor(BaseExecutor):
         if agent_prompt:
             prompt_kwargs["system_prompt"] = {"type": "preset", "preset": "claude_code", "append": agent_prompt}
 
-        resume_kwargs: Dict = {}
-        if previous_session_id:
-            resume_kwargs["resume"] = previous_session_id
-        options = ClaudeAgentOptions(
-            model=model_name,
-            cwd=str(session_dir),
-            permission_mode="bypassPermissions",
-            env=env,
-            **mcp_kwargs,
-            **prompt_kwargs,
-            **resume_kwargs,
+        # A warm client is only reused while everything it was connected with is unchanged
+        settings = fingerprint(
+            model=model_name, api_key=api_key, base_url=base_url, mcp=mcp_kwargs, prompt=prompt_kwargs,
         )
-        logger.info(f"{'Resuming session ' + previous_session_id if previous_session_id else 'Starting new session'} for conversation {conversation_id}")
+
+        def new_client(cwd: Path, **resume_kwargs) -> ClaudeSDKClient:
+            options = ClaudeAgentOptions(
+                model=model_name,
+                cwd=str(cwd),
+                permission_mode="bypassPermissions",
+                env=env,
+                include_partial_messages=STREAM_PARTIAL_MESSAGES,
+                **mcp_kwargs,
+                **prompt_kwargs,
+                **resume_kwargs,
+            )
+            return ClaudeSDKClient(options=options)
+
+        resumed_from_index = False
+        seed = ""
+
+        def connect():
+            # Only runs when no warm client can take the turn
+            nonlocal resumed_from_index, seed
+            new_conversation = not os.path.lexists(session_dir)
+            session_dir.mkdir(parents=True, exist_ok=True)
+            workdir = session_dir.resolve()
+
+            previous_session_id = None
+            entry = None if new_conversation else session_index.read(SESSIONS_DIR, conversation_id)
+            if entry is not None and entry.session_id:
+                previous_session_id = entry.session_id
+                resumed_from_index = True
+            elif entry is not None:
+                # The previous session was rotated: this turn starts a new one seeded with its summary
+                seed = entry.summary
+            else:
+                # Fallback for conversations without an index entry; repairs it
+                try:
+                    sessions = list_sessions(directory=str(workdir), limit=1)
+                    if sessions:
+                        previous_session_id = sessions[0].session_id
+                        session_index.write(SESSIONS_DIR, conversation_id, previous_session_id)
+                except Exception:
+                    logger.debug("Could not list sessions for %s", workdir, exc_info=True)
+
+            resume_kwargs: Dict = {}
+            if previous_session_id:
+                resume_kwargs["resume"] = previous_session_id
+            logger.info(f"{'Resuming session ' + previous_session_id if previous_session_id else 'Starting new session'} for conversation {conversation_id}")
+            return new_client(workdir, **resume_kwargs)
 
         try:
-            result_text = ""
-            async with ClaudeSDKClient(options=options) as client:
-                await client.query(user_input)
-                async for message in client.receive_response():
-                    if isinstance(message, AssistantMessage):
-                        for block in message.content:
-                            if isinstance(block, TextBlock) and block.text:
-                                await self.stream_chunk(block.text)
-                    if hasattr(message, "result") and message.result:
-                        result_text = message.result
+            async with self._clients.session(conversation_id, settings, connect) as warm:
+                try:
+                    await warm.client.query(maintenance.seeded(seed, user_input) if seed else user_input)
+                except Exception:
+                    if not warm.reused:
+                        raise
+                    logger.warning(
+                        "Warm client for conversation %s failed, reconnecting", conversation_id, exc_info=True,
+                    )
+                    await warm.reconnect()
+                    await warm.client.query(maintenance.seeded(seed, user_input) if seed else user_input)
+                result_text, session_id = await self._relay_response(warm.client)
 
+            if session_id:
+                session_index.record_turn(SESSIONS_DIR, conversation_id, session_id)
+                self._rotate_if_oversized(conversation_id, settings, connect, session_dir, session_id)
             if not result_text:
                 result_text = "No response generated"
 
             return [Message(role="assistant", content=result_text, name=request.agent.name)]
 
         except Exception as e:
+            if resumed_from_index:
+                # The indexed session may be the cause; the next turn scans the session store instead
+                session_index.forget(SESSIONS_DIR, conversation_id)
             logger.error(f"Error in Claude Agent SDK processing: {e}", exc_info=True)
             raise
@@ -0,0 +1,149 @@
+"""Retention and transcript rotation for the session directories under SESSIONS_DIR."""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from . import metrics, session_index
+
+logger = logging.getLogger(__name__)
+
+# Conversations idle for longer are removed (0 = kept regardless of age)
+SESSION_MAX_AGE = float(os.getenv("SESSION_MAX_AGE", "0"))
+# Disk used by all conversations past which the least recently active are removed (0 = no limit)
+SESSIONS_MAX_BYTES = int(os.getenv("SESSIONS_MAX_BYTES", "0"))
+# Seconds between disk usage reports and retention passes (0 = off)
+SESSION_MAINTENANCE_INTERVAL = float(os.getenv("SESSION_MAINTENANCE_INTERVAL", "600"))
+# Transcript size past which a conversation moves to a new session seeded with a summary (0 = never)
+SESSION_ROTATE_BYTES = int(os.getenv("SESSION_ROTATE_BYTES", "0"))
+
+# Where the SDK keeps transcripts: one directory per working directory
+CLAUDE_PROJECTS_DIR = Path(os.getenv("CLAUDE_CONFIG_DIR", str(Path.home() / ".claude"))) / "projects"
+
+SUMMARY_PROMPT = (
+    "Summarize this conversation for a new session that will continue it. Include the user's goals, "
+    "decisions made, files created or changed in the working directory, and anything left open. "
+    "Reply with the summary only."
+)
+
+
+def seeded(summary: str, user_input: str) -> str:
+    """The first prompt of a rotated conversation's new session."""
+    return f"Summary of the conversation so far, from an earlier session:\n\n{summary}\n\n---\n\n{user_input}"
+
+
+def project_dir(workdir: Path) -> Path:
+    """The SDK's transcript directory for a working directory."""
+    return CLAUDE_PROJECTS_DIR / re.sub(r"[^A-Za-z0-9]", "-", str(workdir))
+
+
+def transcript_bytes(workdir: Path, session_id: str) -> int:
+    try:
+        return (project_dir(workdir) / f"{session_id}.jsonl").stat().st_size
+    except OSError:
+        return 0
+
+
+def remove_transcript(workdir: Path, session_id: str) -> None:
+    (project_dir(workdir) / f"{session_id}.jsonl").unlink(missing_ok=True)
+
+
+def _disk_usage(path: Path) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+@dataclass
+class Conversation:
+    conversation_id: str
+    workdir: Path
+    bytes: int
+    last_active: float
+
+
+def scan(root: Path) -> List[Conversation]:
+    """Every conversation under root with its disk usage, working directory and transcripts included."""
+    conversations = []
+    try:
+        entries = list(root.iterdir())
+    except FileNotFoundError:
+        return []
+    for path in entries:
+        # Skips the session index
+        if path.name.startswith(".") or not path.is_dir():
+            continue
+        workdir = path.resolve()
+        entry = session_index.read(root, path.name)
+        try:
+            last_active = entry.updated_at if entry else workdir.stat().st_mtime
+        except OSError:
+            continue
+        conversations.append(Conversation(
+            conversation_id=path.name,
+            workdir=workdir,
+            bytes=_disk_usage(workdir) + _disk_usage(project_dir(workdir)),
+            last_active=last_active,
+        ))
+    return conversations
+
+
+def expired(
+    conversations: List[Conversation], now: float, max_age: float, max_bytes: int,
+) -> List[Tuple[Conversation, str]]:
+    """The conversations to remove and why: idle past max_age, then least recently active past max_bytes."""
+    removals = []
+    kept = []
+    for conversation in sorted(conversations, key=lambda c: c.last_active):
+        if max_age > 0 and now - conversation.last_active > max_age:
+            removals.append((conversation, "age"))
+        else:
+            kept.append(conversation)
+    if max_bytes > 0:
+        total = sum(c.bytes for c in kept)
+        for conversation in kept:
+            if total <= max_bytes:
+                break
+            removals.append((conversation, "size"))
+            total -= conversation.bytes
+    return removals
+
+
+def remove(root: Path, conversation: Conversation) -> None:
+    """Delete a conversation's working directory, transcripts and index entry."""
+    shutil.rmtree(conversation.workdir, ignore_errors=True)
+    shutil.rmtree(project_dir(conversation.workdir), ignore_errors=True)
+    session_index.forget(root, conversation.conversation_id)
+
+
+async def run_maintenance(root: Path, active: Callable[[str], bool]) -> None:
+    """Report disk usage and apply the retention policy every SESSION_MAINTENANCE_INTERVAL seconds.
+
+    Conversations for which active() is true are kept whatever their age or size.
+    """
+    while True:
+        try:
+            conversations = await asyncio.to_thread(scan, root)
+            metrics.SESSIONS.set(len(conversations))
+            metrics.SESSIONS_BYTES.set(sum(c.bytes for c in conversations))
+            for conversation, reason in expired(conversations, time.time(), SESSION_MAX_AGE, SESSIONS_MAX_BYTES):
+                if active(conversation.conversation_id):
+                    continue
+                logger.info("Removing conversation %s (%s, %d bytes)", conversation.conversation_id, reason,
+                            conversation.bytes)
+                await asyncio.to_thread(remove, root, conversation)
+                metrics.SESSIONS_REMOVED.labels(reason).inc()
+        except Exception:
+            logger.exception("Session maintenance failed")
+        await asyncio.sleep(SESSION_MAINTENANCE_INTERVAL)
@@ -0,0 +1,36 @@
+"""Prometheus metrics for the executor, served on /metrics."""
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Starting the CLI and connecting its MCP servers takes from under a second to tens of seconds
+SPAWN_BUCKETS = (0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+CLIENT_SPAWN_SECONDS = Histogram(
+    "executor_client_spawn_seconds",
+    "Time to start and connect a Claude SDK client",
+    buckets=SPAWN_BUCKETS,
+)
+
+SESSIONS = Gauge(
+    "executor_sessions",
+    "Conversations with a session directory",
+)
+SESSIONS_BYTES = Gauge(
+    "executor_sessions_bytes",
+    "Disk used by conversations: working directories and session transcripts",
+)
+SESSIONS_REMOVED = Counter(
+    "executor_sessions_removed_total",
+    "Conversations removed by the retention policy, by reason (age, size)",
+    ["reason"],
+)
+SESSION_ROTATIONS = Counter(
+    "executor_session_rotations_total",
+    "Oversized transcripts moved to a new session seeded with a summary, by outcome (ok, error)",
+    ["outcome"],
+)
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,73 @@
+"""Per-conversation index of the Claude session to resume.
+
+list_sessions() scans and parses the session store, which grows with the
+conversation. The index keeps the latest session ID in one small file per
+conversation, so resuming reads a single file; the scan only runs when the
+entry is missing or unreadable, and repairs it.
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Next to the session directories rather than inside them, out of the agent's working directory
+INDEX_DIR = ".index"
+
+
+@dataclass
+class SessionEntry:
+    session_id: str  # empty once the session was rotated: the next turn starts a new one seeded with summary
+    turns: int = 0  # turns recorded since the entry was created
+    updated_at: float = 0.0
+    summary: str = ""
+
+
+def _path(root: Path, conversation_id: str) -> Path:
+    return root / INDEX_DIR / f"{conversation_id}.json"
+
+
+def read(root: Path, conversation_id: str) -> Optional[SessionEntry]:
+    """The conversation's entry, or None if it has none or it cannot be read."""
+    try:
+        data = json.loads(_path(root, conversation_id).read_text())
+        return SessionEntry(session_id=str(data["session_id"]), turns=int(data.get("turns", 0)),
+                            updated_at=float(data.get("updated_at", 0.0)), summary=str(data.get("summary", "")))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning("Ignoring unreadable session index entry for conversation %s", conversation_id, exc_info=True)
+        return None
+
+
+def write(root: Path, conversation_id: str, session_id: str, turns: int = 0, summary: str = "") -> None:
+    """Replace the conversation's entry atomically, so a reader never sees a partial file."""
+    path = _path(root, conversation_id)
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(asdict(SessionEntry(session_id, turns, time.time(), summary))))
+        os.replace(tmp, path)
+    except OSError:
+        logger.warning("Failed to write session index entry for conversation %s", conversation_id, exc_info=True)
+
+
+def record_turn(root: Path, conversation_id: str, session_id: str) -> None:
+    """Record the session a turn ran in."""
+    entry = read(root, conversation_id)
+    write(root, conversation_id, session_id, turns=(entry.turns if entry else 0) + 1)
+
+
+def forget(root: Path, conversation_id: str) -> None:
+    """Drop the conversation's entry, so the next lookup scans and repairs it."""
+    try:
+        _path(root, conversation_id).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.warning("Failed to remove session index entry for conversation %s", conversation_id, exc_info=True)
@@ -4,16 +4,22 @@
 import asyncio
 import logging
 import os
+import socket
 from contextlib import asynccontextmanager
+from functools import partial
 
 import httpx
 import uvicorn
 from fastapi import FastAPI
 
 from .config import ConfigWatcher, SchedulerConfig
+from .drain import Drainer, DrainingServer
+from .leader import LeaseElector
 from .observability import setup_otel
-from .proxy import PROXY_TIMEOUT, create_proxy_app
+from .proxy import PROXY_TIMEOUT, create_proxy_app, probe_sandbox, warm_connection
 from .sandbox_manager import SandboxManager
+from .tasks import TaskStore
+from .turns import TurnCoordinator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,36 +31,68 @@ async def run_scheduler() -> None:
     port = int(os.getenv("PORT", "8000"))
     configmap_name = os.getenv("SCHEDULER_CONFIGMAP", "claude-agent-sdk-scheduler-config")
     namespace = os.getenv("SCHEDULER_NAMESPACE", "default")
+    lease_name = os.getenv("SCHEDULER_REAPER_LEASE", "claude-agent-sdk-scheduler-reaper")
+    lease_namespace = os.getenv("POD_NAMESPACE", namespace)
+    identity = os.getenv("POD_NAME") or socket.gethostname()
+    # Address other replicas use to forward tasks/get for asynchronous tasks owned by this one
+    pod_ip = os.getenv("POD_IP", "")
+    if ":" in pod_ip:
+        pod_ip = f"[{pod_ip}]"
+    owner = f"{pod_ip}:{port}" if pod_ip else ""
+    # Shared by the replicas to sign the owner in task IDs, which clients send back in tasks/get
+    task_id_secret = os.getenv("TASK_ID_SECRET", "")
+    if owner and not task_id_secret:
+        logger.warning("TASK_ID_SECRET is not set; tasks/get is only answered by the replica that owns the task")
 
     setup_otel()
 
     config = SchedulerConfig()
     config_watcher = ConfigWatcher(configmap_name=configmap_name, namespace=namespace, config=config)
-    sandbox_manager = SandboxManager(config=config)
     http_client = httpx.AsyncClient(
         timeout=httpx.Timeout(PROXY_TIMEOUT, connect=3.0),
         limits=httpx.Limits(max_connections=500, max_keepalive_connections=100),
     )
+    sandbox_manager = SandboxManager(
+        config=config,
+        connection_warmer=partial(warm_connection, http_client),
+        health_prober=partial(probe_sandbox, http_client),
+    )
+    reaper_elector = LeaseElector(name=lease_name, namespace=lease_namespace, identity=identity)
+    task_store = TaskStore(config=config, owner=owner, secret=task_id_secret)
+    turn_coordinator = TurnCoordinator(config=config, lease=sandbox_manager, identity=identity)
+    drainer = Drainer(config=config)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):  # type: ignore[type-arg]
         await config_watcher.start()
+        await sandbox_manager.start()
         await sandbox_manager.warm_cache()
-        reaper_task = asyncio.create_task(sandbox_manager.run_reaper())
+        await reaper_elector.start()
+        reaper_task = asyncio.create_task(sandbox_manager.run_reaper(reaper_elector))
+        pool_task = asyncio.create_task(sandbox_manager.run_claim_pool(reaper_elector))
+        health_task = asyncio.create_task(
+            sandbox_manager.run_health_checks(reaper_elector, turn_coordinator.in_flight),
+        )
         yield
-        reaper_task.cancel()
-        try:
-            await reaper_task
-        except asyncio.CancelledError:
-            pass
+        for task in (reaper_task, pool_task, health_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await reaper_elector.stop()
+        await task_store.close()
         await http_client.aclose()
         await sandbox_manager.close()
         await config_watcher.stop()
 
-    app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=http_client, lifespan=lifespan)
+    app = create_proxy_app(
+        sandbox_manager=sandbox_manager, http_client=http_client, lifespan=lifespan, task_store=task_store,
+        turn_coordinator=turn_coordinator, drainer=drainer,
+    )
 
     server_config = uvicorn.Config(app, host=host, port=port, log_level="info")
-    server = uvicorn.Server(server_config)
+    server = DrainingServer(server_config, drainer)
 
     await server.serve()
 
@@ -0,0 +1,110 @@
+"""Coalesced, debounced writer for the SandboxClaim last-activity annotation."""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from kubernetes_asyncio import client
+
+from .config import SchedulerConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityWriter:
+    """Collects last-activity timestamps in memory and flushes them periodically.
+
+    Every proxied request records activity; the flush loop sends at most one
+    merge-PATCH per claim per ``activity_flush_interval``. The idle TTL is
+    measured in tens of minutes, so a flush interval of a minute loses no
+    meaningful precision — and the local reaper consults ``last_recorded``
+    so it never reaps a claim whose activity has not been written yet.
+
+    Other annotations that can wait for the next flush, such as the
+    provisioning timeline, ride along on the same PATCH via ``annotate``.
+    """
+
+    def __init__(self, k8s: Any, config: SchedulerConfig, annotation: str) -> None:
+        self._k8s = k8s
+        self._config = config
+        self._annotation = annotation
+        self._pending: dict[str, datetime] = {}
+        self._extra: dict[str, dict[str, str]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def record(self, claim_name: str) -> None:
+        """Record activity on a claim; written on the next flush."""
+        self._pending[claim_name] = datetime.now(timezone.utc)
+
+    def annotate(self, claim_name: str, annotations: dict[str, str]) -> None:
+        """Queue annotations to write with the claim's next last-activity flush."""
+        self._extra.setdefault(claim_name, {}).update(annotations)
+
+    def last_recorded(self, claim_name: str) -> datetime | None:
+        """Activity recorded on this replica that has not been flushed yet."""
+        return self._pending.get(claim_name)
+
+    def pending_annotations(self, claim_name: str) -> dict[str, str]:
+        """Annotations queued for a claim that have not been flushed yet."""
+        return self._extra.get(claim_name, {})
+
+    def discard(self, claim_name: str) -> None:
+        """Forget pending activity for a claim that is being deleted."""
+        self._pending.pop(claim_name, None)
+        self._extra.pop(claim_name, None)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out anything still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            # An interval of 0 or less would flush in a tight loop
+            await asyncio.sleep(max(self._config.activity_flush_interval, 1))
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Last-activity flush failed")
+
+    async def flush(self) -> None:
+        """PATCH every claim with pending activity or annotations, once each."""
+        if not self._pending and not self._extra:
+            return
+        batch, self._pending = self._pending, {}
+        extra, self._extra = self._extra, {}
+        namespace = self._config.namespace
+        for claim_name in {**batch, **extra}:
+            at = batch.get(claim_name)
+            annotations = dict(extra.get(claim_name, {}))
+            if at is not None:
+                annotations[self._annotation] = at.isoformat()
+            try:
+                await self._k8s.patch_claim_annotation(claim_name, namespace, annotations)
+            except client.ApiException as e:
+                if e.status == 404:
+                    continue
+                self._requeue(claim_name, at, extra.get(claim_name))
+                logger.warning("Failed to patch last-activity on '%s' (%s), will retry", claim_name, e.status)
+            except Exception:
+                self._requeue(claim_name, at, extra.get(claim_name))
+                logger.warning("Failed to patch last-activity on '%s', will retry", claim_name, exc_info=True)
+
+    def _requeue(self, claim_name: str, at: datetime | None, annotations: dict[str, str] | None) -> None:
+        # Keep a newer timestamp or annotation recorded while the flush was in flight
+        if at is not None and claim_name not in self._pending:
+            self._pending[claim_name] = at
+        if annotations:
+            self._extra[claim_name] = {**annotations, **self._extra.get(claim_name, {})}
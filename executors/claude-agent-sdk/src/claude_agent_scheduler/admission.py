@@ -0,0 +1,215 @@
+"""Admission control: live active-sandbox count with a bounded, fair wait queue."""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable
+
+from . import metrics
+from .config import SchedulerConfig
+from .informer import ResourceIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_AFTER = 30  # seconds, used until a slot turnover rate has been observed
+MAX_RETRY_AFTER = 300
+RECHECK_INTERVAL = 5.0  # waiters re-check capacity in case a slot frees without a claim event
+FREE_INTERVAL_SMOOTHING = 0.3  # EWMA weight of the newest slot-free interval
+
+
+class SandboxCapacityError(Exception):
+    """Raised when sandbox creation is rejected due to capacity limits."""
+
+    def __init__(self, message: str, retry_after: int = DEFAULT_RETRY_AFTER) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Waiter:
+    claim_name: str
+    future: asyncio.Future  # type: ignore[type-arg]
+
+
+class AdmissionController:
+    """Admits sandbox creations against max_active_sandboxes without listing claims.
+
+    The active count is the claim index size plus slots reserved by creations
+    whose claim has not reached the index yet. Requests over capacity wait in a
+    bounded queue (admission_queue_size) for up to admission_queue_timeout
+    seconds. Waiters are grouped by a fairness key and admitted round-robin
+    across keys, so one busy namespace or agent cannot starve the others, and a claim
+    deletion (reaper, recovery, kubectl) admits the next waiter immediately.
+
+    With a scope, only claims the scope accepts are counted, against limit
+    instead of max_active_sandboxes; this is how per-template limits apply.
+    """
+
+    def __init__(
+        self,
+        config: SchedulerConfig,
+        claims: ResourceIndex,
+        unassigned: Callable[[], int] | None = None,
+        scope: Callable[[dict], bool] | None = None,  # type: ignore[type-arg]
+        limit: Callable[[], int] | None = None,
+        name: str = "",
+    ) -> None:
+        self._config = config
+        self._claims = claims
+        # Indexed claims not serving a conversation (the claim pool), which do not count as active
+        self._unassigned = unassigned or (lambda: 0)
+        self._scope = scope
+        self._limit = limit or (lambda: config.max_active_sandboxes)
+        self._name = f"Sandbox capacity for template '{name}'" if name else "Sandbox capacity"
+        # Names of indexed claims within scope, kept current from claim events
+        self._members: set[str] = set()
+        if scope is not None:
+            self._members = {c["metadata"]["name"] for c in claims.items() if scope(c)}
+        self._reserved: set[str] = set()
+        self._excluded: set[str] = set()
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._depth = 0
+        self._last_freed: float | None = None
+        self._free_interval: float | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._depth
+
+    def active(self) -> int:
+        reserved = sum(1 for name in self._reserved if self._claims.get(name) is None)
+        excluded = sum(1 for name in self._excluded if self._counts(name))
+        indexed = len(self._members) if self._scope is not None else len(self._claims) - self._unassigned()
+        return indexed + reserved - excluded
+
+    def _counts(self, name: str) -> bool:
+        return name in self._members if self._scope is not None else self._claims.get(name) is not None
+
+    def retry_after(self) -> int:
+        """Seconds until a request joining the back of the queue could expect a slot."""
+        interval = self._free_interval if self._free_interval is not None else DEFAULT_RETRY_AFTER
+        return max(1, min(MAX_RETRY_AFTER, math.ceil((self._depth + 1) * interval)))
+
+    async def acquire(self, claim_name: str, key: str = "") -> None:
+        """Reserve a slot for claim_name, queueing under key while at capacity.
+
+        Raises SandboxCapacityError when the queue is full or the wait times out.
+        Callers must release(claim_name) once provisioning finishes either way.
+        """
+        if claim_name in self._reserved or self._claims.get(claim_name) is not None:
+            return  # the claim already holds a slot
+        if self._depth == 0 and self._has_capacity():
+            self._reserved.add(claim_name)
+            return
+
+        limit = self._limit()
+        if self._depth >= self._config.admission_queue_size:
+            metrics.ADMISSION_REJECTIONS.labels("at_capacity").inc()
+            raise SandboxCapacityError(
+                f"{self._name} reached ({self.active()}/{limit} active). Retry later.",
+                retry_after=self.retry_after(),
+            )
+
+        waiter = _Waiter(claim_name, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(key, deque()).append(waiter)
+        self._depth += 1
+        timeout = self._config.admission_queue_timeout
+        deadline = time.monotonic() + timeout
+        logger.info("%s reached, queued claim '%s' (key=%r depth=%d)", self._name, claim_name, key, self._depth)
+        admitted = False
+        try:
+            while True:
+                if waiter.future.done():
+                    admitted = True
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.ADMISSION_REJECTIONS.labels("queue_timeout").inc()
+                    raise SandboxCapacityError(
+                        f"{self._name} reached ({self.active()}/{limit} active), "
+                        f"no slot freed within {timeout}s. Retry later.",
+                        retry_after=self.retry_after(),
+                    )
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), timeout=min(remaining, RECHECK_INTERVAL))
+                except asyncio.TimeoutError:
+                    self._pump()
+        finally:
+            if not admitted:
+                if waiter.future.done():
+                    # Admitted just as the caller gave up — hand the slot on
+                    self.release(claim_name)
+                else:
+                    waiter.future.cancel()
+                    self._remove(key, waiter)
+
+    def release(self, claim_name: str) -> None:
+        """Drop the reservation for claim_name; an existing claim stays counted via the index."""
+        self._reserved.discard(claim_name)
+        self._pump()
+
+    def exclude(self, claim_name: str) -> None:
+        """Stop counting a claim that is being deleted, before its DELETED event arrives."""
+        self._excluded.add(claim_name)
+        self._pump()
+
+    def include(self, claim_name: str) -> None:
+        """Count an excluded claim again (its deletion failed)."""
+        self._excluded.discard(claim_name)
+
+    def on_claim_event(self, event_type: str, claim: dict) -> None:  # type: ignore[type-arg]
+        name = claim.get("metadata", {}).get("name", "")
+        was_member = name in self._members
+        if self._scope is not None:
+            if event_type != "DELETED" and self._scope(claim):
+                self._members.add(name)
+            else:
+                self._members.discard(name)
+        if event_type == "ADDED":
+            # Now counted by the index itself
+            self._reserved.discard(name)
+        elif event_type == "DELETED":
+            self._excluded.discard(name)
+            if self._scope is None or was_member:
+                self._record_free()
+            self._pump()
+
+    def _has_capacity(self) -> bool:
+        limit = self._limit()
+        return limit <= 0 or self.active() < limit
+
+    def _pump(self) -> None:
+        """Admit queued waiters round-robin across keys while capacity allows."""
+        while self._depth and self._has_capacity():
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._depth -= 1
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            self._reserved.add(waiter.claim_name)
+            waiter.future.set_result(None)
+            logger.info("Admitted queued claim '%s' (key=%r depth=%d)", waiter.claim_name, key, self._depth)
+
+    def _remove(self, key: str, waiter: _Waiter) -> None:
+        queue = self._queues.get(key)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self._depth -= 1
+        if not queue:
+            del self._queues[key]
+
+    def _record_free(self) -> None:
+        now = time.monotonic()
+        if self._last_freed is not None:
+            sample = now - self._last_freed
+            if self._free_interval is None:
+                self._free_interval = sample
+            else:
+                self._free_interval = FREE_INTERVAL_SMOOTHING * sample + (1 - FREE_INTERVAL_SMOOTHING) * self._free_interval
+        self._last_freed = now
@@ -6,11 +6,26 @@ from typing import Any
 
 import yaml
 from kubernetes_asyncio import client, config, watch
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 logger = logging.getLogger(__name__)
 
 
+class SandboxTemplateRule(BaseModel):
+    """Routes matching new conversations to a SandboxTemplate other than sandbox_template."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    name: str = Field(description="SandboxTemplate name")
+    agents: list[str] = Field(default_factory=list, description="Agent names routed to this template")
+    query_annotations: dict[str, str] = Field(
+        default_factory=dict, alias="queryAnnotations", description="Query annotations that must all match"
+    )
+    max_active_sandboxes: int = Field(
+        default=0, alias="maxActiveSandboxes", description="Max concurrent sandboxes of this template (0 = no limit)"
+    )
+
+
 class SchedulerConfig(BaseModel):
     """Scheduler configuration loaded from a ConfigMap."""
 
@@ -20,6 +35,66 @@ class SchedulerConfig(BaseModel):
     sandbox_template: str = Field(default="claude-agent-sdk", description="SandboxTemplate name")
     namespace: str = Field(default="default", description="Namespace for sandbox resources")
     max_active_sandboxes: int = Field(default=0, description="Max concurrent sandboxes (0 = unlimited)")
+    activity_flush_interval: int = Field(
+        default=60, description="Seconds between coalesced last-activity annotation writes per claim (at least 1)"
+    )
+    admission_queue_size: int = Field(
+        default=0, description="Max requests waiting for a sandbox slot at capacity (0 = reject immediately)"
+    )
+    admission_queue_timeout: int = Field(default=30, description="Max seconds a request waits for a sandbox slot")
+    capacity_eviction: bool = Field(
+        default=False, description="At capacity, delete the least recently active idle sandbox to admit new ones"
+    )
+    eviction_min_idle: int = Field(default=300, description="Min idle seconds before a sandbox can be evicted")
+    eviction_protected_agents: list[str] = Field(
+        default_factory=list, description="Agents whose sandboxes are never evicted for capacity"
+    )
+    claim_pool_size: int = Field(
+        default=0, description="Ready, unassigned SandboxClaims kept for the sandbox template (0 = no pool)"
+    )
+    async_provisioning: bool = Field(
+        default=False, description="Answer new conversations with a submitted A2A task and provision in the background"
+    )
+    async_task_ttl: int = Field(default=3600, description="Seconds a finished asynchronous task stays retrievable")
+    turn_queue_size: int = Field(
+        default=8, description="Max messages per conversation waiting behind the current turn (0 = reject immediately)"
+    )
+    turn_queue_timeout: int = Field(default=600, description="Max seconds a message waits for its conversation's turn")
+    turn_queue_policy: str = Field(
+        default="Reject", description="When a conversation queue is full: Reject the new message or DropOldest waiting"
+    )
+    pod_ip_routing: bool = Field(
+        default=False, description="Route to the sandbox pod IP from Sandbox status instead of its Service DNS name"
+    )
+    connection_warmup: bool = Field(
+        default=True, description="Open a keep-alive connection to each sandbox as soon as it is ready"
+    )
+    turn_lease: bool = Field(
+        default=False, description="Also serialize turns across replicas with a lease annotation on the SandboxClaim"
+    )
+    health_check_interval: int = Field(
+        default=0, description="Seconds between health probes of ready sandboxes (0 = no probing)"
+    )
+    health_check_timeout: float = Field(default=2.0, description="Seconds a sandbox has to answer a health probe")
+    health_check_failure_threshold: int = Field(
+        default=3, description="Consecutive failed probes or forwards that open a sandbox's circuit"
+    )
+    response_header_timeout: int = Field(
+        default=30, description="Max seconds to wait for response headers from a sandbox, except on blocking "
+        "message/send (0 = no deadline)"
+    )
+    replay_ttl: int = Field(
+        default=300, description="Seconds a completed message/send response is replayed to retries (0 = no replay)"
+    )
+    replay_cache_bytes: int = Field(
+        default=64 * 1024 * 1024, description="Max total size of response bodies kept for replay"
+    )
+    sandbox_templates: list[SandboxTemplateRule] = Field(
+        default_factory=list, description="Rules routing new conversations to other SandboxTemplates, first match wins"
+    )
+    drain_timeout: int = Field(
+        default=600, description="Max seconds to finish in-flight requests on shutdown before they are cut off"
+    )
 
     @classmethod
     def from_yaml(cls, raw: str) -> "SchedulerConfig":
@@ -37,6 +112,29 @@ def _normalize_keys(data: dict[str, Any]) -> dict[str, Any]:
         "sandboxTemplate": "sandbox_template",
         "namespace": "namespace",
         "maxActiveSandboxes": "max_active_sandboxes",
+        "activityFlushInterval": "activity_flush_interval",
+        "admissionQueueSize": "admission_queue_size",
+        "admissionQueueTimeout": "admission_queue_timeout",
+        "capacityEviction": "capacity_eviction",
+        "evictionMinIdle": "eviction_min_idle",
+        "evictionProtectedAgents": "eviction_protected_agents",
+        "claimPoolSize": "claim_pool_size",
+        "asyncProvisioning": "async_provisioning",
+        "asyncTaskTTL": "async_task_ttl",
+        "turnQueueSize": "turn_queue_size",
+        "turnQueueTimeout": "turn_queue_timeout",
+        "turnQueuePolicy": "turn_queue_policy",
+        "turnLease": "turn_lease",
+        "podIPRouting": "pod_ip_routing",
+        "connectionWarmup": "connection_warmup",
+        "drainTimeout": "drain_timeout",
+        "sandboxTemplates": "sandbox_templates",
+        "healthCheckInterval": "health_check_interval",
+        "healthCheckTimeout": "health_check_timeout",
+        "healthCheckFailureThreshold": "health_check_failure_threshold",
+        "responseHeaderTimeout": "response_header_timeout",
+        "replayTTL": "replay_ttl",
+        "replayCacheBytes": "replay_cache_bytes",
     }
     return {mapping.get(k, k): v for k, v in data.items() if mapping.get(k, k) in SchedulerConfig.model_fields}
 
@@ -0,0 +1,125 @@
+"""Graceful draining: finish in-flight agent turns before the scheduler exits."""
+
+import asyncio
+import logging
+import time
+from types import FrameType
+from typing import Any
+
+import uvicorn
+
+from . import metrics
+from .config import SchedulerConfig
+
+logger = logging.getLogger(__name__)
+
+# Endpoints that never count as in-flight work and stay available while draining
+UNTRACKED_PATHS = frozenset({"/health", "/ready", "/metrics"})
+SHUTDOWN_GRACE = 5  # seconds uvicorn waits for requests still running after the drain deadline
+
+
+class Drainer:
+    """Counts in-flight work and waits for it to finish once draining starts.
+
+    Work is every proxied request until its response body has been sent, plus
+    every asynchronous-provisioning task. While draining, readiness fails and
+    new conversations are refused, but work already accepted and messages for
+    existing conversations are still served.
+    """
+
+    def __init__(self, config: SchedulerConfig) -> None:
+        self._config = config
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._draining = False
+
+    @property
+    def draining(self) -> bool:
+        return self._draining
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def begin(self) -> None:
+        self._in_flight += 1
+        self._idle.clear()
+
+    def end(self) -> None:
+        self._in_flight -= 1
+        if self._in_flight <= 0:
+            self._in_flight = 0
+            self._idle.set()
+
+    def start_draining(self) -> None:
+        if not self._draining:
+            self._draining = True
+            logger.info("Draining: %d request(s) in flight, deadline %ds", self._in_flight, self._config.drain_timeout)
+
+    async def wait(self) -> int:
+        """Wait up to drain_timeout for in-flight work to finish. Returns the work still running."""
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=self._config.drain_timeout)
+            logger.info("Drained in %.1fs", time.monotonic() - start)
+        except asyncio.TimeoutError:
+            logger.warning("Drain deadline reached with %d request(s) still in flight", self._in_flight)
+        return self._in_flight
+
+
+class DrainMiddleware:
+    """ASGI middleware that counts proxied requests as in-flight until their response completes."""
+
+    def __init__(self, app: Any, drainer: Drainer) -> None:
+        self._app = app
+        self._drainer = drainer
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in UNTRACKED_PATHS:
+            await self._app(scope, receive, send)
+            return
+        self._drainer.begin()
+        try:
+            await self._app(scope, receive, send)
+        except asyncio.CancelledError:
+            if self._drainer.draining:
+                metrics.SHUTDOWN_TERMINATED.labels("request").inc()
+            raise
+        finally:
+            self._drainer.end()
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains before it stops accepting connections.
+
+    uvicorn closes its listening socket as soon as it receives SIGTERM, while
+    Kubernetes may still route traffic to the pod. Instead, the first signal
+    starts draining and keeps serving; uvicorn's own shutdown begins once the
+    drain finishes or drain_timeout passes. A second signal exits at once.
+    """
+
+    def __init__(self, config: uvicorn.Config, drainer: Drainer) -> None:
+        super().__init__(config)
+        self._drainer = drainer
+        self._drain_task: asyncio.Task[None] | None = None
+
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        if self._drainer.draining:
+            # A second signal skips the rest of the drain
+            self.config.timeout_graceful_shutdown = SHUTDOWN_GRACE
+            super().handle_exit(sig, frame)
+            return
+        self._drainer.start_draining()
+        # Signal handlers interrupt the loop thread; schedule the drain on the loop itself
+        asyncio.get_event_loop().call_soon_threadsafe(self._start_drain, sig)
+
+    def _start_drain(self, sig: int) -> None:
+        self._drain_task = asyncio.create_task(self._drain_then_exit(sig))
+
+    async def _drain_then_exit(self, sig: int) -> None:
+        await self._drainer.wait()
+        if not self.should_exit:
+            # Requests still running after the deadline are cancelled after a short grace
+            self.config.timeout_graceful_shutdown = SHUTDOWN_GRACE
+            super().handle_exit(sig, None)
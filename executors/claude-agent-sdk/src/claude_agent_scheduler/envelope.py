@@ -0,0 +1,258 @@
+"""Single-parse JSON-RPC request envelope and byte-level contextId splicing."""
+
+import json
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from ark_sdk.extensions.query import QueryRef, extract_query_ref
+
+_WS = re.compile(rb"[ \t\n\r]*")
+# Unrolled string pattern: runs of plain characters between escapes, so long strings match in C
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+_SCALAR = re.compile(rb"[^,}\]\s]*")
+
+CONTEXT_ID_KEY = b"contextId"
+REQUEST_MESSAGE_PATH = (b"params", b"message")
+RESPONSE_MESSAGE_PATH = (b"result", b"message")
+
+
+@dataclass
+class RequestEnvelope:
+    """Everything the proxy needs from an A2A JSON-RPC request, from one parse.
+
+    ``body`` is the original request bytes unless a contextId had to be
+    generated, in which case it is the original bytes with the new contextId
+    spliced into ``params.message``. ``error`` is set when the client sent a
+    contextId that is not a valid UUID4. ``blocking`` is the client's
+    ``params.configuration.blocking``, True when not given as A2A servers
+    block by default, and ``task_id`` is ``params.id`` for task methods such
+    as tasks/get.
+    """
+
+    request_id: Any
+    context_id: str
+    body: bytes
+    is_new: bool
+    query_ref: QueryRef | None = None
+    error: str = ""
+    method: str = ""
+    message: dict[str, Any] | None = None
+    blocking: bool = True
+    task_id: str = ""
+
+
+def _is_valid_uuid4(value: str) -> bool:
+    """Check if a string is a valid UUID4."""
+    try:
+        parsed = uuid.UUID(value, version=4)
+        return str(parsed) == value.lower()
+    except (ValueError, AttributeError):
+        return False
+
+
+def parse_request(raw_body: bytes) -> RequestEnvelope:
+    """Parse an A2A JSON-RPC request once, generating and splicing in a contextId if absent."""
+    try:
+        data = json.loads(raw_body)
+    except ValueError:
+        # Unparseable body — generate UUID4, don't modify body
+        return RequestEnvelope(request_id=None, context_id=str(uuid.uuid4()), body=raw_body, is_new=True)
+    if not isinstance(data, dict):
+        return RequestEnvelope(request_id=None, context_id=str(uuid.uuid4()), body=raw_body, is_new=True)
+
+    request_id = data.get("id")
+    method = data.get("method") if isinstance(data.get("method"), str) else ""
+    params = data.get("params")
+    if not isinstance(params, dict):
+        params = {}
+    message = params.get("message")
+    if not isinstance(message, dict):
+        message = None
+    configuration = params.get("configuration")
+    blocking = configuration.get("blocking") if isinstance(configuration, dict) else None
+    task_id = params.get("id") if isinstance(params.get("id"), str) else ""
+    extra: dict[str, Any] = {
+        "method": method, "message": message,
+        "blocking": blocking is not False, "task_id": task_id,
+    }
+
+    query_ref = None
+    if message is not None:
+        try:
+            query_ref = extract_query_ref(message)
+        except ValueError:
+            pass
+
+    context_id = message.get("contextId") if message is not None else None
+    if isinstance(context_id, str):
+        context_id = context_id.strip()
+
+    if not context_id:
+        # No contextId — generate UUID4 and inject
+        generated = str(uuid.uuid4())
+        body = raw_body
+        if message is not None:
+            present = "contextId" in message
+            message["contextId"] = generated
+            body = _splice_context_id(raw_body, REQUEST_MESSAGE_PATH, generated, present=present)
+            if body is None:
+                body = json.dumps(data).encode()
+        return RequestEnvelope(request_id, generated, body, is_new=True, query_ref=query_ref, **extra)
+
+    if not isinstance(context_id, str) or not _is_valid_uuid4(context_id):
+        return RequestEnvelope(
+            request_id, "", raw_body, is_new=False, query_ref=query_ref,
+            error=f"Invalid contextId '{context_id}': must be a valid UUID4 or omitted for auto-generation", **extra,
+        )
+    return RequestEnvelope(request_id, context_id, raw_body, is_new=False, query_ref=query_ref, **extra)
+
+
+def inject_response_context_id(body: bytes, context_id: str) -> bytes:
+    """Set ``result.message.contextId`` in a JSON-RPC response by splicing bytes.
+
+    Returns the original object when there is no message or it already carries
+    the contextId, so unchanged responses are forwarded as-is.
+    """
+    spliced = _splice_context_id(body, RESPONSE_MESSAGE_PATH, context_id)
+    if spliced is not None:
+        return spliced
+    # Not a well-formed document for the scanner — fall back to a full parse
+    try:
+        data = json.loads(body)
+        message = data.get("result", {}).get("message")
+        if isinstance(message, dict) and message.get("contextId") != context_id:
+            message["contextId"] = context_id
+            return json.dumps(data).encode()
+    except Exception:
+        pass
+    return body
+
+
+def _splice_context_id(
+    body: bytes, path: tuple[bytes, ...], context_id: str, present: bool | None = None,
+) -> bytes | None:
+    """Splice contextId into the object at path. None if the bytes could not be scanned.
+
+    Only the members in front of the target are scanned. When the key is known
+    (or shown) to be absent the new member is inserted right after the opening
+    brace, so large values such as tool output in ``parts`` are never walked.
+    """
+    try:
+        obj = _find_object(body, path)
+        if obj < 0:
+            return body
+        encoded = json.dumps(context_id).encode()
+        if present is None:
+            # Unescaped quotes only delimit keys and string values, so if the quoted
+            # key never occurs in the raw bytes the message cannot have the member
+            present = b'"' + CONTEXT_ID_KEY + b'"' in body
+        span = _member_span(body, obj, CONTEXT_ID_KEY) if present else None
+        if span is not None:
+            start, end = span
+            if body[start:end] == encoded or _decode(body[start:end]) == context_id:
+                return body
+            return body[:start] + encoded + body[end:]
+        member = b'"' + CONTEXT_ID_KEY + b'":' + encoded
+        first = _skip_ws(body, obj + 1)
+        if body[first:first + 1] != b"}":
+            member += b","
+        return body[:obj + 1] + member + body[obj + 1:]
+    except (ValueError, IndexError, AttributeError):
+        return None
+
+
+def _decode(value: bytes) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def _skip_ws(buf: bytes, pos: int) -> int:
+    return _WS.match(buf, pos).end()  # type: ignore[union-attr]
+
+
+def _skip_value(buf: bytes, pos: int) -> int:
+    """End offset of the JSON value starting at pos, without building it."""
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        match = _STRING.match(buf, pos)
+        if match is None:
+            raise ValueError("unterminated string")
+        return match.end()
+    if first in (b"{", b"["):
+        depth = 0
+        while True:
+            token = _STRUCTURE.search(buf, pos)
+            if token is None:
+                raise ValueError("unterminated container")
+            char = token.group()
+            if char == b'"':
+                pos = _skip_value(buf, token.start())
+                continue
+            depth += 1 if char in (b"{", b"[") else -1
+            pos = token.end()
+            if depth == 0:
+                return pos
+    end = _SCALAR.match(buf, pos).end()  # type: ignore[union-attr]
+    if end == pos:
+        raise ValueError("expected a value")
+    return end
+
+
+def _members(buf: bytes, pos: int):  # type: ignore[no-untyped-def]
+    """Yield (key, value_start) for the JSON object whose '{' is at pos.
+
+    A value is only skipped once the caller asks for the next member, so
+    stopping at a key never scans the value that follows it.
+    """
+    pos = _skip_ws(buf, pos + 1)
+    if buf[pos:pos + 1] == b"}":
+        return
+    while True:
+        if buf[pos:pos + 1] != b'"':
+            raise ValueError("expected a key")
+        key_end = _skip_value(buf, pos)
+        key = buf[pos + 1:key_end - 1]
+        if b"\\" in key:
+            key = json.loads(buf[pos:key_end]).encode()
+        pos = _skip_ws(buf, key_end)
+        if buf[pos:pos + 1] != b":":
+            raise ValueError("expected ':'")
+        start = _skip_ws(buf, pos + 1)
+        yield key, start
+        pos = _skip_ws(buf, _skip_value(buf, start))
+        separator = buf[pos:pos + 1]
+        if separator == b"}":
+            return
+        if separator != b",":
+            raise ValueError("expected ',' or '}'")
+        pos = _skip_ws(buf, pos + 1)
+
+
+def _member_start(buf: bytes, obj: int, name: bytes) -> int:
+    """Offset of the value of member name, or -1. The value itself is not scanned."""
+    for key, start in _members(buf, obj):
+        if key == name:
+            return start
+    return -1
+
+
+def _member_span(buf: bytes, obj: int, name: bytes) -> tuple[int, int] | None:
+    start = _member_start(buf, obj, name)
+    return None if start < 0 else (start, _skip_value(buf, start))
+
+
+def _find_object(buf: bytes, path: tuple[bytes, ...]) -> int:
+    """Offset of the '{' of the object at path, or -1 if absent or not an object."""
+    pos = _skip_ws(buf, 0)
+    for name in path:
+        if buf[pos:pos + 1] != b"{":
+            return -1
+        pos = _member_start(buf, pos, name)
+        if pos < 0:
+            return -1
+    return pos if buf[pos:pos + 1] == b"{" else -1
@@ -0,0 +1,53 @@
+"""Per-sandbox circuit breakers fed by health probes and forwarded requests."""
+
+import logging
+
+from . import metrics
+from .config import SchedulerConfig
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxHealth:
+    """Tracks consecutive failures per sandbox and opens its circuit at a threshold.
+
+    Failures are health probes that failed or timed out and forwarded requests
+    that could not connect or got no response headers in time. A circuit opens
+    after health_check_failure_threshold consecutive failures and closes on the
+    next success. While a sandbox's circuit is open, requests for its
+    conversation skip it and go straight to recovery.
+    """
+
+    def __init__(self, config: SchedulerConfig) -> None:
+        self._config = config
+        self._failures: dict[str, int] = {}
+        self._open: set[str] = set()
+
+    @property
+    def open_count(self) -> int:
+        return len(self._open)
+
+    def is_open(self, sandbox_name: str) -> bool:
+        return sandbox_name in self._open
+
+    def record_success(self, sandbox_name: str) -> None:
+        self._failures.pop(sandbox_name, None)
+        if sandbox_name in self._open:
+            self._open.discard(sandbox_name)
+            logger.info("Circuit for sandbox '%s' closed", sandbox_name)
+
+    def record_failure(self, sandbox_name: str) -> bool:
+        """Count a failure. Returns True if this failure opened the circuit."""
+        failures = self._failures.get(sandbox_name, 0) + 1
+        self._failures[sandbox_name] = failures
+        if sandbox_name in self._open or failures < max(self._config.health_check_failure_threshold, 1):
+            return False
+        self._open.add(sandbox_name)
+        metrics.CIRCUIT_OPENS.inc()
+        logger.warning("Circuit for sandbox '%s' opened after %d consecutive failures", sandbox_name, failures)
+        return True
+
+    def forget(self, sandbox_name: str) -> None:
+        """Drop all state for a sandbox that no longer exists."""
+        self._failures.pop(sandbox_name, None)
+        self._open.discard(sandbox_name)
@@ -0,0 +1,200 @@
+"""Informer-style local index of namespaced custom resources (list + watch)."""
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from kubernetes_asyncio import client
+
+logger = logging.getLogger(__name__)
+
+RELIST_BACKOFF = 5.0  # seconds to wait before relisting after a list/watch error
+WATCH_TIMEOUT = 300  # server-side watch timeout; the stream resumes from the last resourceVersion
+
+EventHandler = Callable[[str, dict], None]  # type: ignore[type-arg]
+Predicate = Callable[[dict], bool]  # type: ignore[type-arg]
+
+
+class ResourceDeletedError(RuntimeError):
+    """Raised to a waiter when the object it is waiting on is deleted."""
+
+
+class ResourceIndex:
+    """In-memory mirror of one custom resource kind, kept current by list+watch.
+
+    The index is a read-through optimization, not a source of truth: until the
+    initial LIST completes ``synced`` is False and callers fall back to the API
+    server. After that, reads are served from memory and a single watch stream
+    (resumed from the last seen resourceVersion) keeps the index fresh.
+    """
+
+    def __init__(
+        self,
+        k8s: Any,
+        group: str,
+        version: str,
+        plural: str,
+        namespace: str,
+        label_selector: str = "",
+    ) -> None:
+        self._k8s = k8s
+        self._group = group
+        self._version = version
+        self._plural = plural
+        self._namespace = namespace
+        self._label_selector = label_selector
+        self._objects: dict[str, dict] = {}  # type: ignore[type-arg]
+        self._resource_version = ""
+        self._synced = asyncio.Event()
+        self._handlers: list[EventHandler] = []
+        self._waiters: dict[str, list[tuple[Predicate, asyncio.Future]]] = {}  # type: ignore[type-arg]
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def synced(self) -> bool:
+        return self._synced.is_set()
+
+    def get(self, name: str) -> dict | None:  # type: ignore[type-arg]
+        return self._objects.get(name)
+
+    def items(self) -> list[dict]:  # type: ignore[type-arg]
+        return list(self._objects.values())
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def add_handler(self, handler: EventHandler) -> None:
+        """Register a callback invoked with (event_type, object) for every applied event."""
+        self._handlers.append(handler)
+
+    async def wait_for(self, name: str, predicate: Predicate, timeout: float) -> dict:  # type: ignore[type-arg]
+        """Wait until the named object satisfies predicate, served from the shared watch.
+
+        The current state is checked on registration, so an event applied before
+        the caller started waiting is never missed. Raises ResourceDeletedError if
+        the object is deleted while waiting, TimeoutError after timeout seconds,
+        and propagates any exception raised by the predicate.
+        """
+        obj = self._objects.get(name)
+        if obj is not None and predicate(obj):
+            return obj
+        future: asyncio.Future = asyncio.get_running_loop().create_future()  # type: ignore[type-arg]
+        entry = (predicate, future)
+        self._waiters.setdefault(name, []).append(entry)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            waiters = self._waiters.get(name)
+            if waiters is not None:
+                waiters.remove(entry)
+                if not waiters:
+                    del self._waiters[name]
+
+    async def start(self, sync_timeout: float) -> None:
+        """Start the list+watch loop and wait up to sync_timeout for the initial LIST."""
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._synced.wait(), timeout=sync_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "%s index not synced after %.0fs, serving from the API server until it is",
+                self._plural, sync_timeout,
+            )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._list()
+                await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except client.ApiException as e:
+                if e.status == 410:
+                    logger.info("%s watch resourceVersion expired, relisting", self._plural)
+                    continue
+                logger.warning("%s list/watch failed (%s), relisting in %.0fs", self._plural, e.status, RELIST_BACKOFF)
+                await asyncio.sleep(RELIST_BACKOFF)
+            except Exception:
+                logger.exception("%s list/watch failed, relisting in %.0fs", self._plural, RELIST_BACKOFF)
+                await asyncio.sleep(RELIST_BACKOFF)
+
+    async def _list(self) -> None:
+        response = await self._k8s.list_custom_objects(
+            group=self._group, version=self._version, plural=self._plural,
+            namespace=self._namespace, label_selector=self._label_selector,
+        )
+        fresh = {
+            item["metadata"]["name"]: item
+            for item in response.get("items", [])
+            if item.get("metadata", {}).get("name")
+        }
+        # Objects deleted while we were not watching never produce a DELETED event
+        gone = [obj for name, obj in self._objects.items() if name not in fresh]
+        self._objects = fresh
+        self._resource_version = response.get("metadata", {}).get("resourceVersion", "")
+        for obj in gone:
+            self._dispatch("DELETED", obj)
+        for obj in fresh.values():
+            self._dispatch("ADDED", obj)
+        self._synced.set()
+        logger.info("%s index synced: %d objects (resourceVersion=%s)", self._plural, len(fresh), self._resource_version)
+
+    async def _watch(self) -> None:
+        while True:
+            async for event in self._k8s.watch_custom_objects(
+                group=self._group, version=self._version, plural=self._plural,
+                namespace=self._namespace, label_selector=self._label_selector,
+                resource_version=self._resource_version, timeout=WATCH_TIMEOUT,
+            ):
+                self._apply(event)
+
+    def _apply(self, event: dict) -> None:  # type: ignore[type-arg]
+        event_type = event.get("type", "")
+        obj = event.get("object") or {}
+        metadata = obj.get("metadata", {})
+        resource_version = metadata.get("resourceVersion", "")
+        if resource_version:
+            self._resource_version = resource_version
+        if event_type == "BOOKMARK":
+            return
+        name = metadata.get("name", "")
+        if not name:
+            return
+        if event_type == "DELETED":
+            self._objects.pop(name, None)
+        elif event_type in ("ADDED", "MODIFIED"):
+            self._objects[name] = obj
+        else:
+            return
+        self._dispatch(event_type, obj)
+
+    def _dispatch(self, event_type: str, obj: dict) -> None:  # type: ignore[type-arg]
+        self._notify_waiters(event_type, obj)
+        for handler in self._handlers:
+            try:
+                handler(event_type, obj)
+            except Exception:
+                logger.exception("%s index handler failed", self._plural)
+
+    def _notify_waiters(self, event_type: str, obj: dict) -> None:  # type: ignore[type-arg]
+        name = obj.get("metadata", {}).get("name", "")
+        for predicate, future in self._waiters.get(name, []):
+            if future.done():
+                continue
+            if event_type == "DELETED":
+                future.set_exception(ResourceDeletedError(f"{self._plural} '{name}' deleted while waiting"))
+                continue
+            try:
+                if predicate(obj):
+                    future.set_result(obj)
+            except Exception as e:
+                future.set_exception(e)
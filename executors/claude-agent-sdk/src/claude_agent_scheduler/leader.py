@@ -0,0 +1,193 @@
+"""Lease-based leader election for scheduler work that must run on one replica."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from kubernetes_asyncio import client, config
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+LEASE_DURATION = 15  # seconds a lease stays valid without renewal
+RENEW_INTERVAL = 5  # seconds between acquire/renew attempts
+
+
+def _micro_time(value: datetime) -> str:
+    # Lease times are MicroTime, which the API server parses with exactly six fractional digits
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class LeaseElector:
+    """Holds a coordination.k8s.io Lease while this replica is the leader.
+
+    Mirrors client-go leader election. Another holder's lease is treated as
+    expired only after its record has gone unchanged for a full lease duration
+    on the local monotonic clock, so replicas never compare wall clocks. The
+    leader counts itself as leader until its last successful renewal plus the
+    lease duration, which always ends before another replica can take over.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        namespace: str,
+        identity: str,
+        lease_duration: int = LEASE_DURATION,
+        renew_interval: float = RENEW_INTERVAL,
+    ) -> None:
+        self._name = name
+        self._namespace = namespace
+        self._identity = identity
+        self._lease_duration = lease_duration
+        self._renew_interval = renew_interval
+        self._api: client.CoordinationV1Api | None = None
+        self._api_client: client.ApiClient | None = None
+        self._task: asyncio.Task[None] | None = None
+        # Last lease record seen from another holder, and when it was first seen
+        self._observed: tuple[str, Any] | None = None
+        self._observed_at = 0.0
+        # Monotonic time at which the last successful acquire/renew was issued
+        self._renewed_at: float | None = None
+
+    @property
+    def identity(self) -> str:
+        return self._identity
+
+    @property
+    def is_leader(self) -> bool:
+        return self._renewed_at is not None and time.monotonic() - self._renewed_at < self._lease_duration
+
+    async def start(self) -> None:
+        """Start the background acquire/renew loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop renewing and release the lease so another replica takes over immediately."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.is_leader:
+            try:
+                await self._release()
+            except Exception:
+                logger.warning("Failed to release lease '%s'", self._name, exc_info=True)
+        self._renewed_at = None
+        if self._api_client:
+            await self._api_client.close()
+
+    async def _run(self) -> None:
+        while True:
+            was_leader = self.is_leader
+            try:
+                await self.try_acquire_or_renew()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Lease '%s' acquire/renew failed", self._name, exc_info=True)
+            if self.is_leader != was_leader:
+                logger.info(
+                    "%s leadership of lease '%s' as %s",
+                    "Acquired" if self.is_leader else "Lost", self._name, self._identity,
+                )
+            await asyncio.sleep(self._renew_interval)
+
+    async def try_acquire_or_renew(self) -> bool:
+        """One election round. Returns True if this replica holds the lease afterwards."""
+        api = await self._ensure_api()
+        attempt_at = time.monotonic()
+        now = datetime.now(timezone.utc)
+
+        try:
+            metrics.K8S_API_CALLS.labels("get", "leases").inc()
+            lease = await api.read_namespaced_lease(name=self._name, namespace=self._namespace)
+        except client.ApiException as e:
+            if e.status != 404:
+                raise
+            return await self._write(api, attempt_at, self._spec(now, now, transitions=0))
+
+        spec = lease.spec
+        holder = spec.holder_identity or ""
+        if holder and holder != self._identity:
+            record = (holder, spec.renew_time)
+            if record != self._observed:
+                self._observed, self._observed_at = record, attempt_at
+            if attempt_at - self._observed_at < (spec.lease_duration_seconds or self._lease_duration):
+                self._renewed_at = None
+                return False
+            logger.info("Lease '%s' held by %s expired, taking over", self._name, holder)
+
+        transitions = spec.lease_transitions or 0
+        acquired = spec.acquire_time or now
+        if holder != self._identity:
+            transitions += 1
+            acquired = now
+        body = self._spec(now, acquired, transitions)
+        return await self._write(api, attempt_at, body, lease.metadata.resource_version)
+
+    async def _write(
+        self, api: client.CoordinationV1Api, attempt_at: float, spec: dict, resource_version: str = "",  # type: ignore[type-arg]
+    ) -> bool:
+        """Create or replace the lease. A 409 means another replica won the round."""
+        metadata: dict[str, str] = {"name": self._name, "namespace": self._namespace}
+        try:
+            if resource_version:
+                metadata["resourceVersion"] = resource_version
+                metrics.K8S_API_CALLS.labels("update", "leases").inc()
+                await api.replace_namespaced_lease(
+                    name=self._name, namespace=self._namespace, body={"metadata": metadata, "spec": spec},
+                )
+            else:
+                metrics.K8S_API_CALLS.labels("create", "leases").inc()
+                await api.create_namespaced_lease(namespace=self._namespace, body={"metadata": metadata, "spec": spec})
+        except client.ApiException as e:
+            if e.status == 409:
+                self._renewed_at = None
+                return False
+            raise
+        self._renewed_at = attempt_at
+        return True
+
+    async def _release(self) -> None:
+        api = await self._ensure_api()
+        lease = await api.read_namespaced_lease(name=self._name, namespace=self._namespace)
+        if lease.spec.holder_identity != self._identity:
+            return
+        now = datetime.now(timezone.utc)
+        spec = self._spec(now, now, lease.spec.lease_transitions or 0)
+        spec.update({"holderIdentity": "", "leaseDurationSeconds": 1})
+        metrics.K8S_API_CALLS.labels("update", "leases").inc()
+        await api.replace_namespaced_lease(
+            name=self._name, namespace=self._namespace,
+            body={
+                "metadata": {"name": self._name, "namespace": self._namespace,
+                             "resourceVersion": lease.metadata.resource_version},
+                "spec": spec,
+            },
+        )
+        logger.info("Released lease '%s'", self._name)
+
+    def _spec(self, renewed: datetime, acquired: datetime, transitions: int) -> dict:  # type: ignore[type-arg]
+        return {
+            "holderIdentity": self._identity,
+            "leaseDurationSeconds": self._lease_duration,
+            "acquireTime": _micro_time(acquired),
+            "renewTime": _micro_time(renewed),
+            "leaseTransitions": transitions,
+        }
+
+    async def _ensure_api(self) -> client.CoordinationV1Api:
+        if self._api is None:
+            try:
+                config.load_incluster_config()
+            except config.ConfigException:
+                await config.load_kube_config()
+            self._api_client = client.ApiClient()
+            self._api = client.CoordinationV1Api(self._api_client)
+        return self._api
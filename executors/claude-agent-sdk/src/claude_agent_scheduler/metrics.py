@@ -0,0 +1,135 @@
+"""Prometheus metrics for the scheduler, served on /metrics."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Provisioning spans seconds to minutes; forwarding spans milliseconds to a long agent turn
+PROVISION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+FORWARD_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0)
+
+PROVISION_PHASE_SECONDS = Histogram(
+    "scheduler_sandbox_provision_phase_seconds",
+    "Duration of each sandbox provisioning phase",
+    ["phase", "outcome"],
+    buckets=PROVISION_BUCKETS,
+)
+PROXY_FORWARD_SECONDS = Histogram(
+    "scheduler_proxy_forward_seconds",
+    "Time from forwarding a request to receiving the sandbox response headers, by outcome (ok, error, timeout)",
+    ["outcome"],
+    buckets=FORWARD_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "scheduler_sandbox_cache_lookups_total",
+    "Routing cache lookups by result (hit, miss, expired)",
+    ["result"],
+)
+K8S_API_CALLS = Counter(
+    "scheduler_k8s_api_calls_total",
+    "Kubernetes API calls by verb and resource",
+    ["verb", "resource"],
+)
+ACTIVE_SANDBOXES = Gauge(
+    "scheduler_active_sandboxes",
+    "Managed SandboxClaims currently known to this replica",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "scheduler_admission_queue_depth",
+    "Requests waiting for a sandbox slot on this replica",
+)
+REAPED_SESSIONS = Counter(
+    "scheduler_reaped_sessions_total",
+    "Idle sessions reaped after sessionIdleTTL",
+)
+CAPACITY_EVICTIONS = Counter(
+    "scheduler_capacity_evictions_total",
+    "Idle sessions evicted to admit new conversations at capacity",
+)
+ADMISSION_REJECTIONS = Counter(
+    "scheduler_admission_rejections_total",
+    "New conversations rejected at capacity, by reason (at_capacity, queue_timeout)",
+    ["reason"],
+)
+CLAIM_POOL_DEPTH = Gauge(
+    "scheduler_claim_pool_depth",
+    "Ready, unassigned pooled SandboxClaims for the current template",
+)
+CLAIM_POOL_BINDS = Counter(
+    "scheduler_claim_pool_binds_total",
+    "New conversations served from the claim pool (hit) or provisioned cold (miss)",
+    ["result"],
+)
+TURN_QUEUE_WAIT_SECONDS = Histogram(
+    "scheduler_turn_queue_wait_seconds",
+    "Time a message waited for the previous turn of its conversation, by outcome (admitted, rejected)",
+    ["outcome"],
+    buckets=FORWARD_BUCKETS,
+)
+TURN_QUEUE_DEPTH = Gauge(
+    "scheduler_turn_queue_depth",
+    "Messages waiting for a turn in flight for their conversation on this replica",
+)
+TURN_REJECTIONS = Counter(
+    "scheduler_turn_rejections_total",
+    "Messages refused while their conversation had a turn in flight, by reason (queue_full, superseded, timeout)",
+    ["reason"],
+)
+IN_FLIGHT_REQUESTS = Gauge(
+    "scheduler_in_flight_requests",
+    "Proxied requests and asynchronous tasks in progress on this replica",
+)
+SHUTDOWN_TERMINATED = Counter(
+    "scheduler_shutdown_terminated_total",
+    "Work cut off because it was still running when drainTimeout expired, by kind (request, async_task)",
+    ["kind"],
+)
+RECOVERY_ATTEMPTS = Counter(
+    "scheduler_recovery_attempts_total",
+    "Sandbox recovery attempts after an unreachable or hung sandbox, by outcome",
+    ["outcome"],
+)
+
+HEALTH_PROBES = Counter(
+    "scheduler_sandbox_health_probes_total",
+    "Sandbox health probes by result (ok, failed)",
+    ["result"],
+)
+CIRCUIT_OPENS = Counter(
+    "scheduler_sandbox_circuit_opens_total",
+    "Sandbox circuits opened after consecutive failed probes or forwards",
+)
+OPEN_CIRCUITS = Gauge(
+    "scheduler_sandbox_open_circuits",
+    "Sandboxes whose circuit is open on this replica",
+)
+PROACTIVE_RECOVERIES = Counter(
+    "scheduler_proactive_recoveries_total",
+    "Sandboxes replaced in the background after their circuit opened, by outcome",
+    ["outcome"],
+)
+
+REPLAYED_REQUESTS = Counter(
+    "scheduler_replayed_requests_total",
+    "Retried message/send requests answered without forwarding again, by source (cache, in_flight)",
+    ["source"],
+)
+
+
+@contextmanager
+def observe_phase(phase: str) -> Iterator[None]:
+    """Record the duration of a provisioning phase, labelled ok or error."""
+    start = time.monotonic()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        PROVISION_PHASE_SECONDS.labels(phase, outcome).observe(time.monotonic() - start)
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
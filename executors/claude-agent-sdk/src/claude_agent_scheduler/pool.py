@@ -0,0 +1,182 @@
+"""Pool of ready, unassigned SandboxClaims that new conversations bind to."""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from kubernetes_asyncio import client
+
+from . import metrics
+from .config import SchedulerConfig
+from .informer import ResourceIndex
+from .leader import LeaseElector
+
+logger = logging.getLogger(__name__)
+
+LABEL_POOL = "ark.mckinsey.com/claim-pool"  # value is the template the pooled claim was created from
+REPLENISH_INTERVAL = 5.0  # seconds between pool reconciliations when nothing changes
+PENDING_GRACE = 30.0  # seconds a created claim counts toward the pool before it shows up in the index
+
+
+class ClaimPool:
+    """Keeps claim_pool_size ready, unassigned SandboxClaims for the sandbox template.
+
+    Pooled claims carry the pool label instead of a conversation ID. Binding a
+    conversation relabels a ready pooled claim with a resourceVersion
+    precondition, so two replicas can never bind the same claim: the loser gets
+    a 409 and tries the next one. Replenishment runs on the lease holder only,
+    creates claims in the background, and deletes pooled claims that belong to a
+    previous template, exceed the pool size, or never became ready.
+    """
+
+    def __init__(
+        self,
+        k8s: Any,
+        config: SchedulerConfig,
+        claims: ResourceIndex,
+        sandboxes: ResourceIndex,
+        is_ready: Callable[[dict], bool],  # type: ignore[type-arg]
+        labels: dict[str, str],
+        headroom: Callable[[], int],  # claims max_active_sandboxes still has room for
+    ) -> None:
+        self._k8s = k8s
+        self._config = config
+        self._claims = claims
+        self._sandboxes = sandboxes
+        self._is_ready = is_ready
+        self._labels = labels
+        self._headroom = headroom
+        self._pending: dict[str, float] = {}  # created claim name -> monotonic creation time
+        self._binding: set[str] = set()
+        self._deleting: set[str] = set()  # deleted claims still in the index until their DELETED event
+        self._wake = asyncio.Event()
+
+    def unassigned(self) -> int:
+        """Pooled claims not bound to a conversation, ready or not."""
+        return len(self._members())
+
+    def depth(self) -> int:
+        """Pooled claims for the current template that are ready to bind."""
+        return sum(1 for claim in self._members(self._config.sandbox_template) if self._available(claim))
+
+    async def bind(self, labels: dict[str, str]) -> dict | None:  # type: ignore[type-arg]
+        """Assign a ready pooled claim to a conversation. Returns the bound claim, or None if the pool is empty."""
+        for claim in self._members(self._config.sandbox_template):
+            metadata = claim["metadata"]
+            name = metadata["name"]
+            if name in self._binding or name in self._deleting or not self._available(claim):
+                continue
+            self._binding.add(name)
+            try:
+                bound = await self._k8s.bind_sandbox_claim(
+                    name, self._config.namespace, metadata.get("resourceVersion", ""), {**labels, LABEL_POOL: None},
+                )
+            except client.ApiException as e:
+                if e.status in (404, 409):
+                    # Bound by another replica or deleted since the index saw it
+                    continue
+                raise
+            finally:
+                self._binding.discard(name)
+            self._wake.set()
+            metrics.CLAIM_POOL_BINDS.labels("hit").inc()
+            return bound
+        metrics.CLAIM_POOL_BINDS.labels("miss").inc()
+        return None
+
+    def on_claim_event(self, event_type: str, claim: dict) -> None:  # type: ignore[type-arg]
+        """Reconcile promptly when a claim changes instead of waiting for the next interval."""
+        self._wake.set()
+
+    async def run(self, elector: LeaseElector | None = None) -> None:
+        """Background task that keeps the pool at claim_pool_size on the lease holder."""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=REPLENISH_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                if elector is not None and not elector.is_leader:
+                    continue
+                if self._claims.synced:
+                    await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Claim pool reconcile error")
+                await asyncio.sleep(REPLENISH_INTERVAL)
+
+    async def reconcile(self) -> None:
+        """Single pool cycle: drop stale and surplus pooled claims, then create the shortfall."""
+        template = self._config.sandbox_template
+        size = max(self._config.claim_pool_size, 0)
+        now = time.monotonic()
+        self._pending = {
+            name: created for name, created in self._pending.items()
+            if self._claims.get(name) is None and now - created < PENDING_GRACE
+        }
+        self._deleting = {name for name in self._deleting if self._claims.get(name) is not None}
+
+        current: list[dict] = []  # type: ignore[type-arg]
+        for claim in self._members():
+            name = claim["metadata"]["name"]
+            if name in self._binding or name in self._deleting:
+                continue
+            if claim["metadata"]["labels"].get(LABEL_POOL) != template:
+                await self._delete(name, "template changed")
+            elif not self._available(claim) and self._age(claim) > self._config.sandbox_ready_timeout:
+                await self._delete(name, "not ready")
+            else:
+                current.append(claim)
+
+        # Shrink from the not-yet-ready end so ready claims stay bindable
+        current.sort(key=self._available, reverse=True)
+        for claim in current[size:]:
+            await self._delete(claim["metadata"]["name"], "pool shrunk")
+
+        pending = len(self._pending)
+        shortfall = min(size - len(current[:size]) - pending, self._headroom() - pending)
+        for _ in range(max(shortfall, 0)):
+            name = f"pool-{template[:40]}-{uuid.uuid4().hex[:8]}".lower()
+            self._pending[name] = now
+            try:
+                await self._k8s.create_sandbox_claim(
+                    name=name, template=template, namespace=self._config.namespace,
+                    labels={**self._labels, LABEL_POOL: template},
+                )
+            except Exception:
+                self._pending.pop(name, None)
+                raise
+            logger.info("Created pooled SandboxClaim '%s' (template=%s)", name, template)
+
+    def _members(self, template: str | None = None) -> list[dict]:  # type: ignore[type-arg]
+        members = []
+        for claim in self._claims.items():
+            pool = claim.get("metadata", {}).get("labels", {}).get(LABEL_POOL)
+            if pool and (template is None or pool == template):
+                members.append(claim)
+        return members
+
+    def _available(self, claim: dict) -> bool:  # type: ignore[type-arg]
+        sandbox_status = claim.get("status", {}).get("sandbox", {})
+        sandbox_name = sandbox_status.get("name", "") or sandbox_status.get("Name", "")
+        sandbox = self._sandboxes.get(sandbox_name) if sandbox_name else None
+        return sandbox is not None and self._is_ready(sandbox)
+
+    @staticmethod
+    def _age(claim: dict) -> float:  # type: ignore[type-arg]
+        created = claim.get("metadata", {}).get("creationTimestamp", "")
+        try:
+            created_dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
+        except (ValueError, AttributeError):
+            return 0.0
+        return (datetime.now(timezone.utc) - created_dt).total_seconds()
+
+    async def _delete(self, name: str, reason: str) -> None:
+        logger.info("Deleting pooled SandboxClaim '%s' (%s)", name, reason)
+        await self._k8s.delete_sandbox_claim(name, self._config.namespace)
+        self._deleting.add(name)
@@ -1,56 +1,225 @@
 """A2A reverse proxy: extract contextId, route to sandbox, forward request."""
 
+import asyncio
 import json
 import logging
+import re
+import time
 import uuid
+import weakref
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 
 import httpx
-from ark_sdk.extensions.query import extract_query_ref
 from ark_sdk.query_status_updater import QueryStatusUpdater
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
 from opentelemetry import trace
 from opentelemetry.context import attach, detach
 from opentelemetry.propagate import extract, inject
 from opentelemetry.trace import StatusCode
-
-from .sandbox_manager import SandboxCapacityError, SandboxManager
+from starlette.types import Receive, Scope, Send
+
+from . import metrics
+from .config import SchedulerConfig
+from .drain import DrainMiddleware, Drainer
+from .envelope import RequestEnvelope, inject_response_context_id, parse_request
+from .replay import BufferedResponse, ReplayCache, replay_key
+from .sandbox_manager import SandboxCapacityError, SandboxInfo, SandboxManager
+from .tasks import OWNER_SEPARATOR, TaskStore
+from .templates import template_hint
+from .turns import Turn, TurnCoordinator, TurnRejectedError
 
 logger = logging.getLogger(__name__)
 tracer = trace.get_tracer("claude-agent-scheduler")
 
 PROXY_TIMEOUT = 600.0  # 10 minutes — agent execution can be long-running
+WARMUP_TIMEOUT = 3.0  # seconds for the keep-alive connection opened to a newly ready sandbox
+DRAIN_RETRY_AFTER = 1  # Retry-After seconds for new conversations refused while draining
+FORWARDED_HEADER = "x-scheduler-forwarded"  # marks tasks/get forwarded to the owning replica
+# Client credentials stay on the first hop; the owning replica needs only the task ID
+_CREDENTIAL_HEADERS = ("authorization", "proxy-authorization", "cookie")
 
+# SSE events are separated by a blank line; any of the three line endings is legal
+_SSE_EVENT_SEPARATOR = re.compile(rb"\r\n\r\n|\n\n|\r\r")
+_SSE_LINE_SEPARATOR = re.compile(rb"\r\n|\n|\r")
 
-def _is_valid_uuid4(value: str) -> bool:
-    """Check if a string is a valid UUID4."""
-    try:
-        parsed = uuid.UUID(value, version=4)
-        return str(parsed) == value.lower()
-    except (ValueError, AttributeError):
-        return False
 
+class ResponseHeaderTimeout(Exception):
+    """The sandbox accepted the request but sent no response headers within responseHeaderTimeout."""
 
-def _extract_query_ref_from_body(body: bytes):
-    """Extract QueryRef from A2A JSON-RPC body, or None on any failure."""
-    try:
-        message = json.loads(body).get("params", {}).get("message", {})
-        return extract_query_ref(message)
-    except Exception:
-        return None
+
+class SandboxUnhealthyError(Exception):
+    """The sandbox's circuit is open, so the request is not forwarded to it."""
+
+
+class SandboxRecoveryError(Exception):
+    """The sandbox was unavailable, and replacing it or forwarding to the replacement failed."""
 
 
 def _inject_context_id(response_body: bytes, context_id: str) -> bytes:
-    """Inject contextId into A2A JSON-RPC response message."""
+    """Inject contextId into A2A JSON-RPC response message.
+
+    Unchanged bodies are returned as the same object.
+    """
+    return inject_response_context_id(response_body, context_id)
+
+
+def _inject_context_id_sse_event(event: bytes, context_id: str) -> bytes:
+    """Inject contextId into the JSON-RPC payload carried by one SSE event.
+
+    Events whose payload is unchanged are returned as the original bytes. The
+    injected payload is written back one data line per payload line, where the
+    first data line was, so the other fields keep their positions.
+    """
+    lines = _SSE_LINE_SEPARATOR.split(event)
+    data_at = [i for i, line in enumerate(lines) if line.startswith(b"data:")]
+    if not data_at:
+        return event
+    payload = b"\n".join(lines[i][5:].removeprefix(b" ") for i in data_at)
+    injected = _inject_context_id(payload, context_id)
+    if injected is payload:
+        return event
+    data = [b"data: " + piece for piece in injected.split(b"\n")]
+    relayed: list[bytes] = []
+    for i, line in enumerate(lines):
+        if i == data_at[0]:
+            relayed += data
+        elif i not in data_at:
+            relayed.append(line)
+    separator = _SSE_LINE_SEPARATOR.search(event)
+    return (separator.group() if separator else b"\n").join(relayed)
+
+
+async def _relay_sse(chunks: AsyncIterator[bytes], context_id: str) -> AsyncIterator[bytes]:
+    """Re-frame an SSE byte stream event by event, injecting contextId as each event completes."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            match = _SSE_EVENT_SEPARATOR.search(buffer)
+            if match is None:
+                break
+            event, separator, buffer = buffer[:match.start()], match.group(), buffer[match.end():]
+            yield _inject_context_id_sse_event(event, context_id) + separator
+    if buffer:
+        yield _inject_context_id_sse_event(buffer, context_id)
+
+
+async def _relay_body(upstream_response: httpx.Response, context_id: str) -> AsyncIterator[bytes]:
+    """Stream the upstream body to the client, injecting contextId where the content type allows.
+
+    SSE responses are forwarded event by event as they arrive. JSON responses are a
+    single JSON-RPC document, so they are collected before injection. Anything else
+    is passed through chunk by chunk.
+    """
+    content_type = upstream_response.headers.get("content-type", "")
     try:
-        data = json.loads(response_body)
-        message = data.get("result", {}).get("message")
-        if isinstance(message, dict):
-            message["contextId"] = context_id
-            return json.dumps(data).encode()
-    except Exception:
-        pass
-    return response_body
+        if content_type.startswith("text/event-stream"):
+            async for event in _relay_sse(upstream_response.aiter_bytes(), context_id):
+                yield event
+        elif content_type.startswith("application/json"):
+            body = b"".join([chunk async for chunk in upstream_response.aiter_bytes()])
+            yield _inject_context_id(body, context_id)
+        else:
+            async for chunk in upstream_response.aiter_bytes():
+                yield chunk
+    finally:
+        await upstream_response.aclose()
+
+
+class _UpstreamStreamingResponse(StreamingResponse):
+    """Relays an upstream response and closes it however the relay ends.
+
+    _relay_body closes the upstream response once it has been read, but a client
+    that disconnects before the body starts leaves the generator unstarted, and
+    its finally block never runs.
+    """
+
+    def __init__(self, upstream_response: httpx.Response, context_id: str) -> None:
+        super().__init__(
+            _relay_body(upstream_response, context_id),
+            status_code=upstream_response.status_code,
+            headers=_relayed_headers(upstream_response),
+            media_type=upstream_response.headers.get("content-type"),
+        )
+        self._upstream_response = upstream_response
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._upstream_response.aclose()
+
+
+def _relayed_headers(upstream_response: httpx.Response) -> dict[str, str]:
+    """Upstream response headers, excluding framing handled by ASGI.
+
+    The body is relayed decoded, so content-encoding no longer applies either.
+    """
+    headers = dict(upstream_response.headers)
+    headers.pop("transfer-encoding", None)
+    headers.pop("content-length", None)
+    headers.pop("content-encoding", None)
+    return headers
+
+
+async def _release_after(body: AsyncIterator[bytes], turn: Turn) -> AsyncIterator[bytes]:
+    """Relay body, then hand the conversation to its next message."""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        await turn.release()
+
+
+def _hold_turn(response: Response, turn: Turn) -> Response:
+    """Keep the conversation's turn until the streamed response body has been relayed."""
+    if not isinstance(response, StreamingResponse):
+        return response
+    body = _release_after(response.body_iterator, turn)
+    # A client that disconnects before the body starts leaves the generator unstarted
+    weakref.finalize(body, turn.release_soon)
+    response.body_iterator = body
+    return response
+
+
+async def _buffered(pending: Awaitable[Response]) -> BufferedResponse:
+    """Await a response and read its whole body, so that it can be sent more than once."""
+    response = await pending
+    if isinstance(response, StreamingResponse):
+        chunks = [chunk async for chunk in response.body_iterator]
+        body = b"".join(chunk if isinstance(chunk, bytes) else str(chunk).encode() for chunk in chunks)
+    else:
+        body = bytes(response.body)
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return BufferedResponse(response.status_code, body, headers)
+
+
+def _jsonrpc_result(request_id: Any, result: Any) -> bytes:
+    """Build a JSON-RPC 2.0 success response."""
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "result": result}).encode()
+
+
+def _agent_message(context_id: str, text: str) -> dict[str, Any]:
+    """An A2A agent message carrying plain text, used for task failure reasons."""
+    return {
+        "kind": "message",
+        "messageId": str(uuid.uuid4()),
+        "role": "agent",
+        "contextId": context_id,
+        "parts": [{"kind": "text", "text": text}],
+    }
+
+
+def _forward_headers(request: Request) -> dict[str, str]:
+    """Inbound headers to forward upstream, without hop-by-hop and length headers."""
+    # httpx recalculates Content-Length from the body we pass
+    headers = dict(request.headers)
+    headers.pop("host", None)
+    headers.pop("content-length", None)
+    headers.pop("transfer-encoding", None)
+    return headers
 
 
 def _jsonrpc_error(request_id: Any, code: int, message: str) -> bytes:
@@ -71,33 +240,41 @@ def extract_context_id(body: bytes) -> tuple[str, bytes, bool]:
 
     Raises ValueError if contextId is present but not a valid UUID4.
     """
+    envelope = parse_request(body)
+    if envelope.error:
+        raise ValueError(envelope.error)
+    return envelope.context_id, envelope.body, envelope.is_new
+
+
+async def warm_connection(http_client: httpx.AsyncClient, info: SandboxInfo) -> None:
+    """Open a keep-alive connection to a newly ready sandbox, left in the pool for its first request."""
     try:
-        data = json.loads(body)
-        message = data.get("params", {}).get("message", {})
-        context_id = message.get("contextId") or ""
-
-        if isinstance(context_id, str):
-            context_id = context_id.strip()
-
-        if not context_id:
-            # No contextId — generate UUID4 and inject
-            generated = str(uuid.uuid4())
-            if isinstance(data.get("params", {}).get("message"), dict):
-                data["params"]["message"]["contextId"] = generated
-            return generated, json.dumps(data).encode(), True
-
-        # contextId present — must be a valid UUID4
-        if not _is_valid_uuid4(context_id):
-            raise ValueError(
-                f"Invalid contextId '{context_id}': must be a valid UUID4 "
-                "or omitted for auto-generation"
-            )
+        await http_client.get(f"http://{info.address}:8000/health", timeout=WARMUP_TIMEOUT)
+    except httpx.HTTPError as e:
+        # Only an optimization; the first request connects on its own
+        logger.debug("Connection warm-up to sandbox '%s' failed: %s", info.sandbox_name, e)
+
+
+async def probe_sandbox(http_client: httpx.AsyncClient, info: SandboxInfo) -> bool:
+    """Health-probe a sandbox. True if it answered /health with 200."""
+    try:
+        response = await http_client.get(f"http://{info.address}:8000/health")
+    except httpx.HTTPError:
+        return False
+    return response.status_code == 200
 
-        return context_id, body, False
 
-    except (json.JSONDecodeError, AttributeError, TypeError):
-        # Unparseable body — generate UUID4, don't modify body
-        return str(uuid.uuid4()), body, True
+def _header_timeout(config: SchedulerConfig, envelope: RequestEnvelope) -> float | None:
+    """Deadline for the sandbox's response headers, or None to wait as long as PROXY_TIMEOUT.
+
+    A blocking message/send only gets its headers once the agent turn is over,
+    so it has no separate deadline. Streams and other methods answer at once.
+    """
+    if config.response_header_timeout <= 0:
+        return None
+    if envelope.method == "message/send" and envelope.blocking:
+        return None
+    return float(config.response_header_timeout)
 
 
 async def _best_effort_phase(status_updater, phase: str, reason: str, message: str) -> None:
@@ -113,59 +290,193 @@ async def _best_effort_phase(status_updater, phase: str, reason: str, message: s
         logger.warning("Query status update to %s failed; continuing", phase, exc_info=True)
 
 
+async def _run_async_task(
+    sandbox_manager: SandboxManager,
+    http_client: httpx.AsyncClient,
+    task_store: TaskStore,
+    task_id: str,
+    envelope: RequestEnvelope,
+    status_updater: QueryStatusUpdater,
+    headers: dict[str, str],
+    path: str,
+    turn: Turn,
+) -> None:
+    """Provision the sandbox for a new conversation and forward its first message, recording the outcome on the task.
+
+    The conversation's first turn is held until the message has been answered, so
+    a follow-up sent as soon as the task is returned waits behind it.
+    """
+    conversation_id = envelope.context_id
+    with tracer.start_as_current_span(
+        "scheduler.async_task",
+        attributes={"sandbox.conversation_id": conversation_id, "a2a.task_id": task_id},
+    ) as span:
+        stage = "Sandbox provisioning"
+        try:
+            info = await sandbox_manager.create_sandbox(
+                conversation_id, query_ref=envelope.query_ref, template_hint=template_hint(envelope.message),
+            )
+            task_store.set_state(task_id, "working")
+            await _best_effort_phase(status_updater, "running", "QueryRunning", "Query is running")
+            span.set_attribute("sandbox.name", info.sandbox_name)
+
+            stage = "Forwarding to the sandbox"
+            header_timeout = _header_timeout(sandbox_manager._config, envelope)
+
+            def send(target_url: str) -> Awaitable[Response]:
+                return _proxy_request(
+                    http_client, "POST", headers, envelope.body, target_url, conversation_id, header_timeout,
+                )
+
+            try:
+                response = await _buffered(_forward(sandbox_manager, conversation_id, info, path, send))
+            except SandboxRecoveryError:
+                stage = "Sandbox recovery"
+                raise
+            if response.status_code >= 400:
+                raise RuntimeError(f"sandbox answered HTTP {response.status_code}")
+            payload = json.loads(inject_response_context_id(response.body, conversation_id))
+            error = payload.get("error")
+            if error:
+                task_store.set_state(task_id, "failed", _agent_message(conversation_id, error.get("message", str(error))))
+            else:
+                task_store.complete(task_id, payload.get("result") or {})
+
+            try:
+                await sandbox_manager.update_last_activity(conversation_id)
+            except Exception:
+                logger.warning("Failed to update last-activity for conversation=%s", conversation_id, exc_info=True)
+        except asyncio.CancelledError:
+            # Only shutdown cancels these, once drainTimeout has run out
+            metrics.SHUTDOWN_TERMINATED.labels("async_task").inc()
+            task_store.set_state(task_id, "canceled")
+            raise
+        except Exception as e:
+            span.set_status(StatusCode.ERROR, str(e))
+            span.record_exception(e)
+            logger.error("Asynchronous task %s failed for conversation=%s: %s: %s", task_id, conversation_id, stage, e)
+            task_store.set_state(task_id, "failed", _agent_message(conversation_id, f"{stage} failed: {e}"))
+        finally:
+            await turn.release()
+
+
 def create_proxy_app(
     sandbox_manager: SandboxManager,
     http_client: httpx.AsyncClient,
     lifespan: Any = None,
+    task_store: TaskStore | None = None,
+    turn_coordinator: TurnCoordinator | None = None,
+    drainer: Drainer | None = None,
 ) -> FastAPI:
     """Create the FastAPI application with A2A proxy and health endpoints."""
     app = FastAPI(title="Claude Agent SDK Scheduler", lifespan=lifespan)
-
-    @app.get("/health")
-    async def health() -> dict[str, str]:
-        return {"status": "ok"}
-
-    @app.post("/")
-    @app.post("/{path:path}")
-    async def proxy_a2a(request: Request, path: str = "") -> Response:
-        raw_body = await request.body()
-
-        # Extract and parse JSON-RPC id for error responses
-        request_id = None
-        try:
-            request_id = json.loads(raw_body).get("id")
-        except (json.JSONDecodeError, AttributeError):
-            pass
-
-        # Validate and extract contextId
-        try:
-            conversation_id, body, is_new = extract_context_id(raw_body)
-        except ValueError as e:
+    drain = drainer or Drainer(sandbox_manager._config)
+    app.add_middleware(DrainMiddleware, drainer=drain)
+    metrics.IN_FLIGHT_REQUESTS.set_function(lambda: drain.in_flight)
+    tasks = task_store or TaskStore(sandbox_manager._config)
+    turns = turn_coordinator or TurnCoordinator(sandbox_manager._config, sandbox_manager)
+    metrics.TURN_QUEUE_DEPTH.set_function(lambda: turns.queue_depth)
+    replays = ReplayCache(sandbox_manager._config)
+
+    async def get_task(request: Request, envelope: RequestEnvelope, raw_body: bytes, path: str) -> Response | None:
+        """Serve tasks/get for asynchronous tasks. None if the task is not one of ours."""
+        task = tasks.get(envelope.task_id)
+        if task is not None:
+            return Response(content=_jsonrpc_result(envelope.request_id, task), media_type="application/json")
+        owner = tasks.owner_of(envelope.task_id)
+        if owner and owner != tasks.owner and FORWARDED_HEADER not in request.headers:
+            headers = _forward_headers(request)
+            for name in _CREDENTIAL_HEADERS:
+                headers.pop(name, None)
+            headers[FORWARDED_HEADER] = "1"
+            try:
+                upstream = await http_client.post(f"http://{owner}/{path}", content=raw_body, headers=headers)
+                return Response(
+                    content=upstream.content, status_code=upstream.status_code, media_type="application/json",
+                )
+            except httpx.HTTPError:
+                logger.warning("Owner %s of task %s unreachable", owner, envelope.task_id, exc_info=True)
+        if OWNER_SEPARATOR in envelope.task_id or sandbox_manager._config.async_provisioning:
             return Response(
-                content=_jsonrpc_error(request_id, -32602, str(e)),
-                status_code=400,
+                content=_jsonrpc_error(envelope.request_id, -32001, "Task not found"),
+                status_code=404,
                 media_type="application/json",
             )
+        return None
+
+    async def route(request: Request, envelope: RequestEnvelope, path: str) -> Response:
+        """Route a parsed A2A request to its conversation's sandbox and forward it."""
+        request_id = envelope.request_id
+        conversation_id, body, is_new = envelope.context_id, envelope.body, envelope.is_new
 
         # Extract incoming trace context
         ctx = extract(carrier=dict(request.headers))
         token = attach(ctx)
+        turn: Turn | None = None
 
         try:
             with tracer.start_as_current_span(
                 "scheduler.route",
                 attributes={"sandbox.conversation_id": conversation_id, "sandbox.is_new": is_new},
             ) as route_span:
-                query_ref = _extract_query_ref_from_body(raw_body) if is_new else None
+                if is_new and drain.draining:
+                    # Existing conversations finish here; new ones start on a replica that is staying
+                    route_span.set_status(StatusCode.ERROR, "Scheduler is shutting down")
+                    return Response(
+                        content=_jsonrpc_error(request_id, -32000, "Scheduler is shutting down; retry the request"),
+                        status_code=503,
+                        media_type="application/json",
+                        headers={"Retry-After": str(DRAIN_RETRY_AFTER)},
+                    )
+
+                query_ref = envelope.query_ref if is_new else None
                 status_updater = QueryStatusUpdater(query_ref)
 
+                if (
+                    is_new
+                    and envelope.method == "message/send"
+                    and not envelope.blocking
+                    and sandbox_manager._config.async_provisioning
+                ):
+                    # Answer with a submitted task now; provisioning and the agent run continue in the background
+                    await _best_effort_phase(
+                        status_updater, "provisioning", "ExecutorProvisioning", "Provisioning sandbox",
+                    )
+                    task = tasks.create(conversation_id, envelope.message)
+                    # A conversation minted just now has no other turns and no claim yet, so this cannot wait
+                    first_turn = await turns.acquire(conversation_id, cluster=False)
+                    job = asyncio.create_task(_run_async_task(
+                        sandbox_manager, http_client, tasks, task["id"], envelope, status_updater,
+                        _forward_headers(request), path, first_turn,
+                    ))
+                    tasks.track(task["id"], job)
+                    drain.begin()
+                    job.add_done_callback(lambda _: drain.end())
+                    route_span.set_attribute("a2a.task_id", task["id"])
+                    return Response(content=_jsonrpc_result(request_id, task), media_type="application/json")
+
+                if not is_new and envelope.message is not None:
+                    # One turn at a time per conversation: later messages wait for the response to finish
+                    try:
+                        turn = await turns.acquire(conversation_id)
+                    except TurnRejectedError as e:
+                        route_span.set_status(StatusCode.ERROR, str(e))
+                        return Response(
+                            content=_jsonrpc_error(request_id, -32000, str(e)),
+                            status_code=429,
+                            media_type="application/json",
+                            headers={"Retry-After": str(e.retry_after)},
+                        )
+
                 # Route to sandbox based on session type
                 try:
                     if is_new:
                         await _best_effort_phase(
                             status_updater, "provisioning", "ExecutorProvisioning", "Provisioning sandbox",
                         )
-                        info = await sandbox_manager.create_sandbox(conversation_id)
+                        info = await sandbox_manager.create_sandbox(
+                            conversation_id, query_ref=query_ref, template_hint=template_hint(envelope.message),
+                        )
                         await _best_effort_phase(
                             status_updater, "running", "QueryRunning", "Query is running",
                         )
@@ -183,7 +494,7 @@ def create_proxy_app(
                         content=_jsonrpc_error(request_id, -32000, str(e)),
                         status_code=503,
                         media_type="application/json",
-                        headers={"Retry-After": "30"},
+                        headers={"Retry-After": str(e.retry_after)},
                     )
                 except Exception as e:
                     route_span.set_status(StatusCode.ERROR, str(e))
@@ -199,39 +510,24 @@ def create_proxy_app(
                 route_span.set_attribute("sandbox.is_new", is_new)
 
                 # Forward request to sandbox
-                target_url = f"http://{info.service_fqdn}:8000/{path}"
-                try:
-                    response = await _proxy_request(http_client, request, body, target_url)
+                headers = _forward_headers(request)
+                header_timeout = _header_timeout(sandbox_manager._config, envelope)
 
-                    # Update last-activity annotation
-                    try:
-                        await sandbox_manager.update_last_activity(conversation_id)
-                    except Exception:
-                        logger.warning("Failed to update last-activity for conversation=%s", conversation_id, exc_info=True)
-
-                    response.body = _inject_context_id(response.body, conversation_id)
-                    return response
-                except httpx.ConnectError as e:
-                    # Sandbox unreachable — attempt recovery
-                    logger.warning(
-                        "Sandbox unreachable for conversation=%s, attempting recovery: %s",
-                        conversation_id,
-                        e,
+                def send(target_url: str) -> Awaitable[Response]:
+                    return _proxy_request(
+                        http_client, request.method, headers, body, target_url, conversation_id, header_timeout,
+                    )
+
+                try:
+                    response = await _forward(sandbox_manager, conversation_id, info, path, send)
+                except SandboxRecoveryError as e:
+                    route_span.set_status(StatusCode.ERROR, str(e))
+                    route_span.record_exception(e)
+                    return Response(
+                        content=_jsonrpc_error(request_id, -32603, f"Sandbox recovery failed: {e}"),
+                        status_code=502,
+                        media_type="application/json",
                     )
-                    try:
-                        info = await sandbox_manager.recover_sandbox(conversation_id)
-                        target_url = f"http://{info.service_fqdn}:8000/{path}"
-                        response = await _proxy_request(http_client, request, body, target_url)
-                        response.body = _inject_context_id(response.body, conversation_id)
-                        return response
-                    except Exception as recovery_err:
-                        route_span.set_status(StatusCode.ERROR, str(recovery_err))
-                        route_span.record_exception(recovery_err)
-                        return Response(
-                            content=_jsonrpc_error(request_id, -32603, f"Sandbox recovery failed: {recovery_err}"),
-                            status_code=502,
-                            media_type="application/json",
-                        )
                 except Exception as e:
                     route_span.set_status(StatusCode.ERROR, str(e))
                     route_span.record_exception(e)
@@ -240,50 +536,153 @@ def create_proxy_app(
                         status_code=502,
                         media_type="application/json",
                     )
+
+                # Update last-activity annotation
+                try:
+                    await sandbox_manager.update_last_activity(conversation_id)
+                except Exception:
+                    logger.warning("Failed to update last-activity for conversation=%s", conversation_id, exc_info=True)
+
+                if turn is not None:
+                    response, turn = _hold_turn(response, turn), None
+                return response
         finally:
+            if turn is not None:
+                await turn.release()
             detach(token)
 
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    async def ready() -> Response:
+        # Failing readiness takes a draining replica out of the Service endpoints
+        if drain.draining:
+            return Response(content=json.dumps({"status": "draining"}), status_code=503, media_type="application/json")
+        return Response(content=json.dumps({"status": "ok"}), media_type="application/json")
+
+    @app.get("/debug/sandboxes")
+    async def debug_sandboxes() -> dict[str, Any]:
+        return await sandbox_manager.describe_sandboxes()
+
+    @app.get("/metrics")
+    async def prometheus_metrics() -> Response:
+        content, content_type = metrics.render()
+        return Response(content=content, media_type=content_type)
+
+    @app.post("/")
+    @app.post("/{path:path}")
+    async def proxy_a2a(request: Request, path: str = "") -> Response:
+        raw_body = await request.body()
+
+        # One parse for the JSON-RPC id, contextId and QueryRef
+        envelope = parse_request(raw_body)
+        request_id = envelope.request_id
+        if envelope.error:
+            return Response(
+                content=_jsonrpc_error(request_id, -32602, envelope.error),
+                status_code=400,
+                media_type="application/json",
+            )
+
+        if envelope.method == "tasks/get" and envelope.task_id:
+            task_response = await get_task(request, envelope, raw_body, path)
+            if task_response is not None:
+                return task_response
+
+        key = replay_key(request.headers, envelope, raw_body) if sandbox_manager._config.replay_ttl > 0 else ""
+        if not key:
+            return await route(request, envelope, path)
+        # A retried message/send shares the call still in flight, or gets its response while it is cached
+        response, replayed = await replays.do(key, lambda: _buffered(route(request, envelope, path)))
+        return response.to_response(replayed)
+
     return app
 
 
+async def _forward(
+    sandbox_manager: SandboxManager,
+    conversation_id: str,
+    info: SandboxInfo,
+    path: str,
+    send: Callable[[str], Awaitable[Response]],
+) -> Response:
+    """Forward to the conversation's sandbox with send(target_url), recovering the sandbox once if needed.
+
+    A sandbox that is unreachable, hung or failing health checks is recovered
+    and the request sent again. Raises SandboxRecoveryError if recovery or the
+    retried forward fails; other forward errors propagate.
+    """
+    try:
+        if not sandbox_manager.is_healthy(info):
+            raise SandboxUnhealthyError(f"sandbox '{info.sandbox_name}' is failing health checks")
+        sandbox_manager.record_forwarded(conversation_id)
+        try:
+            response = await send(f"http://{info.address}:8000/{path}")
+        except (httpx.ConnectError, ResponseHeaderTimeout):
+            sandbox_manager.record_forward_result(info, ok=False)
+            raise
+        sandbox_manager.record_forward_result(info, ok=True)
+        return response
+    except (httpx.ConnectError, ResponseHeaderTimeout, SandboxUnhealthyError) as e:
+        logger.warning("Sandbox unavailable for conversation=%s, attempting recovery: %s", conversation_id, e)
+        try:
+            # A single timeout may be transient, so a sandbox Kubernetes reports Ready is only replaced
+            # once its circuit is open, from probes or repeated forward failures
+            force = not sandbox_manager.is_healthy(info)
+            info = await sandbox_manager.recover_sandbox(conversation_id, force=force)
+            sandbox_manager.record_forwarded(conversation_id)
+            response = await send(f"http://{info.address}:8000/{path}")
+        except Exception as recovery_err:
+            metrics.RECOVERY_ATTEMPTS.labels("error").inc()
+            raise SandboxRecoveryError(str(recovery_err)) from recovery_err
+        metrics.RECOVERY_ATTEMPTS.labels("ok").inc()
+        return response
+
+
 async def _proxy_request(
     http_client: httpx.AsyncClient,
-    request: Request,
+    method: str,
+    headers: dict[str, str],
     body: bytes,
     target_url: str,
+    context_id: str,
+    header_timeout: float | None = None,
 ) -> Response:
-    """Forward HTTP request to sandbox and relay response."""
+    """Forward HTTP request to sandbox and stream the response back as it arrives.
+
+    Raises ResponseHeaderTimeout if header_timeout passes before the response headers arrive.
+    """
     with tracer.start_as_current_span(
         "scheduler.proxy.forward",
         attributes={"http.url": target_url},
     ) as proxy_span:
-        # Build forwarded headers — drop hop-by-hop and length headers
-        # httpx recalculates Content-Length from the body we pass
-        headers = dict(request.headers)
-        headers.pop("host", None)
-        headers.pop("content-length", None)
-        headers.pop("transfer-encoding", None)
-
         # Inject OTEL trace context into outgoing headers
+        headers = dict(headers)
         inject(carrier=headers)
 
-        upstream_response = await http_client.request(
-            method=request.method,
+        # send(stream=True) returns as soon as the response headers arrive; the
+        # body is relayed chunk by chunk instead of being buffered in memory
+        upstream_request = http_client.build_request(
+            method=method,
             url=target_url,
             content=body,
             headers=headers,
         )
+        start = time.monotonic()
+        try:
+            upstream_response = await asyncio.wait_for(
+                http_client.send(upstream_request, stream=True), header_timeout,
+            )
+        except TimeoutError as e:
+            metrics.PROXY_FORWARD_SECONDS.labels("timeout").observe(time.monotonic() - start)
+            raise ResponseHeaderTimeout(f"no response headers within {header_timeout:g}s") from e
+        except Exception:
+            metrics.PROXY_FORWARD_SECONDS.labels("error").observe(time.monotonic() - start)
+            raise
+        metrics.PROXY_FORWARD_SECONDS.labels("ok").observe(time.monotonic() - start)
 
         proxy_span.set_attribute("http.status_code", upstream_response.status_code)
 
-        # Build response headers, excluding transfer-encoding (handled by ASGI)
-        response_headers = dict(upstream_response.headers)
-        response_headers.pop("transfer-encoding", None)
-        response_headers.pop("content-length", None)
-
-        return Response(
-            content=upstream_response.content,
-            status_code=upstream_response.status_code,
-            headers=response_headers,
-            media_type=upstream_response.headers.get("content-type"),
-        )
+        return _UpstreamStreamingResponse(upstream_response, context_id)
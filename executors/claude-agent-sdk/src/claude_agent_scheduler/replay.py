@@ -0,0 +1,118 @@
+"""Idempotent replay of responses to retried A2A message/send requests."""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+
+from fastapi import Response
+
+from . import metrics
+from .config import SchedulerConfig
+from .envelope import RequestEnvelope
+from .singleflight import SingleFlight
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "x-scheduler-replayed"  # set on responses served from the replay cache or a shared call
+
+
+@dataclass
+class BufferedResponse:
+    """A fully read response that can be sent to any number of callers."""
+
+    status_code: int
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def to_response(self, replayed: bool = False) -> Response:
+        headers = dict(self.headers)
+        if replayed:
+            headers[REPLAYED_HEADER] = "true"
+        return Response(content=self.body, status_code=self.status_code, headers=headers)
+
+
+def replay_key(headers: Mapping[str, str], envelope: RequestEnvelope, raw_body: bytes) -> str:
+    """Key identifying retries of a message/send, or "" if it cannot be deduplicated safely.
+
+    The key is the Idempotency-Key header if sent, else the contextId and
+    JSON-RPC id. A digest of the body is always part of it, so a different
+    message that reuses an id is never answered with another message's
+    response. A new conversation without the header is not deduplicated: its
+    contextId is generated per attempt, and identical first messages from
+    different clients must not share a response.
+    """
+    if envelope.method != "message/send" or envelope.message is None:
+        return ""
+    explicit = headers.get(IDEMPOTENCY_HEADER, "")
+    if explicit:
+        scope = f"key:{explicit}"
+    elif envelope.is_new or envelope.request_id is None:
+        return ""
+    else:
+        scope = f"context:{envelope.context_id}:{json.dumps(envelope.request_id)}"
+    return f"{scope}:{hashlib.sha256(raw_body).hexdigest()}"
+
+
+class ReplayCache:
+    """Completed message/send responses by replay key, plus the calls still producing them.
+
+    A retry that arrives while the original is in flight waits for the same
+    upstream call. One that arrives after it finished gets the stored response
+    for replay_ttl seconds. Only 2xx responses are stored, so a retry after a
+    failure is forwarded again. Stored bodies are capped at replay_cache_bytes
+    in total, dropping the oldest first.
+    """
+
+    def __init__(self, config: SchedulerConfig) -> None:
+        self._config = config
+        self._entries: OrderedDict[str, tuple[BufferedResponse, float]] = OrderedDict()
+        self._bytes = 0
+        self._flights = SingleFlight()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[BufferedResponse]]) -> tuple[BufferedResponse, bool]:
+        """The response for key, from the cache, a call in flight or fn. Also whether it was replayed."""
+        cached = self._get(key)
+        if cached is not None:
+            metrics.REPLAYED_REQUESTS.labels("cache").inc()
+            return cached, True
+        joined = self._flights.in_flight(key)
+        if joined:
+            metrics.REPLAYED_REQUESTS.labels("in_flight").inc()
+        return await self._flights.do(key, lambda: self._run(key, fn)), joined
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[BufferedResponse]]) -> BufferedResponse:
+        response = await fn()
+        if 200 <= response.status_code < 300:
+            self._put(key, response)
+        return response
+
+    def _get(self, key: str) -> BufferedResponse | None:
+        self._prune()
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def _put(self, key: str, response: BufferedResponse) -> None:
+        size = len(response.body)
+        if size > self._config.replay_cache_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (response, time.monotonic())
+        self._bytes += size
+        while self._bytes > self._config.replay_cache_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0].body)
+
+    def _prune(self) -> None:
+        # Entries are in insertion order, so expired ones are at the front
+        cutoff = time.monotonic() - self._config.replay_ttl
+        while self._entries:
+            key, (_, stored) = next(iter(self._entries.items()))
+            if stored >= cutoff:
+                break
+            self._drop(key)
@@ -1,17 +1,31 @@
 """Sandbox lifecycle management with K8s-native state and local cache."""
 
 import asyncio
+import json
 import logging
 import time
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 
+from ark_sdk.extensions.query import QueryRef
 from kubernetes_asyncio import client, config, watch
 from opentelemetry import trace
 from opentelemetry.trace import StatusCode
 
+from . import metrics
+from .activity import ActivityWriter
+from .admission import AdmissionController, SandboxCapacityError
 from .config import SchedulerConfig
+from .health import SandboxHealth
+from .informer import ResourceDeletedError, ResourceIndex
+from .leader import LeaseElector
+from .pool import LABEL_POOL, ClaimPool
+from .singleflight import SingleFlight
+from .templates import needs_query, rule_for, select_template, template_of
+from .timeline import ANNOTATION_TIMELINE, ProvisioningTimelines, as_iso, decode, encode, phase_durations
 
 logger = logging.getLogger(__name__)
 
@@ -26,16 +40,24 @@ CLAIM_API_GROUP = "extensions.agents.x-k8s.io"
 CLAIM_API_VERSION = "v1alpha1"
 CLAIM_PLURAL = "sandboxclaims"
 
+ARK_API_GROUP = "ark.mckinsey.com"
+ARK_API_VERSION = "v1alpha1"
+QUERY_PLURAL = "queries"
+
 LABEL_CONVERSATION_ID = "ark.mckinsey.com/conversation-id"
 LABEL_MANAGED_BY = "ark.mckinsey.com/managed-by"
 MANAGED_BY_VALUE = "claude-agent-sdk-scheduler"
+LABEL_AGENT = "ark.mckinsey.com/agent"
 ANNOTATION_LAST_ACTIVITY = "ark.mckinsey.com/last-activity"
+ANNOTATION_TURN = "ark.mckinsey.com/turn"
+MANAGED_SELECTOR = f"{LABEL_MANAGED_BY}={MANAGED_BY_VALUE}"
 
 CACHE_TTL = 5.0  # seconds
-
-
-class SandboxCapacityError(Exception):
-    """Raised when sandbox creation is rejected due to capacity limits."""
+INDEX_SYNC_TIMEOUT = 10.0  # seconds to wait for the claim/sandbox indexes on startup
+TURN_LEASE_DURATION = 90  # seconds a turn lease outlives its last renewal, e.g. after a replica crash
+TURN_LEASE_POLL_INTERVAL = 1.0  # seconds between lease checks while the claim index is not synced
+HEALTH_CHECK_IDLE_POLL = 30.0  # seconds between checks for a re-enabled healthCheckInterval while probing is off
+HEALTH_CHECK_CONCURRENCY = 32  # health probes in flight at once
 
 
 @dataclass
@@ -45,6 +67,42 @@ class SandboxInfo:
     claim_name: str
     sandbox_name: str
     service_fqdn: str
+    pod_ip: str = ""
+
+    @property
+    def address(self) -> str:
+        """Host to connect to: the pod IP when routing by IP, else the Service FQDN."""
+        if not self.pod_ip:
+            return self.service_fqdn
+        return f"[{self.pod_ip}]" if ":" in self.pod_ip else self.pod_ip
+
+
+def _turn_lease_of(claim: dict) -> tuple[str, float]:  # type: ignore[type-arg]
+    """Holder and expiry (epoch seconds) of the claim's turn lease, or ("", 0) if there is none."""
+    raw = claim.get("metadata", {}).get("annotations", {}).get(ANNOTATION_TURN, "")
+    try:
+        lease = json.loads(raw) if raw else {}
+        return str(lease.get("holder", "")), float(lease.get("expires", 0))
+    except (ValueError, TypeError, AttributeError):
+        return "", 0.0
+
+
+def _pod_ip_of(sandbox: dict) -> str:  # type: ignore[type-arg]
+    """First pod IP reported in Sandbox status, or "" if none is reported."""
+    status = sandbox.get("status", {})
+    ips = status.get("podIPs") or []
+    first = ips[0] if ips else status.get("podIP", "")
+    return str(first.get("ip", "") if isinstance(first, dict) else first or "")
+
+
+def _is_pooled(claim: dict) -> bool:  # type: ignore[type-arg]
+    return LABEL_POOL in claim.get("metadata", {}).get("labels", {})
+
+
+def _sandbox_name_of(claim: dict) -> str:  # type: ignore[type-arg]
+    """Sandbox name bound to a claim, or "" while the claim is still pending."""
+    sandbox_status = claim.get("status", {}).get("sandbox", {})
+    return sandbox_status.get("name", "") or sandbox_status.get("Name", "")
 
 
 # ---------------------------------------------------------------------------
@@ -61,11 +119,14 @@ class SandboxCache:
     def get(self, conversation_id: str) -> SandboxInfo | None:
         entry = self._entries.get(conversation_id)
         if entry is None:
+            metrics.CACHE_LOOKUPS.labels("miss").inc()
             return None
         info, ts = entry
         if (time.monotonic() - ts) > self._ttl:
             del self._entries[conversation_id]
+            metrics.CACHE_LOOKUPS.labels("expired").inc()
             return None
+        metrics.CACHE_LOOKUPS.labels("hit").inc()
         return info
 
     def put(self, conversation_id: str, info: SandboxInfo) -> None:
@@ -74,6 +135,11 @@ class SandboxCache:
     def evict(self, conversation_id: str) -> None:
         self._entries.pop(conversation_id, None)
 
+    def evict_sandbox(self, sandbox_name: str) -> None:
+        """Drop every entry routed to sandbox_name. Linear, so only for rare events like a pod IP change."""
+        for cid in [cid for cid, (info, _) in self._entries.items() if info.sandbox_name == sandbox_name]:
+            del self._entries[cid]
+
     def warm(self, items: dict[str, SandboxInfo]) -> None:
         now = time.monotonic()
         for cid, info in items.items():
@@ -129,6 +195,7 @@ class _AsyncK8sHelper:
             "spec": {"sandboxTemplateRef": {"name": template}},
         }
         logger.info("Creating SandboxClaim '%s' (template=%s)", name, template)
+        metrics.K8S_API_CALLS.labels("create", CLAIM_PLURAL).inc()
         return await self._custom.create_namespaced_custom_object(
             group=CLAIM_API_GROUP, version=CLAIM_API_VERSION,
             namespace=namespace, plural=CLAIM_PLURAL, body=manifest,
@@ -139,6 +206,7 @@ class _AsyncK8sHelper:
         await self._ensure_initialized()
         assert self._custom is not None
         try:
+            metrics.K8S_API_CALLS.labels("get", CLAIM_PLURAL).inc()
             return await self._custom.get_namespaced_custom_object(
                 group=CLAIM_API_GROUP, version=CLAIM_API_VERSION,
                 namespace=namespace, plural=CLAIM_PLURAL, name=name,
@@ -148,12 +216,47 @@ class _AsyncK8sHelper:
                 return None
             raise
 
-    async def patch_claim_annotation(self, name: str, namespace: str, annotations: dict[str, str]) -> None:
-        """PATCH annotations on a SandboxClaim using merge-patch."""
+    async def patch_claim_annotation(
+        self, name: str, namespace: str, annotations: dict[str, str | None], resource_version: str = "",
+    ) -> dict:  # type: ignore[type-arg]
+        """PATCH annotations on a SandboxClaim using merge-patch. None removes an annotation.
+
+        A resource_version makes the PATCH conditional: it fails with 409 if the
+        claim changed since it was read.
+        """
         await self._ensure_initialized()
         assert self._custom is not None
-        patch = {"metadata": {"annotations": annotations}}
-        await self._custom.patch_namespaced_custom_object(
+        metadata: dict[str, object] = {"annotations": annotations}
+        if resource_version:
+            metadata["resourceVersion"] = resource_version
+        patch = {"metadata": metadata}
+        metrics.K8S_API_CALLS.labels("patch", CLAIM_PLURAL).inc()
+        return await self._custom.patch_namespaced_custom_object(
+            group=CLAIM_API_GROUP, version=CLAIM_API_VERSION,
+            namespace=namespace, plural=CLAIM_PLURAL, name=name, body=patch,
+            _content_type="application/merge-patch+json",
+        )
+
+    async def bind_sandbox_claim(
+        self, name: str, namespace: str, resource_version: str, labels: dict[str, str | None],
+    ) -> dict:  # type: ignore[type-arg]
+        """Relabel a pooled SandboxClaim for a conversation using merge-patch.
+
+        The resourceVersion is a precondition: the PATCH fails with 409 if the
+        claim changed since it was read, e.g. because another replica bound it.
+        """
+        await self._ensure_initialized()
+        assert self._custom is not None
+        now = datetime.now(timezone.utc).isoformat()
+        patch = {
+            "metadata": {
+                "resourceVersion": resource_version,
+                "labels": labels,
+                "annotations": {ANNOTATION_LAST_ACTIVITY: now},
+            },
+        }
+        metrics.K8S_API_CALLS.labels("patch", CLAIM_PLURAL).inc()
+        return await self._custom.patch_namespaced_custom_object(
             group=CLAIM_API_GROUP, version=CLAIM_API_VERSION,
             namespace=namespace, plural=CLAIM_PLURAL, name=name, body=patch,
             _content_type="application/merge-patch+json",
@@ -163,6 +266,7 @@ class _AsyncK8sHelper:
         """LIST SandboxClaims matching a label selector."""
         await self._ensure_initialized()
         assert self._custom is not None
+        metrics.K8S_API_CALLS.labels("list", CLAIM_PLURAL).inc()
         response = await self._custom.list_namespaced_custom_object(
             group=CLAIM_API_GROUP, version=CLAIM_API_VERSION,
             namespace=namespace, plural=CLAIM_PLURAL,
@@ -170,6 +274,48 @@ class _AsyncK8sHelper:
         )
         return response.get("items", [])
 
+    async def list_custom_objects(
+        self, group: str, version: str, plural: str, namespace: str, label_selector: str = "",
+    ) -> dict:  # type: ignore[type-arg]
+        """LIST custom objects, returning the raw list response (items + list resourceVersion)."""
+        await self._ensure_initialized()
+        assert self._custom is not None
+        metrics.K8S_API_CALLS.labels("list", plural).inc()
+        return await self._custom.list_namespaced_custom_object(
+            group=group, version=version, namespace=namespace, plural=plural,
+            label_selector=label_selector,
+        )
+
+    async def watch_custom_objects(
+        self,
+        group: str,
+        version: str,
+        plural: str,
+        namespace: str,
+        resource_version: str,
+        timeout: int,
+        label_selector: str = "",
+    ) -> AsyncIterator[dict]:  # type: ignore[type-arg]
+        """Stream watch events from resource_version until the server-side timeout.
+
+        Raises ApiException(410) when resource_version is too old — the caller must relist.
+        """
+        await self._ensure_initialized()
+        assert self._custom is not None
+        w = watch.Watch()
+        try:
+            metrics.K8S_API_CALLS.labels("watch", plural).inc()
+            async for event in w.stream(
+                self._custom.list_namespaced_custom_object,
+                namespace=namespace, group=group, version=version, plural=plural,
+                label_selector=label_selector, resource_version=resource_version,
+                allow_watch_bookmarks=True, timeout_seconds=timeout,
+            ):
+                if event is not None:
+                    yield event
+        finally:
+            await w.close()
+
     async def resolve_sandbox_name(self, claim_name: str, namespace: str, timeout: int) -> str:
         await self._ensure_initialized()
         assert self._custom is not None
@@ -181,6 +327,7 @@ class _AsyncK8sHelper:
                 raise TimeoutError(f"Could not resolve sandbox name from claim '{claim_name}' within {timeout}s")
             w = watch.Watch()
             try:
+                metrics.K8S_API_CALLS.labels("watch", CLAIM_PLURAL).inc()
                 async for event in w.stream(
                     self._custom.list_namespaced_custom_object,
                     namespace=namespace, group=CLAIM_API_GROUP,
@@ -212,6 +359,7 @@ class _AsyncK8sHelper:
                 raise TimeoutError(f"Sandbox '{name}' did not become ready within {timeout}s")
             w = watch.Watch()
             try:
+                metrics.K8S_API_CALLS.labels("watch", SANDBOX_PLURAL).inc()
                 async for event in w.stream(
                     self._custom.list_namespaced_custom_object,
                     namespace=namespace, group=SANDBOX_API_GROUP,
@@ -236,6 +384,7 @@ class _AsyncK8sHelper:
         await self._ensure_initialized()
         assert self._custom is not None
         try:
+            metrics.K8S_API_CALLS.labels("get", SANDBOX_PLURAL).inc()
             return await self._custom.get_namespaced_custom_object(
                 group=SANDBOX_API_GROUP, version=SANDBOX_API_VERSION,
                 namespace=namespace, plural=SANDBOX_PLURAL, name=name,
@@ -245,11 +394,26 @@ class _AsyncK8sHelper:
                 return None
             raise
 
+    async def get_query(self, name: str, namespace: str) -> dict | None:  # type: ignore[type-arg]
+        await self._ensure_initialized()
+        assert self._custom is not None
+        try:
+            metrics.K8S_API_CALLS.labels("get", QUERY_PLURAL).inc()
+            return await self._custom.get_namespaced_custom_object(
+                group=ARK_API_GROUP, version=ARK_API_VERSION,
+                namespace=namespace, plural=QUERY_PLURAL, name=name,
+            )
+        except client.ApiException as e:
+            if e.status == 404:
+                return None
+            raise
+
     async def delete_sandbox_claim(self, name: str, namespace: str) -> None:
         """Delete a SandboxClaim. 404 is treated as success."""
         await self._ensure_initialized()
         assert self._custom is not None
         try:
+            metrics.K8S_API_CALLS.labels("delete", CLAIM_PLURAL).inc()
             await self._custom.delete_namespaced_custom_object(
                 group=CLAIM_API_GROUP, version=CLAIM_API_VERSION,
                 namespace=namespace, plural=CLAIM_PLURAL, name=name,
@@ -273,10 +437,64 @@ class _AsyncK8sHelper:
 class SandboxManager:
     """Manages per-conversation sandbox lifecycle with K8s-native state."""
 
-    def __init__(self, config: SchedulerConfig) -> None:
+    def __init__(
+        self,
+        config: SchedulerConfig,
+        connection_warmer: Callable[[SandboxInfo], Awaitable[None]] | None = None,
+        health_prober: Callable[[SandboxInfo], Awaitable[bool]] | None = None,
+    ) -> None:
         self._config = config
         self._k8s = _AsyncK8sHelper()
         self._cache = SandboxCache()
+        self._claims: ResourceIndex | None = None
+        self._sandboxes: ResourceIndex | None = None
+        self._admission: AdmissionController | None = None
+        # Per-template admission for rules with their own maxActiveSandboxes, created on first use
+        self._template_admission: dict[str, AdmissionController] = {}
+        self._pool: ClaimPool | None = None
+        # Conversations served by a pooled claim, whose name is not derived from the conversation ID
+        self._bound: dict[str, str] = {}
+        self._activity = ActivityWriter(self._k8s, config, ANNOTATION_LAST_ACTIVITY)
+        # Concurrent requests for one conversation share a single K8s round trip or provisioning flow
+        self._flights = SingleFlight()
+        # Claims being deleted by capacity eviction, until their DELETED event arrives
+        self._evicting: set[str] = set()
+        # Last pod IP seen per ready sandbox, to invalidate routes when it changes
+        self._pod_ips: dict[str, str] = {}
+        self._connection_warmer = connection_warmer
+        self._warming: set[asyncio.Task[None]] = set()
+        self._timelines = ProvisioningTimelines()
+        self._health = SandboxHealth(config)
+        self._health_prober = health_prober
+        self._recovering: set[asyncio.Task[None]] = set()
+
+    async def start(self) -> None:
+        """Start the claim and sandbox indexes that serve lookups, admission and reaping from memory."""
+        namespace = self._config.namespace
+        self._claims = ResourceIndex(
+            self._k8s, CLAIM_API_GROUP, CLAIM_API_VERSION, CLAIM_PLURAL, namespace, label_selector=MANAGED_SELECTOR,
+        )
+        self._sandboxes = ResourceIndex(self._k8s, SANDBOX_API_GROUP, SANDBOX_API_VERSION, SANDBOX_PLURAL, namespace)
+        self._pool = ClaimPool(
+            self._k8s, self._config, self._claims, self._sandboxes, self._is_sandbox_ready,
+            labels={LABEL_MANAGED_BY: MANAGED_BY_VALUE}, headroom=self._pool_headroom,
+        )
+        self._admission = AdmissionController(self._config, self._claims, unassigned=self._pool.unassigned)
+        self._claims.add_handler(self._on_claim_event)
+        self._claims.add_handler(self._admission.on_claim_event)
+        self._claims.add_handler(self._pool.on_claim_event)
+        self._sandboxes.add_handler(self._on_sandbox_event)
+        claims, admission, pool = self._claims, self._admission, self._pool
+        metrics.ACTIVE_SANDBOXES.set_function(lambda: len(claims) - pool.unassigned())
+        metrics.ADMISSION_QUEUE_DEPTH.set_function(lambda: admission.queue_depth)
+        metrics.CLAIM_POOL_DEPTH.set_function(pool.depth)
+        health = self._health
+        metrics.OPEN_CIRCUITS.set_function(lambda: health.open_count)
+        self._activity.start()
+        await asyncio.gather(
+            self._claims.start(INDEX_SYNC_TIMEOUT),
+            self._sandboxes.start(INDEX_SYNC_TIMEOUT),
+        )
 
     def _service_fqdn(self, sandbox_name: str) -> str:
         return f"{sandbox_name}.{self._config.namespace}.svc.cluster.local"
@@ -287,6 +505,10 @@ class SandboxManager:
         suffix = uuid.uuid5(uuid.NAMESPACE_URL, conversation_id).hex[:8]
         return f"sched-{short}-{suffix}"
 
+    def _claim_name_of(self, conversation_id: str) -> str:
+        """Name of the claim serving the conversation: a bound pooled claim, else the deterministic name."""
+        return self._bound.get(conversation_id) or self._claim_name(conversation_id)
+
     async def get_sandbox(self, conversation_id: str) -> SandboxInfo | None:
         """Look up an existing sandbox for the conversation. Returns None if not found."""
         # 1. Check local cache
@@ -294,49 +516,197 @@ class SandboxManager:
         if cached:
             return cached
 
-        claim_name = self._claim_name(conversation_id)
+        return await self._flights.do(f"get:{conversation_id}", lambda: self._lookup_sandbox(conversation_id))
+
+    async def _lookup_sandbox(self, conversation_id: str) -> SandboxInfo | None:
+        claim_name = self._claim_name_of(conversation_id)
         namespace = self._config.namespace
 
-        # 2. Check K8s — GET by deterministic name
-        claim = await self._k8s.get_sandbox_claim(claim_name, namespace)
+        # 2. Check the claim index, or K8s (GET by name) until the index has synced.
+        # The index watches every managed claim, pooled claims bound by other
+        # replicas included, so a miss there means the conversation has none.
+        claims = self._synced_index(self._claims)
+        if claims is not None:
+            claim = claims.get(claim_name)
+        else:
+            claim = await self._k8s.get_sandbox_claim(claim_name, namespace)
         if claim:
             info = self._info_from_claim(claim)
             if info:
                 self._cache.put(conversation_id, info)
-                await self._patch_last_activity(claim_name, namespace)
+                self._activity.record(info.claim_name)
                 return info
 
         return None
 
-    async def create_sandbox(self, conversation_id: str) -> SandboxInfo:
-        """Create a new sandbox for the conversation. Checks admission control."""
-        claim_name = self._claim_name(conversation_id)
-        namespace = self._config.namespace
-        deadline = time.monotonic() + self._config.sandbox_ready_timeout
+    async def create_sandbox(
+        self, conversation_id: str, query_ref: QueryRef | None = None, template_hint: str = "", agent_hint: str = "",
+    ) -> SandboxInfo:
+        """Create a new sandbox for the conversation. Checks admission control.
+
+        The SandboxTemplate is chosen by the sandbox_templates rules from the
+        Query's agent and annotations and the client's template_hint. While at
+        capacity, queued requests are admitted round-robin across query namespaces,
+        and across agents within a namespace when the agent is known. agent_hint
+        stands in for the Query's agent when there is no Query to read, as when a
+        sandbox is recreated by recovery.
+        """
+        return await self._flights.do(
+            f"create:{conversation_id}",
+            lambda: self._create_sandbox(conversation_id, query_ref, template_hint, agent_hint),
+        )
 
-        # Admission control
-        if self._config.max_active_sandboxes > 0:
-            claims = await self._k8s.list_sandbox_claims(
-                namespace, f"{LABEL_MANAGED_BY}={MANAGED_BY_VALUE}"
+    async def _create_sandbox(
+        self, conversation_id: str, query_ref: QueryRef | None, template_hint: str, agent_hint: str,
+    ) -> SandboxInfo:
+        claim_name = self._claim_name(conversation_id)
+        self._timelines.start(conversation_id)
+        reserved = False
+        template_admission: AdmissionController | None = None
+        try:
+            agent, annotations = agent_hint, {}
+            if query_ref is not None and (self._config.eviction_protected_agents or needs_query(self._config)):
+                agent, annotations = await self._read_query(query_ref)
+            fairness_key = "/".join(part for part in (query_ref.namespace if query_ref else "", agent) if part)
+            template = select_template(self._config, agent, annotations, template_hint)
+            template_admission = await self._admit_template(claim_name, fairness_key, template)
+            reserved = await self._admit(claim_name, fairness_key)
+            if template == self._config.sandbox_template:
+                info = await self._bind_pooled(conversation_id, agent)
+                if info is not None:
+                    return info
+            return await self._provision_sandbox(conversation_id, claim_name, agent, template)
+        except BaseException:
+            self._timelines.discard(conversation_id)
+            raise
+        finally:
+            if reserved and self._admission:
+                self._admission.release(claim_name)
+            if template_admission is not None:
+                template_admission.release(claim_name)
+
+    async def _admit(self, claim_name: str, fairness_key: str) -> bool:
+        """Admission control. Returns True if a slot was reserved and must be released."""
+        limit = self._config.max_active_sandboxes
+        if limit <= 0:
+            return False
+        if self._admission is not None and self._synced_index(self._claims) is not None:
+            if self._config.capacity_eviction and self._admission.active() >= limit:
+                await self._evict_for_capacity()
+            await self._admission.acquire(claim_name, fairness_key)
+            return True
+        active = await self._count_active_claims()
+        if active >= limit and self._config.capacity_eviction and await self._evict_for_capacity():
+            active -= 1
+        if active >= limit:
+            metrics.ADMISSION_REJECTIONS.labels("at_capacity").inc()
+            raise SandboxCapacityError(f"Sandbox capacity reached ({active}/{limit} active). Retry later.")
+        return False
+
+    async def _admit_template(self, claim_name: str, fairness_key: str, template: str) -> AdmissionController | None:
+        """Reserve a slot under the template rule's own limit. Returns the controller to release, if any."""
+        rule = rule_for(self._config, template)
+        if rule is None or rule.max_active_sandboxes <= 0:
+            return None
+        claims = self._synced_index(self._claims)
+        if claims is None:
+            active = sum(
+                1 for claim in await self._k8s.list_sandbox_claims(self._config.namespace, MANAGED_SELECTOR)
+                if template_of(claim) == template
             )
-            if len(claims) >= self._config.max_active_sandboxes:
+            limit = rule.max_active_sandboxes
+            if active >= limit:
+                metrics.ADMISSION_REJECTIONS.labels("at_capacity").inc()
                 raise SandboxCapacityError(
-                    f"Sandbox capacity reached ({len(claims)}/{self._config.max_active_sandboxes} active). Retry later."
+                    f"Sandbox capacity for template '{template}' reached ({active}/{limit} active). Retry later."
                 )
+            return None
+        controller = self._template_admission.get(template)
+        if controller is None:
+            controller = AdmissionController(
+                self._config, claims,
+                scope=lambda claim: template_of(claim) == template and not _is_pooled(claim),
+                # Read on every check, so limit changes from the ConfigMap apply at once
+                limit=lambda: getattr(rule_for(self._config, template), "max_active_sandboxes", 0),
+                name=template,
+            )
+            claims.add_handler(controller.on_claim_event)
+            self._template_admission[template] = controller
+        await controller.acquire(claim_name, fairness_key)
+        return controller
+
+    async def _read_query(self, query_ref: QueryRef | None) -> tuple[str, dict[str, str]]:
+        """Best-effort target agent and annotations of the query, for template selection and the agent label."""
+        if query_ref is None:
+            return "", {}
+        try:
+            query = await self._k8s.get_query(query_ref.name, query_ref.namespace)
+        except Exception:
+            logger.warning("Failed to read Query '%s/%s'", query_ref.namespace, query_ref.name, exc_info=True)
+            return "", {}
+        target = (query or {}).get("spec", {}).get("target") or {}
+        agent = target.get("name", "") if target.get("type") == "agent" else ""
+        return agent, (query or {}).get("metadata", {}).get("annotations") or {}
+
+    async def _bind_pooled(self, conversation_id: str, agent: str) -> SandboxInfo | None:
+        """Serve a new conversation from a ready pooled claim. None if the pool is empty or disabled."""
+        if self._pool is None or self._config.claim_pool_size <= 0:
+            return None
+        labels: dict[str, str] = {LABEL_CONVERSATION_ID: conversation_id}
+        if agent and len(agent) <= 63:
+            labels[LABEL_AGENT] = agent
+        with tracer.start_as_current_span("scheduler.sandbox.bind_pooled") as span:
+            try:
+                claim = await self._pool.bind(labels)
+            except Exception as e:
+                # The pool is a fast path only — fall back to provisioning a claim
+                span.record_exception(e)
+                logger.warning("Failed to bind pooled claim for conversation=%s", conversation_id, exc_info=True)
+                return None
+            info = self._info_from_claim(claim) if claim else None
+            if info is None:
+                return None
+            span.set_attribute("sandbox.claim_name", info.claim_name)
+        self._bound[conversation_id] = info.claim_name
+        self._timelines.mark(conversation_id, "bound")
+        self._cache.put(conversation_id, info)
+        self._warm_connection(info)
+        logger.info("Bound pooled claim: conversation=%s claim=%s sandbox=%s", conversation_id, info.claim_name, info.sandbox_name)
+        return info
+
+    def _pool_headroom(self) -> int:
+        limit = self._config.max_active_sandboxes
+        if limit <= 0 or self._admission is None or self._pool is None:
+            return self._config.claim_pool_size
+        return limit - self._admission.active() - self._pool.unassigned()
+
+    async def run_claim_pool(self, elector: LeaseElector | None = None) -> None:
+        """Background task that keeps the claim pool replenished on the lease holder."""
+        if self._pool is not None:
+            await self._pool.run(elector)
+
+    async def _provision_sandbox(
+        self, conversation_id: str, claim_name: str, agent: str = "", template: str = "",
+    ) -> SandboxInfo:
+        namespace = self._config.namespace
+        template = template or self._config.sandbox_template
+        deadline = time.monotonic() + self._config.sandbox_ready_timeout
 
         labels = {
             LABEL_CONVERSATION_ID: conversation_id,
             LABEL_MANAGED_BY: MANAGED_BY_VALUE,
         }
+        if agent and len(agent) <= 63:
+            labels[LABEL_AGENT] = agent
 
         with tracer.start_as_current_span(
             "scheduler.sandbox.create",
-            attributes={"sandbox.claim_name": claim_name, "sandbox.template": self._config.sandbox_template},
-        ) as span:
+            attributes={"sandbox.claim_name": claim_name, "sandbox.template": template},
+        ) as span, metrics.observe_phase("create_claim"):
             try:
                 await self._k8s.create_sandbox_claim(
                     name=claim_name,
-                    template=self._config.sandbox_template,
+                    template=template,
                     namespace=namespace,
                     labels=labels,
                 )
@@ -351,59 +721,344 @@ class SandboxManager:
                 span.set_status(StatusCode.ERROR, str(e))
                 span.record_exception(e)
                 raise
+        self._timelines.mark(conversation_id, "claim_created")
 
         with tracer.start_as_current_span(
             "scheduler.sandbox.resolve_name",
             attributes={"sandbox.claim_name": claim_name},
-        ) as span:
+        ) as span, metrics.observe_phase("resolve_name"):
             try:
                 remaining = int(deadline - time.monotonic())
                 if remaining <= 0:
                     raise TimeoutError(f"Sandbox creation timed out for '{claim_name}'")
-                sandbox_name = await self._k8s.resolve_sandbox_name(
-                    claim_name=claim_name, namespace=namespace, timeout=remaining
-                )
+                sandbox_name = await self._resolve_sandbox_name(claim_name, namespace, remaining)
                 span.set_attribute("sandbox.name", sandbox_name)
             except Exception as e:
                 span.set_status(StatusCode.ERROR, str(e))
                 span.record_exception(e)
                 raise
+        self._timelines.mark(conversation_id, "sandbox_resolved")
 
         with tracer.start_as_current_span(
             "scheduler.sandbox.wait_ready",
             attributes={"sandbox.name": sandbox_name},
-        ) as span:
+        ) as span, metrics.observe_phase("wait_ready"):
             try:
                 remaining = int(deadline - time.monotonic())
                 if remaining <= 0:
                     raise TimeoutError(f"Sandbox creation timed out waiting for '{sandbox_name}' to become ready")
-                await self._k8s.wait_for_sandbox_ready(name=sandbox_name, namespace=namespace, timeout=remaining)
+                await self._wait_for_sandbox_ready(sandbox_name, namespace, remaining, conversation_id)
             except Exception as e:
                 span.set_status(StatusCode.ERROR, str(e))
                 span.record_exception(e)
                 raise
+        self._timelines.mark(conversation_id, "ready")
 
         service_fqdn = self._service_fqdn(sandbox_name)
-        info = SandboxInfo(claim_name=claim_name, sandbox_name=sandbox_name, service_fqdn=service_fqdn)
+        info = SandboxInfo(
+            claim_name=claim_name, sandbox_name=sandbox_name, service_fqdn=service_fqdn,
+            pod_ip=self._routable_pod_ip(sandbox_name),
+        )
         self._cache.put(conversation_id, info)
-        logger.info("Sandbox ready: conversation=%s sandbox=%s fqdn=%s", conversation_id, sandbox_name, service_fqdn)
+        self._warm_connection(info)
+        logger.info("Sandbox ready: conversation=%s sandbox=%s address=%s", conversation_id, sandbox_name, info.address)
 
         return info
 
+    async def _resolve_sandbox_name(self, claim_name: str, namespace: str, timeout: int) -> str:
+        """Wait for the claim to be bound to a sandbox, via the shared claim watch when available."""
+        claims = self._synced_index(self._claims)
+        if claims is None:
+            return await self._k8s.resolve_sandbox_name(claim_name=claim_name, namespace=namespace, timeout=timeout)
+        logger.info("Resolving sandbox name from claim '%s'...", claim_name)
+        try:
+            claim = await claims.wait_for(claim_name, lambda c: bool(_sandbox_name_of(c)), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"Could not resolve sandbox name from claim '{claim_name}' within {timeout}s"
+            ) from None
+        sandbox_name = _sandbox_name_of(claim)
+        logger.info("Resolved sandbox name '%s' from claim '%s'", sandbox_name, claim_name)
+        return sandbox_name
+
+    async def _wait_for_sandbox_ready(
+        self, sandbox_name: str, namespace: str, timeout: int, conversation_id: str = "",
+    ) -> None:
+        """Wait for the sandbox Ready condition, via the shared sandbox watch when available."""
+        sandboxes = self._synced_index(self._sandboxes)
+        if sandboxes is None:
+            await self._k8s.wait_for_sandbox_ready(name=sandbox_name, namespace=namespace, timeout=timeout)
+            return
+
+        def ready(sandbox: dict) -> bool:  # type: ignore[type-arg]
+            # A pod IP means the pod is scheduled; what remains is image pull, start-up and readiness
+            if conversation_id and _pod_ip_of(sandbox):
+                self._timelines.mark(conversation_id, "pod_scheduled")
+            return self._is_sandbox_ready(sandbox)
+
+        logger.info("Waiting for Sandbox '%s' to become ready...", sandbox_name)
+        try:
+            await sandboxes.wait_for(sandbox_name, ready, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Sandbox '{sandbox_name}' did not become ready within {timeout}s") from None
+        logger.info("Sandbox '%s' is ready", sandbox_name)
+
+    def _routable_pod_ip(self, sandbox_name: str) -> str:
+        """Pod IP to route to when podIPRouting is on and the sandbox is ready, else "" for the Service FQDN."""
+        if not self._config.pod_ip_routing:
+            return ""
+        sandboxes = self._synced_index(self._sandboxes)
+        sandbox = sandboxes.get(sandbox_name) if sandboxes is not None else None
+        if sandbox is None or not self._is_sandbox_ready(sandbox):
+            return ""
+        return _pod_ip_of(sandbox)
+
+    def _warm_connection(self, info: SandboxInfo) -> None:
+        """Open a keep-alive connection to a newly ready sandbox in the background, ahead of the first request."""
+        if self._connection_warmer is None or not self._config.connection_warmup:
+            return
+        task = asyncio.create_task(self._connection_warmer(info))
+        self._warming.add(task)
+        task.add_done_callback(self._warming.discard)
+
     async def update_last_activity(self, conversation_id: str) -> None:
-        """PATCH last-activity annotation on the claim."""
-        claim_name = self._claim_name(conversation_id)
-        await self._patch_last_activity(claim_name, self._config.namespace)
+        """Record activity on the claim; the annotation is written by the coalescing ActivityWriter."""
+        self._activity.record(self._claim_name_of(conversation_id))
+
+    def record_forwarded(self, conversation_id: str) -> None:
+        """Close the conversation's provisioning timeline, if any, as its first request is forwarded.
+
+        The timeline is written to the claim with the next last-activity flush, at no extra API cost.
+        """
+        timeline = self._timelines.finish(conversation_id)
+        if timeline is not None:
+            self._activity.annotate(self._claim_name_of(conversation_id), {ANNOTATION_TIMELINE: encode(timeline)})
+
+    async def describe_sandboxes(self) -> dict[str, Any]:
+        """Live conversation-to-sandbox mappings with idle age and provisioning phase durations.
+
+        Also reports phase percentiles over provisionings recently finished on this replica.
+        """
+        now = datetime.now(timezone.utc)
+        sandboxes = []
+        for claim in await self._list_managed_claims():
+            metadata = claim.get("metadata", {})
+            conversation_id = metadata.get("labels", {}).get(LABEL_CONVERSATION_ID, "")
+            if not conversation_id:
+                continue
+            claim_name = metadata.get("name", "")
+            timeline = self._timelines.get(conversation_id) or decode(
+                self._activity.pending_annotations(claim_name).get(ANNOTATION_TIMELINE)
+                or metadata.get("annotations", {}).get(ANNOTATION_TIMELINE, "")
+            )
+            sandboxes.append({
+                "conversationId": conversation_id,
+                "claim": claim_name,
+                "sandbox": _sandbox_name_of(claim),
+                "idleSeconds": round(self._idle_seconds(metadata, now, self._config.session_idle_ttl), 1),
+                "timeline": as_iso(timeline),
+                "phaseSeconds": phase_durations(timeline),
+            })
+        sandboxes.sort(key=lambda s: s["idleSeconds"])
+        return {"sandboxes": sandboxes, "provisioning": self._timelines.summary()}
+
+    async def acquire_turn_lease(self, conversation_id: str, holder: str, timeout: float) -> bool:
+        """Take the turn lease on the conversation's claim, waiting up to timeout for another holder.
+
+        The lease is an annotation written with a resourceVersion precondition, so
+        exactly one replica wins a race. Expiry is wall-clock time, because the
+        holder may be another pod. Returns False if the lease stayed held.
+        """
+        claim_name = self._claim_name_of(conversation_id)
+        namespace = self._config.namespace
+        deadline = time.monotonic() + timeout
+        claims = self._synced_index(self._claims)
+        claim = claims.get(claim_name) if claims is not None else None
+        if claim is None:
+            claim = await self._k8s.get_sandbox_claim(claim_name, namespace)
+        while True:
+            if claim is None:
+                # Nothing to serialize on; routing reports the missing session
+                return True
+            current, expires = _turn_lease_of(claim)
+            now = time.time()
+            if not current or current == holder or expires <= now:
+                lease = json.dumps({"holder": holder, "expires": round(now + TURN_LEASE_DURATION, 3)})
+                try:
+                    await self._k8s.patch_claim_annotation(
+                        claim_name, namespace, {ANNOTATION_TURN: lease},
+                        resource_version=claim.get("metadata", {}).get("resourceVersion", ""),
+                    )
+                    return True
+                except client.ApiException as e:
+                    if e.status == 404:
+                        return True
+                    if e.status != 409:
+                        raise
+                # Lost a race or read a stale copy; decide again on the current object
+                claim = await self._k8s.get_sandbox_claim(claim_name, namespace)
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            wait = max(min(remaining, expires - now), 0.0)
+            claims = self._synced_index(self._claims)
+            if claims is None:
+                await asyncio.sleep(min(wait, TURN_LEASE_POLL_INTERVAL))
+                claim = await self._k8s.get_sandbox_claim(claim_name, namespace)
+                continue
+            try:
+                claim = await claims.wait_for(claim_name, lambda c: _turn_lease_of(c)[0] != current, wait)
+            except asyncio.TimeoutError:
+                claim = claims.get(claim_name)
+            except ResourceDeletedError:
+                return True
+
+    async def renew_turn_lease(self, conversation_id: str, holder: str) -> None:
+        """Push the expiry of a held turn lease forward."""
+        lease = json.dumps({"holder": holder, "expires": round(time.time() + TURN_LEASE_DURATION, 3)})
+        await self._update_turn_lease(conversation_id, holder, lease)
+
+    async def release_turn_lease(self, conversation_id: str, holder: str) -> None:
+        """Remove the turn lease if holder still holds it."""
+        await self._update_turn_lease(conversation_id, holder, None)
+
+    async def _update_turn_lease(self, conversation_id: str, holder: str, lease: str | None) -> None:
+        claim_name = self._claim_name_of(conversation_id)
+        namespace = self._config.namespace
+        claims = self._synced_index(self._claims)
+        claim = claims.get(claim_name) if claims is not None else None
+        for _ in range(3):
+            if claim is None:
+                claim = await self._k8s.get_sandbox_claim(claim_name, namespace)
+            if claim is None or _turn_lease_of(claim)[0] != holder:
+                return
+            try:
+                await self._k8s.patch_claim_annotation(
+                    claim_name, namespace, {ANNOTATION_TURN: lease},
+                    resource_version=claim.get("metadata", {}).get("resourceVersion", ""),
+                )
+                return
+            except client.ApiException as e:
+                if e.status == 404:
+                    return
+                if e.status != 409:
+                    raise
+            claim = None
+
+    def is_healthy(self, info: SandboxInfo) -> bool:
+        """False while the sandbox's circuit is open, i.e. it should be replaced rather than forwarded to."""
+        return not self._health.is_open(info.sandbox_name)
+
+    def record_forward_result(self, info: SandboxInfo, ok: bool) -> None:
+        """Feed the outcome of forwarding a request to the sandbox's circuit."""
+        if ok:
+            self._health.record_success(info.sandbox_name)
+        else:
+            self._health.record_failure(info.sandbox_name)
+
+    async def run_health_checks(
+        self, elector: LeaseElector | None = None, in_flight: Callable[[str], bool] | None = None,
+    ) -> None:
+        """Background task that probes ready sandboxes and replaces those whose circuit opens.
+
+        With an elector, only the replica holding the lease probes, so each failing
+        sandbox is recovered by exactly one replica. in_flight tells whether this
+        replica is running a turn for a conversation; see _probe_once.
+        """
+        while True:
+            try:
+                interval = self._config.health_check_interval
+                await asyncio.sleep(interval if interval > 0 else HEALTH_CHECK_IDLE_POLL)
+                if interval <= 0 or self._health_prober is None:
+                    continue
+                if elector is not None and not elector.is_leader:
+                    continue
+                await self._probe_once(in_flight)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Health check error")
+
+    async def _probe_once(self, in_flight: Callable[[str], bool] | None = None) -> None:
+        """Probe every idle, ready sandbox bound to a conversation once.
+
+        A sandbox running a turn, on this replica or under another replica's turn
+        lease, is skipped: a busy agent may answer /health late, and recovering it
+        would cut the turn off.
+        """
+        claims = self._synced_index(self._claims)
+        sandboxes = self._synced_index(self._sandboxes)
+        prober = self._health_prober
+        if claims is None or sandboxes is None or prober is None:
+            return
+        targets: dict[str, SandboxInfo] = {}
+        now = time.time()
+        for claim in claims.items():
+            metadata = claim.get("metadata", {})
+            conversation_id = metadata.get("labels", {}).get(LABEL_CONVERSATION_ID, "")
+            if not conversation_id or _is_pooled(claim) or metadata.get("name", "") in self._evicting:
+                continue
+            if (in_flight is not None and in_flight(conversation_id)) or _turn_lease_of(claim)[1] > now:
+                continue
+            info = self._info_from_claim(claim)
+            sandbox = sandboxes.get(info.sandbox_name) if info else None
+            if info and sandbox and self._is_sandbox_ready(sandbox):
+                targets[conversation_id] = info
+
+        limit = asyncio.Semaphore(HEALTH_CHECK_CONCURRENCY)
 
-    async def recover_sandbox(self, conversation_id: str) -> SandboxInfo:
-        """Attempt to recover a sandbox. Checks health before deleting."""
+        async def probe(conversation_id: str, info: SandboxInfo) -> None:
+            async with limit:
+                ok = await self._probe(prober, info)
+            if ok:
+                self._health.record_success(info.sandbox_name)
+            elif self._health.record_failure(info.sandbox_name):
+                task = asyncio.create_task(self._recover_unhealthy(conversation_id))
+                self._recovering.add(task)
+                task.add_done_callback(self._recovering.discard)
+
+        await asyncio.gather(*(probe(cid, info) for cid, info in targets.items()))
+
+    async def _probe(self, prober: Callable[[SandboxInfo], Awaitable[bool]], info: SandboxInfo) -> bool:
+        try:
+            ok = await asyncio.wait_for(prober(info), self._config.health_check_timeout)
+        except Exception as e:
+            logger.debug("Health probe of sandbox '%s' failed: %s", info.sandbox_name, e)
+            ok = False
+        metrics.HEALTH_PROBES.labels("ok" if ok else "failed").inc()
+        return ok
+
+    async def _recover_unhealthy(self, conversation_id: str) -> None:
+        """Replace a sandbox whose circuit opened, ahead of the conversation's next message."""
+        try:
+            await self.recover_sandbox(conversation_id, force=True)
+            metrics.PROACTIVE_RECOVERIES.labels("ok").inc()
+        except Exception:
+            metrics.PROACTIVE_RECOVERIES.labels("error").inc()
+            logger.exception("Recovery of unhealthy sandbox failed for conversation=%s", conversation_id)
+
+    async def recover_sandbox(self, conversation_id: str, force: bool = False) -> SandboxInfo:
+        """Attempt to recover a sandbox. Checks health before deleting.
+
+        With force, the sandbox is replaced even if Kubernetes reports it ready,
+        because it failed health probes or stopped answering requests.
+        """
+        return await self._flights.do(
+            f"recover:{conversation_id}", lambda: self._recover_sandbox(conversation_id, force),
+        )
+
+    async def _recover_sandbox(self, conversation_id: str, force: bool) -> SandboxInfo:
         self._cache.evict(conversation_id)
-        claim_name = self._claim_name(conversation_id)
+        claim_name = self._claim_name_of(conversation_id)
         namespace = self._config.namespace
 
         # Check if claim and sandbox still exist and are healthy
         claim = await self._k8s.get_sandbox_claim(claim_name, namespace)
-        if claim:
+        template = template_of(claim) if claim else ""
+        agent = (claim or {}).get("metadata", {}).get("labels", {}).get(LABEL_AGENT, "")
+        if claim and not force:
             info = self._info_from_claim(claim)
             if info:
                 sandbox = await self._k8s.get_sandbox(name=info.sandbox_name, namespace=namespace)
@@ -414,7 +1069,10 @@ class SandboxManager:
 
         # Sandbox is genuinely gone — delete stale claim and recreate
         await self._k8s.delete_sandbox_claim(claim_name, namespace)
-        return await self.create_sandbox(conversation_id)
+        self._bound.pop(conversation_id, None)
+        # Recreate from the same template and for the same agent, so eviction protection and fairness carry over;
+        # the template is accepted as a hint while it is still configured
+        return await self.create_sandbox(conversation_id, template_hint=template, agent_hint=agent)
 
     async def warm_cache(self) -> None:
         """Warm local cache from existing SandboxClaims on startup."""
@@ -422,9 +1080,7 @@ class SandboxManager:
         logger.info("Warming cache from SandboxClaims in namespace '%s'", namespace)
 
         try:
-            claims = await self._k8s.list_sandbox_claims(
-                namespace, f"{LABEL_MANAGED_BY}={MANAGED_BY_VALUE}"
-            )
+            claims = await self._list_managed_claims()
         except Exception:
             logger.exception("Failed to list SandboxClaims during cache warm")
             return
@@ -447,7 +1103,11 @@ class SandboxManager:
                 await self._k8s.delete_sandbox_claim(claim_name, namespace)
                 continue
 
-            sandbox = await self._k8s.get_sandbox(name=sandbox_name, namespace=namespace)
+            sandboxes = self._synced_index(self._sandboxes)
+            if sandboxes is not None:
+                sandbox = sandboxes.get(sandbox_name)
+            else:
+                sandbox = await self._k8s.get_sandbox(name=sandbox_name, namespace=namespace)
             if not sandbox or not self._is_sandbox_ready(sandbox):
                 logger.warning("Orphaned claim '%s' (sandbox '%s' not ready), deleting", claim_name, sandbox_name)
                 await self._k8s.delete_sandbox_claim(claim_name, namespace)
@@ -457,17 +1117,24 @@ class SandboxManager:
                 claim_name=claim_name,
                 sandbox_name=sandbox_name,
                 service_fqdn=self._service_fqdn(sandbox_name),
+                pod_ip=_pod_ip_of(sandbox) if self._config.pod_ip_routing else "",
             )
             logger.info("Cached mapping: conversation=%s -> sandbox=%s", conversation_id, sandbox_name)
 
         self._cache.warm(items)
         logger.info("Cache warm complete: %d active conversations", len(items))
 
-    async def run_reaper(self) -> None:
-        """Background task that reaps idle sessions by reading claim annotations."""
+    async def run_reaper(self, elector: LeaseElector | None = None) -> None:
+        """Background task that reaps idle sessions by reading claim annotations.
+
+        With an elector, only the replica holding the reaper lease runs cycles, so
+        each claim is evaluated and deleted by exactly one replica.
+        """
         while True:
             try:
                 await asyncio.sleep(30)
+                if elector is not None and not elector.is_leader:
+                    continue
                 await self._reap_once()
             except asyncio.CancelledError:
                 raise
@@ -476,51 +1143,164 @@ class SandboxManager:
 
     async def _reap_once(self) -> None:
         """Single reaper cycle: list claims, evict+delete expired ones."""
-        namespace = self._config.namespace
         ttl = self._config.session_idle_ttl
         now = datetime.now(timezone.utc)
 
-        claims = await self._k8s.list_sandbox_claims(
-            namespace, f"{LABEL_MANAGED_BY}={MANAGED_BY_VALUE}"
-        )
+        claims = await self._list_managed_claims()
 
         for item in claims:
             metadata = item.get("metadata", {})
             claim_name = metadata.get("name", "")
             conversation_id = metadata.get("labels", {}).get(LABEL_CONVERSATION_ID, "")
-            annotations = metadata.get("annotations", {})
-
-            last_activity_str = annotations.get(ANNOTATION_LAST_ACTIVITY, "")
-            if last_activity_str:
-                try:
-                    last_activity = datetime.fromisoformat(last_activity_str)
-                    idle_seconds = (now - last_activity).total_seconds()
-                except ValueError:
-                    idle_seconds = ttl + 1  # treat unparseable as expired
-            else:
-                # No annotation — use creation timestamp as fallback
-                created = metadata.get("creationTimestamp", "")
-                try:
-                    created_dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
-                    idle_seconds = (now - created_dt).total_seconds()
-                except (ValueError, AttributeError):
-                    idle_seconds = ttl + 1
+            if LABEL_POOL in metadata.get("labels", {}):
+                # Unassigned pooled claims are sized by the claim pool, not reaped
+                continue
 
+            idle_seconds = self._idle_seconds(metadata, now, ttl)
             if idle_seconds > ttl:
                 logger.info("Reaping idle session: conversation=%s claim=%s idle=%.0fs", conversation_id, claim_name, idle_seconds)
-                # Evict cache before deleting claim to avoid routing to a dead sandbox
-                if conversation_id:
-                    self._cache.evict(conversation_id)
-                if self._config.shutdown_policy == "Delete":
-                    await self._k8s.delete_sandbox_claim(claim_name, namespace)
+                await self._retire_claim(claim_name, conversation_id)
+                metrics.REAPED_SESSIONS.inc()
+
+    async def _evict_for_capacity(self) -> bool:
+        """Delete the least recently active idle claim to free a slot. Returns True if one was evicted.
+
+        Only claims idle for at least eviction_min_idle seconds whose agent is not
+        protected are candidates. Eviction never runs under shutdownPolicy Retain.
+        """
+        if self._config.shutdown_policy != "Delete":
+            return False
+        now = datetime.now(timezone.utc)
+        ttl = self._config.session_idle_ttl
+        protected = set(self._config.eviction_protected_agents)
+
+        victim: dict | None = None  # type: ignore[type-arg]
+        victim_idle = float(self._config.eviction_min_idle)
+        for item in await self._list_managed_claims():
+            metadata = item.get("metadata", {})
+            labels = metadata.get("labels", {})
+            if metadata.get("name", "") in self._evicting or labels.get(LABEL_AGENT) in protected or LABEL_POOL in labels:
+                continue
+            idle_seconds = self._idle_seconds(metadata, now, ttl)
+            if idle_seconds >= victim_idle:
+                victim, victim_idle = metadata, idle_seconds
+        if victim is None:
+            logger.info("At capacity and no claim idle for %ds is evictable", self._config.eviction_min_idle)
+            return False
+
+        claim_name = victim.get("name", "")
+        conversation_id = victim.get("labels", {}).get(LABEL_CONVERSATION_ID, "")
+        logger.info(
+            "Evicting least recently active session for capacity: conversation=%s claim=%s idle=%.0fs",
+            conversation_id, claim_name, victim_idle,
+        )
+        self._evicting.add(claim_name)
+        if self._admission:
+            self._admission.exclude(claim_name)
+        try:
+            await self._retire_claim(claim_name, conversation_id)
+        except Exception:
+            self._evicting.discard(claim_name)
+            if self._admission:
+                self._admission.include(claim_name)
+            raise
+        metrics.CAPACITY_EVICTIONS.inc()
+        return True
+
+    def _idle_seconds(self, metadata: dict, now: datetime, ttl: int) -> float:  # type: ignore[type-arg]
+        """Seconds since the claim's last activity; unreadable timestamps count as expired."""
+        claim_name = metadata.get("name", "")
+        annotations = metadata.get("annotations", {})
+
+        last_activity_str = annotations.get(ANNOTATION_LAST_ACTIVITY, "")
+        if last_activity_str:
+            try:
+                last_activity = datetime.fromisoformat(last_activity_str)
+                idle_seconds = (now - last_activity).total_seconds()
+            except ValueError:
+                idle_seconds = ttl + 1  # treat unparseable as expired
+        else:
+            # No annotation — use creation timestamp as fallback
+            created = metadata.get("creationTimestamp", "")
+            try:
+                created_dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
+                idle_seconds = (now - created_dt).total_seconds()
+            except (ValueError, AttributeError):
+                idle_seconds = ttl + 1
+
+        # Activity seen by this replica but not yet flushed to the annotation
+        pending = self._activity.last_recorded(claim_name)
+        if pending is not None:
+            idle_seconds = min(idle_seconds, (now - pending).total_seconds())
+        return idle_seconds
+
+    async def _retire_claim(self, claim_name: str, conversation_id: str) -> None:
+        # Evict cache before deleting claim to avoid routing to a dead sandbox
+        if conversation_id:
+            self._cache.evict(conversation_id)
+        self._activity.discard(claim_name)
+        if self._config.shutdown_policy == "Delete":
+            await self._k8s.delete_sandbox_claim(claim_name, self._config.namespace)
 
     async def close(self) -> None:
+        await self._activity.stop()
+        for task in [*self._warming, *self._recovering]:
+            task.cancel()
+        for index in (self._claims, self._sandboxes):
+            if index:
+                await index.stop()
         await self._k8s.close()
 
+    @staticmethod
+    def _synced_index(index: ResourceIndex | None) -> ResourceIndex | None:
+        """Return the index if it can serve reads, or None to fall back to the API server."""
+        return index if index is not None and index.synced else None
+
+    async def _list_managed_claims(self) -> list[dict]:  # type: ignore[type-arg]
+        claims = self._synced_index(self._claims)
+        if claims is not None:
+            return claims.items()
+        return await self._k8s.list_sandbox_claims(self._config.namespace, MANAGED_SELECTOR)
+
+    async def _count_active_claims(self) -> int:
+        claims = self._synced_index(self._claims)
+        if claims is not None:
+            return len(claims)
+        return len(await self._k8s.list_sandbox_claims(self._config.namespace, MANAGED_SELECTOR))
+
+    def _on_claim_event(self, event_type: str, claim: dict) -> None:  # type: ignore[type-arg]
+        """Track bound pooled claims; drop cached routes for claims deleted elsewhere (reaper, kubectl)."""
+        claim_name = claim.get("metadata", {}).get("name", "")
+        conversation_id = claim.get("metadata", {}).get("labels", {}).get(LABEL_CONVERSATION_ID, "")
+        if event_type != "DELETED":
+            if conversation_id and claim_name != self._claim_name(conversation_id):
+                self._bound[conversation_id] = claim_name
+            return
+        self._evicting.discard(claim_name)
+        if conversation_id:
+            if self._bound.get(conversation_id) == claim_name:
+                del self._bound[conversation_id]
+            self._cache.evict(conversation_id)
+
+    def _on_sandbox_event(self, event_type: str, sandbox: dict) -> None:  # type: ignore[type-arg]
+        """Drop cached routes to a sandbox whose pod IP changed or that stopped being ready.
+
+        A deleted sandbox's circuit is dropped as well.
+        """
+        name = sandbox.get("metadata", {}).get("name", "")
+        pod_ip = _pod_ip_of(sandbox) if event_type != "DELETED" and self._is_sandbox_ready(sandbox) else ""
+        previous = self._pod_ips.pop(name, "")
+        if event_type == "DELETED":
+            self._health.forget(name)
+        if pod_ip:
+            self._pod_ips[name] = pod_ip
+        if previous and previous != pod_ip:
+            logger.info("Sandbox '%s' pod IP %s -> %s, dropping cached routes", name, previous, pod_ip or "none")
+            self._cache.evict_sandbox(name)
+
     def _info_from_claim(self, claim: dict) -> SandboxInfo | None:  # type: ignore[type-arg]
         """Extract SandboxInfo from a claim object, or None if sandbox isn't ready."""
-        sandbox_status = claim.get("status", {}).get("sandbox", {})
-        sandbox_name = sandbox_status.get("name", "") or sandbox_status.get("Name", "")
+        sandbox_name = _sandbox_name_of(claim)
         if not sandbox_name:
             return None
         claim_name = claim.get("metadata", {}).get("name", "")
@@ -528,15 +1308,9 @@ class SandboxManager:
             claim_name=claim_name,
             sandbox_name=sandbox_name,
             service_fqdn=self._service_fqdn(sandbox_name),
+            pod_ip=self._routable_pod_ip(sandbox_name),
         )
 
-    async def _patch_last_activity(self, claim_name: str, namespace: str) -> None:
-        now = datetime.now(timezone.utc).isoformat()
-        try:
-            await self._k8s.patch_claim_annotation(claim_name, namespace, {ANNOTATION_LAST_ACTIVITY: now})
-        except Exception:
-            logger.warning("Failed to patch last-activity on '%s'", claim_name, exc_info=True)
-
     @staticmethod
     def _is_sandbox_ready(sandbox: dict) -> bool:  # type: ignore[type-arg]
         conditions = sandbox.get("status", {}).get("conditions", [])
@@ -0,0 +1,120 @@
+"""A2A tasks returned by asynchronous provisioning, held until the result is retrieved."""
+
+import asyncio
+import hashlib
+import hmac
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from .config import SchedulerConfig
+
+TERMINAL_STATES = frozenset({"completed", "failed", "canceled", "rejected"})
+OWNER_SEPARATOR = "@"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class TaskStore:
+    """In-memory A2A tasks for new conversations provisioned in the background.
+
+    A task lives on the replica that accepted the message, because that replica
+    runs the provisioning and forwarding. Task IDs end with the owner's address
+    (pod IP and port) and an HMAC of the ID under a secret shared by the
+    replicas, so that any replica can forward tasks/get to the owner. An owner
+    whose signature does not match is never contacted: the ID comes from the
+    client. Without a secret, task IDs carry no owner. Finished tasks are kept
+    for async_task_ttl seconds.
+    """
+
+    def __init__(self, config: SchedulerConfig, owner: str = "", secret: str = "") -> None:
+        self._config = config
+        self._owner = owner if secret else ""
+        self._secret = secret.encode()
+        self._tasks: dict[str, dict[str, Any]] = {}
+        self._finished: dict[str, float] = {}
+        self._jobs: dict[str, asyncio.Task[None]] = {}
+
+    @property
+    def owner(self) -> str:
+        return self._owner
+
+    def owner_of(self, task_id: str) -> str:
+        """Address of the replica that owns task_id, or "" if it has no owner suffix or its signature is invalid."""
+        signed, separator, signature = task_id.rpartition(OWNER_SEPARATOR)
+        _, owner_separator, owner = signed.rpartition(OWNER_SEPARATOR)
+        if not separator or not owner_separator or not self._secret:
+            return ""
+        return owner if hmac.compare_digest(signature, self._sign(signed)) else ""
+
+    def _sign(self, task_id: str) -> str:
+        return hmac.new(self._secret, task_id.encode(), hashlib.sha256).hexdigest()
+
+    def create(self, context_id: str, message: dict[str, Any] | None) -> dict[str, Any]:
+        """Register a submitted task for a message that is about to be processed in the background."""
+        self._prune()
+        task_id = str(uuid.uuid4())
+        if self._owner:
+            task_id = f"{task_id}{OWNER_SEPARATOR}{self._owner}"
+            task_id = f"{task_id}{OWNER_SEPARATOR}{self._sign(task_id)}"
+        task: dict[str, Any] = {
+            "kind": "task",
+            "id": task_id,
+            "contextId": context_id,
+            "status": {"state": "submitted", "timestamp": _now()},
+            "history": [message] if message else [],
+        }
+        self._tasks[task_id] = task
+        return task
+
+    def get(self, task_id: str) -> dict[str, Any] | None:
+        self._prune()
+        return self._tasks.get(task_id)
+
+    def track(self, task_id: str, job: asyncio.Task[None]) -> None:
+        """Keep a reference to the background job so it is not garbage collected mid-flight."""
+        self._jobs[task_id] = job
+        job.add_done_callback(lambda _: self._jobs.pop(task_id, None))
+
+    def set_state(self, task_id: str, state: str, message: dict[str, Any] | None = None) -> None:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return
+        status: dict[str, Any] = {"state": state, "timestamp": _now()}
+        if message is not None:
+            status["message"] = message
+            task["history"].append(message)
+        task["status"] = status
+        if state in TERMINAL_STATES:
+            self._finished[task_id] = time.monotonic()
+
+    def complete(self, task_id: str, result: dict[str, Any]) -> None:
+        """Finish a task with the sandbox's JSON-RPC result, a Message or a Task."""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return
+        if result.get("kind") == "task":
+            # Adopt the sandbox task's outcome under the ID the client already holds
+            task["status"] = result.get("status") or {"state": "completed", "timestamp": _now()}
+            task["artifacts"] = result.get("artifacts") or []
+            seen = {m.get("messageId") for m in task["history"]}
+            task["history"] += [m for m in result.get("history") or [] if not m.get("messageId") or m.get("messageId") not in seen]
+            self._finished[task_id] = time.monotonic()
+        else:
+            self.set_state(task_id, "completed", {**result, "contextId": task["contextId"]})
+
+    async def close(self) -> None:
+        """Cancel background jobs still running, e.g. on shutdown."""
+        jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self._config.async_task_ttl
+        for task_id in [t for t, finished in self._finished.items() if finished < cutoff]:
+            del self._finished[task_id]
+            self._tasks.pop(task_id, None)
@@ -0,0 +1,56 @@
+"""Workload-aware SandboxTemplate selection for new conversations."""
+
+from typing import Any
+
+from .config import SandboxTemplateRule, SchedulerConfig
+
+# A2A message metadata key a client can set to ask for one of the configured templates
+TEMPLATE_HINT_KEY = "ark.mckinsey.com/sandbox-template"
+
+
+def template_hint(message: dict[str, Any] | None) -> str:
+    """The template named in the message's metadata, or ""."""
+    metadata = message.get("metadata") if message else None
+    value = metadata.get(TEMPLATE_HINT_KEY) if isinstance(metadata, dict) else None
+    return value if isinstance(value, str) else ""
+
+
+def template_of(claim: dict[str, Any]) -> str:
+    """Name of the SandboxTemplate a claim was created from."""
+    return claim.get("spec", {}).get("sandboxTemplateRef", {}).get("name", "")
+
+
+def rule_for(config: SchedulerConfig, template: str) -> SandboxTemplateRule | None:
+    return next((rule for rule in config.sandbox_templates if rule.name == template), None)
+
+
+def needs_query(config: SchedulerConfig) -> bool:
+    """Whether any rule matches on the Query's agent or annotations, which costs a Query GET per new conversation."""
+    return any(rule.agents or rule.query_annotations for rule in config.sandbox_templates)
+
+
+def _matches(rule: SandboxTemplateRule, agent: str, annotations: dict[str, str]) -> bool:
+    if not rule.agents and not rule.query_annotations:
+        return False  # selectable by hint only
+    if rule.agents and agent not in rule.agents:
+        return False
+    return all(annotations.get(key) == value for key, value in rule.query_annotations.items())
+
+
+def select_template(
+    config: SchedulerConfig, agent: str = "", annotations: dict[str, str] | None = None, hint: str = "",
+) -> str:
+    """Pick the SandboxTemplate for a new conversation.
+
+    A hint naming sandbox_template or a configured rule wins, so clients can
+    only choose among templates the operator has listed. Otherwise the first
+    rule whose criteria all match is used: its agents (if any) must include the
+    Query's target agent and its queryAnnotations (if any) must all be present
+    on the Query. With no match, sandbox_template is used.
+    """
+    if hint and (hint == config.sandbox_template or rule_for(config, hint) is not None):
+        return hint
+    for rule in config.sandbox_templates:
+        if _matches(rule, agent, annotations or {}):
+            return rule.name
+    return config.sandbox_template
@@ -0,0 +1,121 @@
+"""Provisioning timelines: when each phase of bringing up a conversation's sandbox finished."""
+
+import json
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+ANNOTATION_TIMELINE = "ark.mckinsey.com/provisioning-timeline"
+
+# In order. A cold start passes claim_created, sandbox_resolved, pod_scheduled and ready;
+# a claim pool hit passes bound instead
+PHASES = ("requested", "claim_created", "sandbox_resolved", "pod_scheduled", "ready", "bound", "first_forward")
+RECENT_TIMELINES = 1000  # finished timelines kept per replica for percentiles
+MAX_OPEN_TIMELINES = 10000  # timelines of conversations never forwarded are dropped beyond this
+PERCENTILES = (50, 90, 99)
+
+Timeline = dict[str, float]  # phase -> Unix time
+
+
+def phase_durations(timeline: Timeline) -> dict[str, float]:
+    """Seconds taken to reach each phase from the phase before it, plus the total."""
+    durations: dict[str, float] = {}
+    previous: float | None = None
+    for phase in PHASES:
+        at = timeline.get(phase)
+        if at is None:
+            continue
+        if previous is not None:
+            durations[phase] = round(at - previous, 3)
+        previous = at
+    start = timeline.get("requested")
+    if start is not None and previous is not None and previous > start:
+        durations["total"] = round(previous - start, 3)
+    return durations
+
+
+def as_iso(timeline: Timeline) -> dict[str, str]:
+    """Phases in order, as ISO 8601 UTC timestamps."""
+    return {
+        phase: datetime.fromtimestamp(timeline[phase], timezone.utc).isoformat()
+        for phase in PHASES if phase in timeline
+    }
+
+
+def encode(timeline: Timeline) -> str:
+    """Annotation value for a timeline."""
+    return json.dumps(as_iso(timeline))
+
+
+def decode(raw: str) -> Timeline:
+    """Parse an annotation value; unreadable values and phases are skipped."""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    timeline: Timeline = {}
+    for phase, value in data.items():
+        try:
+            timeline[phase] = datetime.fromisoformat(value).timestamp()
+        except (TypeError, ValueError):
+            continue
+    return timeline
+
+
+def _percentile(ordered: list[float], pct: int) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+class ProvisioningTimelines:
+    """Timelines of conversations being provisioned on this replica, and durations of recent ones.
+
+    A timeline opens when a new conversation asks for a sandbox and closes
+    when its first request is forwarded. Closed timelines are kept in a
+    bounded window so the debug endpoint can report phase percentiles.
+    """
+
+    def __init__(self, recent: int = RECENT_TIMELINES) -> None:
+        self._open: dict[str, Timeline] = {}
+        self._recent: deque[dict[str, float]] = deque(maxlen=recent)
+
+    def start(self, conversation_id: str) -> None:
+        self._open[conversation_id] = {"requested": time.time()}
+        while len(self._open) > MAX_OPEN_TIMELINES:
+            del self._open[next(iter(self._open))]
+
+    def mark(self, conversation_id: str, phase: str) -> None:
+        timeline = self._open.get(conversation_id)
+        if timeline is not None:
+            timeline.setdefault(phase, time.time())
+
+    def get(self, conversation_id: str) -> Timeline | None:
+        return self._open.get(conversation_id)
+
+    def discard(self, conversation_id: str) -> None:
+        self._open.pop(conversation_id, None)
+
+    def finish(self, conversation_id: str) -> Timeline | None:
+        """Close the conversation's timeline at first_forward. None if none is open."""
+        timeline = self._open.pop(conversation_id, None)
+        if timeline is None:
+            return None
+        timeline.setdefault("first_forward", time.time())
+        self._recent.append(phase_durations(timeline))
+        return timeline
+
+    def summary(self) -> dict[str, object]:
+        """Percentiles of each phase duration over recently finished timelines."""
+        samples: dict[str, list[float]] = {}
+        for durations in self._recent:
+            for phase, seconds in durations.items():
+                samples.setdefault(phase, []).append(seconds)
+        phases = {}
+        for phase in (*PHASES, "total"):
+            if phase in samples:
+                ordered = sorted(samples[phase])
+                phases[phase] = {"count": len(ordered)} | {f"p{p}": _percentile(ordered, p) for p in PERCENTILES}
+        return {"count": len(self._recent), "phases": phases}
@@ -0,0 +1,194 @@
+"""Per-conversation turn serialization: one in-flight A2A message per conversation."""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from . import metrics
+from .config import SchedulerConfig
+
+logger = logging.getLogger(__name__)
+
+TURN_LEASE_RENEW_INTERVAL = 30.0  # seconds between renewals of a cluster-wide turn lease
+TURN_RETRY_AFTER = 5  # Retry-After seconds suggested when a turn is rejected
+
+
+class TurnRejectedError(RuntimeError):
+    """Raised when a message cannot wait behind the turn in flight for its conversation."""
+
+    def __init__(self, message: str, reason: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = TURN_RETRY_AFTER
+
+
+@dataclass
+class _Conversation:
+    waiters: deque[asyncio.Future[None]] = field(default_factory=deque)
+
+
+class Turn:
+    """A conversation's turn, held until release() when the response has been relayed."""
+
+    def __init__(self, coordinator: "TurnCoordinator", conversation_id: str, holder: str) -> None:
+        self._coordinator = coordinator
+        self.conversation_id = conversation_id
+        self.holder = holder
+        self._renewal: asyncio.Task[None] | None = None
+        self._released = False
+
+    def release_soon(self) -> None:
+        """Release from synchronous code, e.g. a finalizer. The lease, if any, is released in the background."""
+        if self._released:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._released = True
+            self._coordinator._release_local(self.conversation_id)
+            return
+        self._coordinator._track(loop.create_task(self.release()))
+
+    async def release(self) -> None:
+        """Hand the conversation to the next waiting message. Safe to call more than once."""
+        if self._released:
+            return
+        self._released = True
+        try:
+            if self._renewal is not None:
+                self._renewal.cancel()
+                await asyncio.gather(self._renewal, return_exceptions=True)
+                await self._coordinator._release_lease(self.conversation_id, self.holder)
+        finally:
+            self._coordinator._release_local(self.conversation_id)
+
+
+class TurnCoordinator:
+    """Admits one turn at a time per conversation, first on this replica, then across replicas.
+
+    Messages for a conversation with a turn in flight wait in FIFO order, up to
+    turn_queue_size of them for up to turn_queue_timeout seconds. When the queue
+    is full, turn_queue_policy decides who is turned away: Reject refuses the
+    new message, DropOldest refuses the longest-waiting one to make room.
+
+    With turn_lease enabled, the local winner also takes a lease annotation on
+    the conversation's SandboxClaim, renewed while the turn runs, so that turns
+    arriving on different replicas are serialized as well.
+    """
+
+    def __init__(self, config: SchedulerConfig, lease: Any, identity: str = "") -> None:
+        self._config = config
+        self._lease = lease
+        self._identity = identity or "scheduler"
+        self._conversations: dict[str, _Conversation] = {}
+        self._depth = 0
+        self._releasing: set[asyncio.Task[None]] = set()
+
+    @property
+    def queue_depth(self) -> int:
+        """Messages on this replica waiting for another turn to finish."""
+        return self._depth
+
+    def in_flight(self, conversation_id: str) -> bool:
+        """Whether a turn for the conversation is running on this replica."""
+        return conversation_id in self._conversations
+
+    async def acquire(self, conversation_id: str, cluster: bool = True) -> Turn:
+        """Wait for the conversation's turn. Raises TurnRejectedError if the message cannot wait.
+
+        cluster=False skips the claim lease, for conversations no other replica can know yet.
+        """
+        start = time.monotonic()
+        deadline = start + self._config.turn_queue_timeout
+        try:
+            await self._acquire_local(conversation_id, deadline)
+            turn = Turn(self, conversation_id, f"{self._identity}/{uuid.uuid4().hex[:8]}")
+            if cluster and self._config.turn_lease:
+                await self._acquire_lease(turn, deadline)
+        except TurnRejectedError as e:
+            metrics.TURN_QUEUE_WAIT_SECONDS.labels("rejected").observe(time.monotonic() - start)
+            metrics.TURN_REJECTIONS.labels(e.reason).inc()
+            raise
+        metrics.TURN_QUEUE_WAIT_SECONDS.labels("admitted").observe(time.monotonic() - start)
+        return turn
+
+    async def _acquire_local(self, conversation_id: str, deadline: float) -> None:
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            # No turn in flight; the entry's presence marks this one as running
+            self._conversations[conversation_id] = _Conversation()
+            return
+
+        waiters = conversation.waiters
+        if len(waiters) >= self._config.turn_queue_size:
+            if self._config.turn_queue_policy != "DropOldest" or not waiters:
+                raise TurnRejectedError(
+                    f"Conversation busy: a turn is in flight and {len(waiters)} more are queued", "queue_full",
+                )
+            oldest = waiters.popleft()
+            self._depth -= 1
+            oldest.set_exception(TurnRejectedError("Superseded by a newer message for this conversation", "superseded"))
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self._depth += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - time.monotonic(), 0.0))
+        except BaseException as e:
+            if future in waiters:
+                waiters.remove(future)
+                self._depth -= 1
+                future.cancel()
+            elif future.done() and not future.cancelled() and future.exception() is None:
+                # The turn was handed over just as this message gave up; pass it on
+                self._release_local(conversation_id)
+            if isinstance(e, asyncio.TimeoutError):
+                raise TurnRejectedError("Timed out waiting for the previous turn to finish", "timeout") from None
+            raise
+
+    def _track(self, task: asyncio.Task[None]) -> None:
+        self._releasing.add(task)
+        task.add_done_callback(self._releasing.discard)
+
+    def _release_local(self, conversation_id: str) -> None:
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            return
+        if conversation.waiters:
+            # Ownership passes straight to the next waiter, so nothing can overtake it
+            self._depth -= 1
+            conversation.waiters.popleft().set_result(None)
+        else:
+            del self._conversations[conversation_id]
+
+    async def _acquire_lease(self, turn: Turn, deadline: float) -> None:
+        try:
+            acquired = await self._lease.acquire_turn_lease(
+                turn.conversation_id, turn.holder, max(deadline - time.monotonic(), 0.0),
+            )
+        except BaseException:
+            self._release_local(turn.conversation_id)
+            raise
+        if not acquired:
+            self._release_local(turn.conversation_id)
+            raise TurnRejectedError("Timed out waiting for a turn in flight on another replica", "timeout")
+        turn._renewal = asyncio.create_task(self._renew_lease(turn.conversation_id, turn.holder))
+
+    async def _renew_lease(self, conversation_id: str, holder: str) -> None:
+        while True:
+            await asyncio.sleep(TURN_LEASE_RENEW_INTERVAL)
+            try:
+                await self._lease.renew_turn_lease(conversation_id, holder)
+            except Exception:
+                logger.warning("Failed to renew turn lease for conversation=%s", conversation_id, exc_info=True)
+
+    async def _release_lease(self, conversation_id: str, holder: str) -> None:
+        try:
+            await self._lease.release_turn_lease(conversation_id, holder)
+        except Exception:
+            # Unreleased leases expire; the next turn waits at most one lease duration
+            logger.warning("Failed to release turn lease for conversation=%s", conversation_id, exc_info=True)
@@ -29,6 +29,7 @@ def _build_stub() -> None:
     class ToolResultBlock:
         tool_use_id: str
         content: str
+        is_error: Optional[bool] = None
 
     @dataclass
     class AssistantMessage:
@@ -37,6 +38,18 @@ def _build_stub() -> None:
         parent_tool_use_id: Optional[str] = None
         error: Optional[str] = None
 
+    @dataclass
+    class UserMessage:
+        content: Any
+        parent_tool_use_id: Optional[str] = None
+
+    @dataclass
+    class StreamEvent:
+        uuid: str
+        session_id: str
+        event: dict
+        parent_tool_use_id: Optional[str] = None
+
     @dataclass
     class ResultMessage:
         subtype: str = "success"
@@ -50,7 +63,7 @@ def _build_stub() -> None:
         result: Optional[str] = None
         structured_output: Any = None
 
-    # Must accept every kwarg the executor passes at executor.py:130 — including
+    # Must accept every kwarg the executor passes in new_client() — including
     # the optional mcp_kwargs, prompt_kwargs and resume_kwargs. A missing field
     # here surfaces as an unexpected-keyword TypeError across every test that
     # reaches execute_agent, which does not point at the real cause.
@@ -64,6 +77,7 @@ def _build_stub() -> None:
         allowed_tools: Optional[list] = None
         resume: Optional[str] = None
         system_prompt: Optional[Any] = None
+        include_partial_messages: bool = False
 
     class ClaudeSDKClient:
         def __init__(self, options=None):
@@ -91,6 +105,8 @@ def _build_stub() -> None:
     sdk_types.ToolUseBlock = ToolUseBlock
     sdk_types.ToolResultBlock = ToolResultBlock
     sdk_types.AssistantMessage = AssistantMessage
+    sdk_types.UserMessage = UserMessage
+    sdk_types.StreamEvent = StreamEvent
     sdk_types.ResultMessage = ResultMessage
     sdk_types.ClaudeAgentOptions = ClaudeAgentOptions
 
@@ -0,0 +1,140 @@
+"""Tests for the coalescing last-activity ActivityWriter and its interaction with the reaper."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from kubernetes_asyncio.client import ApiException
+
+from claude_agent_scheduler.activity import ActivityWriter
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.sandbox_manager import (
+    ANNOTATION_LAST_ACTIVITY,
+    LABEL_CONVERSATION_ID,
+    SandboxManager,
+)
+
+
+@pytest.fixture
+def config() -> SchedulerConfig:
+    return SchedulerConfig(namespace="test-ns", session_idle_ttl=60)
+
+
+@pytest.fixture
+def k8s() -> AsyncMock:
+    return AsyncMock()
+
+
+@pytest.fixture
+def writer(k8s: AsyncMock, config: SchedulerConfig) -> ActivityWriter:
+    return ActivityWriter(k8s, config, ANNOTATION_LAST_ACTIVITY)
+
+
+class TestActivityWriter:
+    @pytest.mark.asyncio
+    async def test_repeated_activity_coalesces_to_one_patch(self, writer: ActivityWriter, k8s: AsyncMock) -> None:
+        for _ in range(5):
+            writer.record("claim-1")
+        writer.record("claim-2")
+
+        await writer.flush()
+
+        assert k8s.patch_claim_annotation.await_count == 2
+        names = sorted(c.args[0] for c in k8s.patch_claim_annotation.await_args_list)
+        assert names == ["claim-1", "claim-2"]
+        assert writer.last_recorded("claim-1") is None
+
+    @pytest.mark.asyncio
+    async def test_nothing_pending_sends_nothing(self, writer: ActivityWriter, k8s: AsyncMock) -> None:
+        await writer.flush()
+        k8s.patch_claim_annotation.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_patch_is_retried_on_next_flush(self, writer: ActivityWriter, k8s: AsyncMock) -> None:
+        k8s.patch_claim_annotation = AsyncMock(side_effect=[ApiException(status=500), None])
+        writer.record("claim-1")
+
+        await writer.flush()
+        assert writer.last_recorded("claim-1") is not None
+
+        await writer.flush()
+        assert writer.last_recorded("claim-1") is None
+        assert k8s.patch_claim_annotation.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_annotations_ride_along_with_activity(self, writer: ActivityWriter, k8s: AsyncMock) -> None:
+        writer.record("claim-1")
+        writer.annotate("claim-1", {"example.com/extra": "v"})
+
+        await writer.flush()
+
+        k8s.patch_claim_annotation.assert_awaited_once()
+        annotations = k8s.patch_claim_annotation.await_args.args[2]
+        assert set(annotations) == {ANNOTATION_LAST_ACTIVITY, "example.com/extra"}
+        assert writer.pending_annotations("claim-1") == {}
+
+    @pytest.mark.asyncio
+    async def test_deleted_claim_is_dropped(self, writer: ActivityWriter, k8s: AsyncMock) -> None:
+        k8s.patch_claim_annotation = AsyncMock(side_effect=ApiException(status=404))
+        writer.record("claim-gone")
+
+        await writer.flush()
+
+        assert writer.last_recorded("claim-gone") is None
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self, writer: ActivityWriter, k8s: AsyncMock) -> None:
+        writer.start()
+        writer.record("claim-1")
+
+        await writer.stop()
+
+        k8s.patch_claim_annotation.assert_awaited_once()
+        assert k8s.patch_claim_annotation.await_args.args[:2] == ("claim-1", "test-ns")
+
+    @pytest.mark.asyncio
+    async def test_non_positive_interval_is_clamped(self, k8s: AsyncMock) -> None:
+        config = SchedulerConfig(namespace="test-ns", activity_flush_interval=0)
+        writer = ActivityWriter(k8s, config, ANNOTATION_LAST_ACTIVITY)
+        sleep = AsyncMock(side_effect=asyncio.CancelledError)
+
+        with patch("claude_agent_scheduler.activity.asyncio.sleep", sleep), pytest.raises(asyncio.CancelledError):
+            await writer._run()
+
+        sleep.assert_awaited_once_with(1)
+
+
+class TestManagerActivity:
+    @pytest.fixture
+    def manager(self, config: SchedulerConfig) -> SandboxManager:
+        with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+            mgr = SandboxManager(config=config)
+            mgr._k8s = AsyncMock()
+            mgr._activity._k8s = mgr._k8s
+            return mgr
+
+    @pytest.mark.asyncio
+    async def test_update_last_activity_does_not_patch_inline(self, manager: SandboxManager) -> None:
+        await manager.update_last_activity("conv-1")
+        await manager.update_last_activity("conv-1")
+
+        manager._k8s.patch_claim_annotation.assert_not_called()
+        assert manager._activity.last_recorded(manager._claim_name("conv-1")) is not None
+
+    @pytest.mark.asyncio
+    async def test_reaper_honours_unflushed_activity(self, manager: SandboxManager) -> None:
+        claim_name = manager._claim_name("conv-busy")
+        old = datetime.now(timezone.utc) - timedelta(seconds=120)
+        manager._k8s.list_sandbox_claims = AsyncMock(return_value=[{
+            "metadata": {
+                "name": claim_name,
+                "labels": {LABEL_CONVERSATION_ID: "conv-busy"},
+                "annotations": {ANNOTATION_LAST_ACTIVITY: old.isoformat()},
+            },
+        }])
+        await manager.update_last_activity("conv-busy")
+
+        await manager._reap_once()
+
+        manager._k8s.delete_sandbox_claim.assert_not_called()
@@ -0,0 +1,176 @@
+"""Tests for queued, fair admission control against max_active_sandboxes."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ark_sdk.extensions.query import QueryRef
+
+from claude_agent_scheduler.admission import DEFAULT_RETRY_AFTER, AdmissionController, SandboxCapacityError
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.sandbox_manager import SandboxManager
+
+
+def _claim(name: str) -> dict:  # type: ignore[type-arg]
+    return {"metadata": {"name": name}}
+
+
+def _index(*names: str) -> ResourceIndex:
+    index = ResourceIndex(AsyncMock(), "g", "v1", "sandboxclaims", "test-ns")
+    for name in names:
+        index._apply({"type": "ADDED", "object": _claim(name)})
+    index._synced.set()
+    return index
+
+
+def _delete(index: ResourceIndex, controller: AdmissionController, name: str) -> None:
+    index._apply({"type": "DELETED", "object": _claim(name)})
+    controller.on_claim_event("DELETED", _claim(name))
+
+
+class TestAdmissionController:
+    @pytest.mark.asyncio
+    async def test_admits_under_capacity_and_counts_reservations(self) -> None:
+        config = SchedulerConfig(max_active_sandboxes=2)
+        controller = AdmissionController(config, _index("a"))
+
+        await controller.acquire("b")
+
+        assert controller.active() == 2
+        with pytest.raises(SandboxCapacityError) as exc:
+            await controller.acquire("c")
+        assert exc.value.retry_after == DEFAULT_RETRY_AFTER
+
+    @pytest.mark.asyncio
+    async def test_queued_request_admitted_when_claim_deleted(self) -> None:
+        config = SchedulerConfig(max_active_sandboxes=1, admission_queue_size=5, admission_queue_timeout=5)
+        index = _index("a")
+        controller = AdmissionController(config, index)
+
+        waiter = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+
+        _delete(index, controller, "a")
+        await asyncio.wait_for(waiter, timeout=1.0)
+
+        assert controller.queue_depth == 0
+        assert controller.active() == 1
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_keys(self) -> None:
+        config = SchedulerConfig(max_active_sandboxes=1, admission_queue_size=10, admission_queue_timeout=5)
+        index = _index("held")
+        controller = AdmissionController(config, index)
+        admitted: list[str] = []
+
+        async def acquire(name: str, key: str) -> None:
+            await controller.acquire(name, key)
+            admitted.append(name)
+
+        tasks = [asyncio.create_task(acquire(f"busy-{i}", "busy-ns")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(acquire("quiet-0", "quiet-ns")))
+        await asyncio.sleep(0)
+
+        previous = "held"
+        for n in range(1, 5):
+            _delete(index, controller, previous)
+            while len(admitted) < n:
+                await asyncio.sleep(0)
+            previous = admitted[-1]
+            controller.release(previous)
+            index._apply({"type": "ADDED", "object": _claim(previous)})
+        await asyncio.gather(*tasks)
+
+        assert admitted == ["busy-0", "quiet-0", "busy-1", "busy-2"]
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_rejects_and_leaves_queue(self) -> None:
+        config = SchedulerConfig(max_active_sandboxes=1, admission_queue_size=5, admission_queue_timeout=0)
+        controller = AdmissionController(config, _index("a"))
+
+        with pytest.raises(SandboxCapacityError):
+            await controller.acquire("b")
+
+        assert controller.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_grows_with_queue_depth(self) -> None:
+        config = SchedulerConfig(max_active_sandboxes=1, admission_queue_size=2, admission_queue_timeout=5)
+        controller = AdmissionController(config, _index("a"))
+        controller._free_interval = 4.0
+
+        waiters = [asyncio.create_task(controller.acquire(f"q-{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(SandboxCapacityError) as exc:
+            await controller.acquire("overflow")
+
+        assert exc.value.retry_after == 12
+        for w in waiters:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        assert controller.queue_depth == 0
+
+
+class TestManagerAdmission:
+    @pytest.mark.asyncio
+    async def test_synced_index_admission_does_not_list(self) -> None:
+        config = SchedulerConfig(namespace="test-ns", max_active_sandboxes=5, sandbox_ready_timeout=5)
+        with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+            manager = SandboxManager(config=config)
+        manager._k8s = AsyncMock()
+        manager._claims = _index("other")
+        manager._admission = AdmissionController(config, manager._claims)
+
+        async def create_claim(name: str, **kwargs: object) -> None:
+            bound = {"metadata": {"name": name}, "status": {"sandbox": {"name": "sb-1"}}}
+            manager._claims._apply({"type": "ADDED", "object": bound})  # type: ignore[union-attr]
+
+        manager._k8s.create_sandbox_claim = AsyncMock(side_effect=create_claim)
+
+        info = await manager.create_sandbox("conv-1", query_ref=QueryRef(name="q", namespace="team-a"))
+
+        assert info.sandbox_name == "sb-1"
+        manager._k8s.list_sandbox_claims.assert_not_called()
+        assert manager._admission.active() == 2
+
+    @pytest.mark.asyncio
+    async def test_burst_from_empty_index_is_held_to_the_limit(self) -> None:
+        config = SchedulerConfig(
+            namespace="test-ns", max_active_sandboxes=2, admission_queue_size=20, admission_queue_timeout=5,
+        )
+        with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+            manager = SandboxManager(config=config)
+        manager._k8s = AsyncMock()
+        manager._claims = _index()
+        manager._admission = AdmissionController(config, manager._claims)
+
+        burst = [asyncio.create_task(manager._admit(f"c{i}", "team-a")) for i in range(10)]
+        await asyncio.sleep(0.05)
+
+        assert sum(task.done() for task in burst) == 2
+        assert manager._admission.active() == 2
+        assert manager._admission.queue_depth == 8
+        manager._k8s.list_sandbox_claims.assert_not_called()
+        for task in burst:
+            task.cancel()
+        await asyncio.gather(*burst, return_exceptions=True)
+
+    @pytest.mark.asyncio
+    async def test_fairness_key_includes_the_agent_when_known(self) -> None:
+        config = SchedulerConfig(
+            namespace="test-ns", max_active_sandboxes=5, sandbox_ready_timeout=5, eviction_protected_agents=["other"],
+        )
+        with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+            manager = SandboxManager(config=config)
+        manager._k8s = AsyncMock()
+        manager._k8s.get_query = AsyncMock(return_value={"spec": {"target": {"type": "agent", "name": "coder"}}})
+        manager._admit = AsyncMock(side_effect=SandboxCapacityError("full"))  # type: ignore[method-assign]
+
+        with pytest.raises(SandboxCapacityError):
+            await manager.create_sandbox("conv-1", query_ref=QueryRef(name="q", namespace="team-a"))
+
+        manager._admit.assert_awaited_once_with(manager._claim_name("conv-1"), "team-a/coder")
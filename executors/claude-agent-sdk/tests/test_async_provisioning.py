@@ -0,0 +1,228 @@
+"""Tests for asynchronous provisioning: submitted tasks, background completion and tasks/get."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.proxy import FORWARDED_HEADER, create_proxy_app
+from claude_agent_scheduler.sandbox_manager import SandboxInfo, SandboxManager
+from claude_agent_scheduler.tasks import TaskStore
+
+SANDBOX = SandboxInfo(claim_name="claim-1", sandbox_name="sb-1", service_fqdn="sb-1.test-ns.svc.cluster.local")
+
+
+def _send(blocking: bool | None = None) -> dict:  # type: ignore[type-arg]
+    params: dict = {"message": {"role": "user", "messageId": "m-1", "parts": [{"kind": "text", "text": "hi"}]}}  # type: ignore[type-arg]
+    if blocking is not None:
+        params["configuration"] = {"blocking": blocking}
+    return {"jsonrpc": "2.0", "id": "1", "method": "message/send", "params": params}
+
+
+def _tasks_get(task_id: str) -> dict:  # type: ignore[type-arg]
+    return {"jsonrpc": "2.0", "id": "2", "method": "tasks/get", "params": {"id": task_id}}
+
+
+@pytest.fixture
+def sandbox_manager() -> MagicMock:
+    manager = MagicMock(spec=SandboxManager)
+    manager._config = SchedulerConfig(namespace="test-ns", async_provisioning=True)
+    manager.update_last_activity = AsyncMock()
+    manager.create_sandbox = AsyncMock(return_value=SANDBOX)
+    return manager
+
+
+def _sandbox_transport(seen: list[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        reply = {"kind": "message", "messageId": "m-2", "role": "agent", "parts": [{"kind": "text", "text": "done"}]}
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": "1", "result": reply})
+
+    return httpx.MockTransport(handler)
+
+
+async def _wait_for_state(client: httpx.AsyncClient, task_id: str, state: str) -> dict:  # type: ignore[type-arg]
+    for _ in range(100):
+        task = (await client.post("/", json=_tasks_get(task_id))).json()["result"]
+        if task["status"]["state"] == state:
+            return task  # type: ignore[no-any-return]
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"task never reached {state}")
+
+
+class TestAsyncProvisioning:
+    @pytest.mark.asyncio
+    async def test_submitted_task_returned_then_completed(self, sandbox_manager: MagicMock) -> None:
+        seen: list[httpx.Request] = []
+        updater = AsyncMock()
+        provisioned = asyncio.Event()
+
+        async def create_sandbox(*args: object, **kwargs: object) -> SandboxInfo:
+            await provisioned.wait()
+            return SANDBOX
+
+        sandbox_manager.create_sandbox = AsyncMock(side_effect=create_sandbox)
+        upstream = httpx.AsyncClient(transport=_sandbox_transport(seen))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream)
+
+        with patch("claude_agent_scheduler.proxy.QueryStatusUpdater", return_value=updater):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+                submitted = (await client.post("/", json=_send(blocking=False))).json()["result"]
+                assert submitted["kind"] == "task"
+                assert submitted["status"]["state"] == "submitted"
+                assert submitted["history"][0]["contextId"] == submitted["contextId"]
+                assert [c.args[0] for c in updater.update_query_phase.await_args_list] == ["provisioning"]
+
+                provisioned.set()
+                task = await _wait_for_state(client, submitted["id"], "completed")
+
+        assert task["status"]["message"]["parts"][0]["text"] == "done"
+        assert task["status"]["message"]["contextId"] == submitted["contextId"]
+        assert [c.args[0] for c in updater.update_query_phase.await_args_list] == ["provisioning", "running"]
+        assert json.loads(seen[0].content)["params"]["message"]["contextId"] == submitted["contextId"]
+        sandbox_manager.update_last_activity.assert_awaited_once_with(submitted["contextId"])
+
+    @pytest.mark.asyncio
+    async def test_provisioning_failure_fails_task(self, sandbox_manager: MagicMock) -> None:
+        sandbox_manager.create_sandbox = AsyncMock(side_effect=TimeoutError("readiness timeout"))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=httpx.AsyncClient(transport=_sandbox_transport([])))
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            submitted = (await client.post("/", json=_send(blocking=False))).json()["result"]
+            task = await _wait_for_state(client, submitted["id"], "failed")
+
+        assert "readiness timeout" in task["status"]["message"]["parts"][0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_sandbox_error_status_fails_task_as_forward_failure(self, sandbox_manager: MagicMock) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(502, text="upstream connect error", headers={"content-type": "text/plain"})
+
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            submitted = (await client.post("/", json=_send(blocking=False))).json()["result"]
+            task = await _wait_for_state(client, submitted["id"], "failed")
+
+        text = task["status"]["message"]["parts"][0]["text"]
+        assert text == "Forwarding to the sandbox failed: sandbox answered HTTP 502"
+        sandbox_manager.record_forward_result.assert_called_once_with(SANDBOX, ok=True)
+
+    @pytest.mark.asyncio
+    async def test_unreachable_sandbox_recovered_before_forwarding(self, sandbox_manager: MagicMock) -> None:
+        seen: list[httpx.Request] = []
+        recovered = SandboxInfo(
+            claim_name="claim-1", sandbox_name="sb-2", service_fqdn="sb-2.test-ns.svc.cluster.local",
+        )
+        sandbox_manager.recover_sandbox = AsyncMock(return_value=recovered)
+        reply = _sandbox_transport(seen)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == SANDBOX.service_fqdn:
+                raise httpx.ConnectError("connection refused", request=request)
+            return await reply.handle_async_request(request)
+
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            submitted = (await client.post("/", json=_send(blocking=False))).json()["result"]
+            await _wait_for_state(client, submitted["id"], "completed")
+
+        sandbox_manager.recover_sandbox.assert_awaited_once_with(submitted["contextId"], force=False)
+        sandbox_manager.record_forward_result.assert_called_once_with(SANDBOX, ok=False)
+        assert [r.url.host for r in seen] == [recovered.service_fqdn]
+
+    @pytest.mark.asyncio
+    async def test_blocking_request_stays_synchronous(self, sandbox_manager: MagicMock) -> None:
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=httpx.AsyncClient(transport=_sandbox_transport([])))
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            result = (await client.post("/", json=_send(blocking=True))).json()["result"]
+
+        assert result["kind"] == "message"
+
+    @pytest.mark.asyncio
+    async def test_request_without_blocking_stays_synchronous(self, sandbox_manager: MagicMock) -> None:
+        http_client = httpx.AsyncClient(transport=_sandbox_transport([]))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=http_client)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            result = (await client.post("/", json=_send())).json()["result"]
+
+        assert result["kind"] == "message"
+
+    @pytest.mark.asyncio
+    async def test_tasks_get_forwarded_to_owning_replica(self, sandbox_manager: MagicMock) -> None:
+        seen: list[httpx.Request] = []
+        store = TaskStore(sandbox_manager._config, owner="10.0.0.1:8000", secret="s3cret")
+        other = TaskStore(sandbox_manager._config, owner="10.0.0.2:8000", secret="s3cret")
+        app = create_proxy_app(
+            sandbox_manager=sandbox_manager, http_client=httpx.AsyncClient(transport=_sandbox_transport(seen)),
+            task_store=store,
+        )
+        remote = other.create("ctx", None)["id"]
+        gone = store.create("ctx", None)["id"]
+        store._tasks.clear()
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            await client.post("/", json=_tasks_get(remote), headers={"Authorization": "Bearer t", "Cookie": "c=1"})
+            missing = await client.post("/", json=_tasks_get(gone))
+
+        assert seen[0].url.host == "10.0.0.2" and seen[0].headers[FORWARDED_HEADER] == "1"
+        assert "authorization" not in seen[0].headers and "cookie" not in seen[0].headers
+        assert len(seen) == 1
+        assert missing.status_code == 404
+        sandbox_manager.create_sandbox.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_forged_owner_is_not_contacted(self, sandbox_manager: MagicMock) -> None:
+        seen: list[httpx.Request] = []
+        sandbox_manager._config.async_provisioning = False
+        store = TaskStore(sandbox_manager._config, owner="10.0.0.1:8000", secret="s3cret")
+        forger = TaskStore(sandbox_manager._config, owner="10.0.0.1:8000", secret="guessed")
+        app = create_proxy_app(
+            sandbox_manager=sandbox_manager, http_client=httpx.AsyncClient(transport=_sandbox_transport(seen)),
+            task_store=store,
+        )
+        signed = forger.create("ctx", None)["id"]
+        forged = [
+            "abc@internal-admin.kube-system.svc:8080",
+            signed.replace("10.0.0.1:8000", "169.254.169.254:80"),
+            signed,
+        ]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            responses = [await client.post("/", json=_tasks_get(task_id)) for task_id in forged]
+
+        assert [r.status_code for r in responses] == [404, 404, 404]
+        assert seen == []
+
+
+class TestTaskStore:
+    def test_sandbox_task_result_adopted_under_client_task_id(self) -> None:
+        store = TaskStore(SchedulerConfig(), owner="10.0.0.1:8000", secret="s3cret")
+        task = store.create("ctx", {"messageId": "m-1", "role": "user"})
+
+        store.complete(task["id"], {
+            "kind": "task", "id": "sandbox-task", "status": {"state": "completed"},
+            "artifacts": [{"parts": []}], "history": [{"messageId": "m-1"}, {"messageId": "m-2"}],
+        })
+
+        stored = store.get(task["id"])
+        assert stored is not None and store.owner_of(stored["id"]) == "10.0.0.1:8000"
+        assert stored["status"]["state"] == "completed"
+        assert [m["messageId"] for m in stored["history"]] == ["m-1", "m-2"]
+
+    def test_finished_tasks_expire(self) -> None:
+        store = TaskStore(SchedulerConfig(async_task_ttl=0))
+        task = store.create("ctx", None)
+        store.set_state(task["id"], "working")
+        assert store.get(task["id"]) is not None
+
+        store.set_state(task["id"], "failed")
+        assert store.get(task["id"]) is None
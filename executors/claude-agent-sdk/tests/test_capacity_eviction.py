@@ -0,0 +1,140 @@
+"""Tests for capacity-pressure eviction of the least recently active idle sandbox."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from ark_sdk.extensions.query import QueryRef
+
+from claude_agent_scheduler.admission import AdmissionController
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.sandbox_manager import (
+    ANNOTATION_LAST_ACTIVITY,
+    LABEL_AGENT,
+    LABEL_CONVERSATION_ID,
+    LABEL_MANAGED_BY,
+    MANAGED_BY_VALUE,
+    SandboxCapacityError,
+    SandboxInfo,
+    SandboxManager,
+)
+
+
+def _claim(name: str, idle_seconds: float, agent: str = "") -> dict:  # type: ignore[type-arg]
+    labels = {LABEL_CONVERSATION_ID: f"conv-{name}", LABEL_MANAGED_BY: MANAGED_BY_VALUE}
+    if agent:
+        labels[LABEL_AGENT] = agent
+    last_activity = datetime.now(timezone.utc) - timedelta(seconds=idle_seconds)
+    return {
+        "metadata": {
+            "name": name,
+            "labels": labels,
+            "annotations": {ANNOTATION_LAST_ACTIVITY: last_activity.isoformat()},
+        },
+        "status": {"sandbox": {"name": f"sb-{name}"}},
+    }
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(
+        namespace="test-ns", session_idle_ttl=1800, max_active_sandboxes=3,
+        capacity_eviction=True, eviction_min_idle=300, sandbox_ready_timeout=5,
+    )
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config)
+        mgr._k8s = AsyncMock()
+        return mgr
+
+
+class TestEvictForCapacity:
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_active_after_cache(self, manager: SandboxManager) -> None:
+        manager._k8s.list_sandbox_claims = AsyncMock(return_value=[
+            _claim("recent", 60), _claim("idle", 1500), _claim("idler", 1700),
+        ])
+        manager._cache.put("conv-idler", SandboxInfo("idler", "sb-idler", "sb-idler.test-ns.svc.cluster.local"))
+        order = MagicMock()
+        manager._cache.evict = MagicMock(side_effect=lambda cid: order("evict", cid))
+        manager._k8s.delete_sandbox_claim = AsyncMock(side_effect=lambda name, ns: order("delete", name))
+
+        assert await manager._evict_for_capacity() is True
+
+        assert [c.args for c in order.call_args_list] == [("evict", "conv-idler"), ("delete", "idler")]
+
+    @pytest.mark.asyncio
+    async def test_skips_recent_and_protected(self, manager: SandboxManager) -> None:
+        manager._config.eviction_protected_agents = ["vip"]
+        manager._k8s.list_sandbox_claims = AsyncMock(return_value=[_claim("recent", 60), _claim("vip", 1700, agent="vip")])
+
+        assert await manager._evict_for_capacity() is False
+        manager._k8s.delete_sandbox_claim.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_retain_policy_never_evicts(self, manager: SandboxManager) -> None:
+        manager._config.shutdown_policy = "Retain"
+        manager._k8s.list_sandbox_claims = AsyncMock(return_value=[_claim("idle", 1700)])
+
+        assert await manager._evict_for_capacity() is False
+        manager._k8s.delete_sandbox_claim.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_full_capacity_admits_after_eviction(self, manager: SandboxManager) -> None:
+        claims = ResourceIndex(AsyncMock(), "g", "v1", "sandboxclaims", "test-ns")
+        for claim in (_claim("a", 400), _claim("b", 900), _claim("c", 100)):
+            claims._apply({"type": "ADDED", "object": claim})
+        claims._synced.set()
+        manager._claims = claims
+        manager._admission = AdmissionController(manager._config, claims)
+
+        async def create_claim(name: str, **kwargs: object) -> None:
+            bound = {"metadata": {"name": name}, "status": {"sandbox": {"name": "sb-new"}}}
+            claims._apply({"type": "ADDED", "object": bound})
+
+        manager._k8s.create_sandbox_claim = AsyncMock(side_effect=create_claim)
+
+        info = await manager.create_sandbox("conv-new")
+
+        assert info.sandbox_name == "sb-new"
+        manager._k8s.delete_sandbox_claim.assert_awaited_once_with("b", "test-ns")
+        # b stays excluded from the count until its DELETED event arrives
+        assert "b" in manager._evicting
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_nothing_evictable(self, manager: SandboxManager) -> None:
+        manager._k8s.list_sandbox_claims = AsyncMock(return_value=[_claim(n, 10) for n in "abc"])
+
+        with pytest.raises(SandboxCapacityError):
+            await manager.create_sandbox("conv-new")
+
+    @pytest.mark.asyncio
+    async def test_claim_labelled_with_agent_when_protection_configured(self, manager: SandboxManager) -> None:
+        manager._config.max_active_sandboxes = 0
+        manager._config.eviction_protected_agents = ["vip"]
+        manager._k8s.get_query = AsyncMock(return_value={"spec": {"target": {"type": "agent", "name": "helper"}}})
+        manager._k8s.resolve_sandbox_name = AsyncMock(return_value="sb-new")
+
+        await manager.create_sandbox("conv-new", query_ref=QueryRef(name="q", namespace="team-a"))
+
+        labels = manager._k8s.create_sandbox_claim.await_args.kwargs["labels"]
+        assert labels[LABEL_AGENT] == "helper"
+
+    @pytest.mark.asyncio
+    async def test_recovered_sandbox_stays_protected(self, manager: SandboxManager) -> None:
+        manager._config.max_active_sandboxes = 0
+        manager._config.eviction_protected_agents = ["vip"]
+        claim_name = manager._claim_name("conv-vip")
+        manager._k8s.get_sandbox_claim = AsyncMock(return_value=_claim(claim_name, 1700, agent="vip"))
+        manager._k8s.resolve_sandbox_name = AsyncMock(return_value="sb-new")
+
+        await manager.recover_sandbox("conv-vip", force=True)
+
+        manager._k8s.get_query.assert_not_called()
+        labels = manager._k8s.create_sandbox_claim.await_args.kwargs["labels"]
+        assert labels[LABEL_AGENT] == "vip"
+        recreated = _claim(claim_name, 1700)
+        recreated["metadata"]["labels"] = labels
+        manager._k8s.list_sandbox_claims = AsyncMock(return_value=[recreated])
+        assert await manager._evict_for_capacity() is False
+        manager._k8s.delete_sandbox_claim.assert_awaited_once_with(claim_name, "test-ns")
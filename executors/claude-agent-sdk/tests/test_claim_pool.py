@@ -0,0 +1,194 @@
+"""Tests for the warm claim pool — binding, replenishment and its interaction with routing."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from kubernetes_asyncio.client import ApiException
+
+from claude_agent_scheduler.admission import AdmissionController
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.pool import LABEL_POOL, ClaimPool
+from claude_agent_scheduler.sandbox_manager import (
+    LABEL_CONVERSATION_ID,
+    LABEL_MANAGED_BY,
+    MANAGED_BY_VALUE,
+    SandboxManager,
+)
+
+TEMPLATE = "claude-agent-sdk"
+
+
+def _pooled(name: str, template: str = TEMPLATE, sandbox: str = "", created: str = "") -> dict:  # type: ignore[type-arg]
+    metadata = {
+        "name": name,
+        "resourceVersion": f"rv-{name}",
+        "labels": {LABEL_MANAGED_BY: MANAGED_BY_VALUE, LABEL_POOL: template},
+    }
+    if created:
+        metadata["creationTimestamp"] = created
+    return {"metadata": metadata, "status": {"sandbox": {"name": sandbox}} if sandbox else {}}
+
+
+def _sandbox(name: str, ready: bool = True) -> dict:  # type: ignore[type-arg]
+    return {"metadata": {"name": name}, "status": {"conditions": [{"type": "Ready", "status": str(ready)}]}}
+
+
+def _index(*objects: dict) -> ResourceIndex:  # type: ignore[type-arg]
+    index = ResourceIndex(AsyncMock(), "g", "v1", "things", "test-ns")
+    for obj in objects:
+        index._apply({"type": "ADDED", "object": obj})
+    index._synced.set()
+    return index
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(namespace="test-ns", claim_pool_size=2, sandbox_ready_timeout=5)
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config)
+        mgr._k8s = AsyncMock()
+        return mgr
+
+
+def _attach(manager: SandboxManager, claims: ResourceIndex, sandboxes: ResourceIndex) -> ClaimPool:
+    manager._claims, manager._sandboxes = claims, sandboxes
+    pool = ClaimPool(
+        manager._k8s, manager._config, claims, sandboxes, manager._is_sandbox_ready,
+        labels={LABEL_MANAGED_BY: MANAGED_BY_VALUE}, headroom=manager._pool_headroom,
+    )
+    manager._pool = pool
+    manager._admission = AdmissionController(manager._config, claims, unassigned=pool.unassigned)
+    claims.add_handler(manager._on_claim_event)
+    return pool
+
+
+def _bound(claim: dict, conversation_id: str) -> dict:  # type: ignore[type-arg]
+    labels = {k: v for k, v in claim["metadata"]["labels"].items() if k != LABEL_POOL}
+    labels[LABEL_CONVERSATION_ID] = conversation_id
+    return {**claim, "metadata": {**claim["metadata"], "labels": labels}}
+
+
+class TestBind:
+    @pytest.mark.asyncio
+    async def test_new_conversation_binds_ready_pooled_claim(self, manager: SandboxManager) -> None:
+        pending, ready = _pooled("pool-a"), _pooled("pool-b", sandbox="sb-b")
+        claims = _index(pending, ready)
+        _attach(manager, claims, _index(_sandbox("sb-b")))
+        manager._k8s.bind_sandbox_claim = AsyncMock(side_effect=lambda name, *a: _bound(ready, "conv-1"))
+
+        info = await manager.create_sandbox("conv-1")
+
+        assert (info.claim_name, info.sandbox_name) == ("pool-b", "sb-b")
+        name, _, resource_version, labels = manager._k8s.bind_sandbox_claim.await_args.args
+        assert (name, resource_version) == ("pool-b", "rv-pool-b")
+        assert labels == {LABEL_CONVERSATION_ID: "conv-1", LABEL_POOL: None}
+        manager._k8s.create_sandbox_claim.assert_not_called()
+        assert manager._claim_name_of("conv-1") == "pool-b"
+
+    @pytest.mark.asyncio
+    async def test_claim_taken_by_another_replica_is_skipped(self, manager: SandboxManager) -> None:
+        first, second = _pooled("pool-a", sandbox="sb-a"), _pooled("pool-b", sandbox="sb-b")
+        pool = _attach(manager, _index(first, second), _index(_sandbox("sb-a"), _sandbox("sb-b")))
+        manager._k8s.bind_sandbox_claim = AsyncMock(side_effect=[ApiException(status=409), _bound(second, "c")])
+
+        bound = await pool.bind({LABEL_CONVERSATION_ID: "c"})
+
+        assert bound is not None and bound["metadata"]["name"] == "pool-b"
+
+    @pytest.mark.asyncio
+    async def test_empty_pool_provisions_cold(self, manager: SandboxManager) -> None:
+        claims = _index(_pooled("pool-a", sandbox="sb-a"))
+        _attach(manager, claims, _index(_sandbox("sb-a", ready=False)))
+
+        async def create_claim(name: str, **kwargs: object) -> None:
+            claims._apply({"type": "ADDED", "object": {"metadata": {"name": name}, "status": {"sandbox": {"name": "sb-new"}}}})
+
+        manager._k8s.create_sandbox_claim = AsyncMock(side_effect=create_claim)
+        manager._sandboxes._apply({"type": "ADDED", "object": _sandbox("sb-new")})  # type: ignore[union-attr]
+
+        info = await manager.create_sandbox("conv-1")
+
+        assert info.claim_name == manager._claim_name("conv-1")
+        manager._k8s.bind_sandbox_claim.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_binding_seen_from_watch_routes_on_other_replicas(self, manager: SandboxManager) -> None:
+        claims = _index()
+        _attach(manager, claims, _index())
+        claims._apply({"type": "MODIFIED", "object": _bound(_pooled("pool-a", sandbox="sb-a"), "conv-1")})
+
+        info = await manager.get_sandbox("conv-1")
+
+        assert info is not None and info.claim_name == "pool-a"
+        manager._k8s.get_sandbox_claim.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lookup_miss_never_lists(self, manager: SandboxManager) -> None:
+        _attach(manager, _index(_pooled("pool-a", sandbox="sb-a")), _index())
+
+        assert await manager.get_sandbox("conv-1") is None
+        manager._k8s.get_sandbox_claim.assert_not_called()
+        manager._k8s.list_sandbox_claims.assert_not_called()
+
+
+class TestReconcile:
+    @pytest.mark.asyncio
+    async def test_creates_shortfall_and_drops_other_templates(self, manager: SandboxManager) -> None:
+        pool = _attach(manager, _index(_pooled("pool-old", template="previous", sandbox="sb-old")), _index())
+
+        await pool.reconcile()
+
+        manager._k8s.delete_sandbox_claim.assert_awaited_once_with("pool-old", "test-ns")
+        assert manager._k8s.create_sandbox_claim.await_count == 2
+        labels = manager._k8s.create_sandbox_claim.await_args.kwargs["labels"]
+        assert labels[LABEL_POOL] == TEMPLATE
+
+        # Created claims count as pending until they reach the index
+        await pool.reconcile()
+        assert manager._k8s.create_sandbox_claim.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_shrinks_keeping_ready_claims(self, manager: SandboxManager) -> None:
+        manager._config.claim_pool_size = 1
+        pool = _attach(
+            manager, _index(_pooled("pool-pending"), _pooled("pool-ready", sandbox="sb-r")), _index(_sandbox("sb-r")),
+        )
+
+        await pool.reconcile()
+
+        manager._k8s.delete_sandbox_claim.assert_awaited_once_with("pool-pending", "test-ns")
+        manager._k8s.create_sandbox_claim.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_replaces_claims_that_never_became_ready(self, manager: SandboxManager) -> None:
+        manager._config.claim_pool_size = 1
+        pool = _attach(manager, _index(_pooled("pool-stuck", created="2020-01-01T00:00:00Z")), _index())
+
+        await pool.reconcile()
+
+        manager._k8s.delete_sandbox_claim.assert_awaited_once_with("pool-stuck", "test-ns")
+        manager._k8s.create_sandbox_claim.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_pool_stays_within_max_active_sandboxes(self, manager: SandboxManager) -> None:
+        manager._config.max_active_sandboxes = 2
+        active = {"metadata": {"name": "sched-1", "labels": {LABEL_CONVERSATION_ID: "c1"}}}
+        pool = _attach(manager, _index(active, _pooled("pool-a", sandbox="sb-a")), _index(_sandbox("sb-a")))
+
+        await pool.reconcile()
+
+        # One active conversation plus one pooled claim already fill the limit
+        manager._k8s.create_sandbox_claim.assert_not_called()
+        assert manager._admission is not None and manager._admission.active() == 1
+
+
+class TestPooledClaimsInBackgroundWork:
+    @pytest.mark.asyncio
+    async def test_reaper_ignores_pooled_claims(self, manager: SandboxManager) -> None:
+        manager._config.session_idle_ttl = 60
+        _attach(manager, _index(_pooled("pool-a", created="2020-01-01T00:00:00Z")), _index())
+
+        await manager._reap_once()
+
+        manager._k8s.delete_sandbox_claim.assert_not_called()
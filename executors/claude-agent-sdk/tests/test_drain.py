@@ -0,0 +1,198 @@
+"""Tests for graceful draining — in-flight tracking, readiness, new-conversation refusal and the server hook."""
+
+import asyncio
+import json
+import signal
+import uuid
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+import uvicorn
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.drain import Drainer, DrainingServer
+from claude_agent_scheduler.proxy import create_proxy_app
+from claude_agent_scheduler.sandbox_manager import SandboxInfo, SandboxManager
+
+SANDBOX = SandboxInfo(claim_name="claim-1", sandbox_name="sb-1", service_fqdn="sb-1.test-ns.svc.cluster.local")
+
+
+def _send(context_id: str = "") -> dict:  # type: ignore[type-arg]
+    message = {"role": "user", "messageId": "m1", "parts": [{"kind": "text", "text": "hi"}]}
+    if context_id:
+        message["contextId"] = context_id
+    return {"jsonrpc": "2.0", "id": "1", "method": "message/send", "params": {"message": message}}
+
+
+@pytest.fixture
+def sandbox_manager() -> MagicMock:
+    manager = MagicMock(spec=SandboxManager)
+    manager._config = SchedulerConfig(namespace="test-ns")
+    manager.get_sandbox = AsyncMock(return_value=SANDBOX)
+    manager.create_sandbox = AsyncMock(return_value=SANDBOX)
+    manager.update_last_activity = AsyncMock()
+    return manager
+
+
+def _upstream() -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": "1", "result": {"kind": "message"}})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestDrainer:
+    @pytest.mark.asyncio
+    async def test_wait_returns_once_work_finishes(self) -> None:
+        drainer = Drainer(SchedulerConfig(drain_timeout=5))
+        drainer.begin()
+        waiting = asyncio.create_task(drainer.wait())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        drainer.end()
+
+        assert await waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_gives_up_at_deadline(self) -> None:
+        drainer = Drainer(SchedulerConfig(drain_timeout=0))
+        drainer.begin()
+
+        assert await drainer.wait() == 1
+
+
+class TestDrainingApp:
+    @pytest.mark.asyncio
+    async def test_readiness_fails_while_liveness_holds(self, sandbox_manager: MagicMock) -> None:
+        drainer = Drainer(sandbox_manager._config)
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=_upstream(), drainer=drainer)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            assert (await client.get("/ready")).status_code == 200
+            drainer.start_draining()
+            assert (await client.get("/ready")).status_code == 503
+            assert (await client.get("/health")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_new_conversation_refused_existing_served(self, sandbox_manager: MagicMock) -> None:
+        drainer = Drainer(sandbox_manager._config)
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=_upstream(), drainer=drainer)
+        drainer.start_draining()
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            refused = await client.post("/", json=_send())
+            served = await client.post("/", json=_send(str(uuid.uuid4())))
+
+        assert refused.status_code == 503
+        assert refused.json()["error"]["code"] == -32000
+        assert "Retry-After" in refused.headers
+        sandbox_manager.create_sandbox.assert_not_called()
+        assert served.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_streamed_response_in_flight_until_relayed(self, sandbox_manager: MagicMock) -> None:
+        release = asyncio.Event()
+
+        async def events() -> AsyncIterator[bytes]:
+            yield b'data: {"jsonrpc": "2.0", "id": "1", "result": {"kind": "status-update"}}\n\n'
+            await release.wait()
+            yield b'data: {"jsonrpc": "2.0", "id": "1", "result": {"kind": "message"}}\n\n'
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+        drainer = Drainer(SchedulerConfig(drain_timeout=5))
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream, drainer=drainer)
+
+        # Driven over raw ASGI: httpx's ASGITransport buffers the whole response body
+        body = json.dumps({**_send(str(uuid.uuid4())), "method": "message/stream"}).encode()
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+        sent: list[dict] = []  # type: ignore[type-arg]
+        first_chunk = asyncio.Event()
+
+        async def receive() -> dict:  # type: ignore[type-arg]
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:  # type: ignore[type-arg]
+            sent.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_chunk.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+            "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+            "headers": [(b"content-type", b"application/json")], "client": ("127.0.0.1", 1), "server": ("s", 80),
+        }
+        request = asyncio.create_task(app(scope, receive, send))
+        await asyncio.wait_for(first_chunk.wait(), timeout=1.0)
+        assert drainer.in_flight == 1
+
+        drainer.start_draining()
+        drained = asyncio.create_task(drainer.wait())
+        await asyncio.sleep(0.01)
+        assert not drained.done()
+
+        release.set()
+        await request
+
+        assert b'"kind": "message"' in b"".join(m.get("body", b"") for m in sent)
+        assert await drained == 0
+
+    @pytest.mark.asyncio
+    async def test_async_task_counts_as_in_flight(self, sandbox_manager: MagicMock) -> None:
+        sandbox_manager._config.async_provisioning = True
+        provisioned = asyncio.Event()
+
+        async def create_sandbox(*args: object, **kwargs: object) -> SandboxInfo:
+            await provisioned.wait()
+            return SANDBOX
+
+        sandbox_manager.create_sandbox = AsyncMock(side_effect=create_sandbox)
+        drainer = Drainer(sandbox_manager._config)
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=_upstream(), drainer=drainer)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            non_blocking = _send()
+            non_blocking["params"]["configuration"] = {"blocking": False}
+            response = await client.post("/", json=non_blocking)
+            assert json.loads(response.content)["result"]["status"]["state"] == "submitted"
+            assert drainer.in_flight == 1
+
+            provisioned.set()
+            assert await asyncio.wait_for(drainer.wait(), timeout=1.0) == 0
+
+
+class TestDrainingServer:
+    @pytest.mark.asyncio
+    async def test_first_signal_drains_before_exit(self) -> None:
+        drainer = Drainer(SchedulerConfig(drain_timeout=5))
+        server = DrainingServer(uvicorn.Config(app=MagicMock()), drainer)
+        drainer.begin()
+
+        server.handle_exit(signal.SIGTERM, None)
+        await asyncio.sleep(0.01)
+        assert drainer.draining and not server.should_exit
+
+        drainer.end()
+        await asyncio.sleep(0.01)
+        assert server.should_exit
+
+    @pytest.mark.asyncio
+    async def test_second_signal_exits_at_once(self) -> None:
+        drainer = Drainer(SchedulerConfig(drain_timeout=5))
+        server = DrainingServer(uvicorn.Config(app=MagicMock()), drainer)
+        drainer.begin()
+
+        server.handle_exit(signal.SIGTERM, None)
+        await asyncio.sleep(0.01)
+        server.handle_exit(signal.SIGTERM, None)
+
+        assert server.should_exit
+        drainer.end()
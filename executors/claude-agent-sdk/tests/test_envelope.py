@@ -0,0 +1,107 @@
+"""Tests for the single-parse request envelope and byte-level contextId splicing."""
+
+import json
+import uuid
+
+from ark_sdk.extensions.query import QUERY_EXTENSION_METADATA_KEY
+
+from claude_agent_scheduler.envelope import inject_response_context_id, parse_request
+
+CONTEXT_ID = str(uuid.uuid4())
+
+
+def _response(message: dict | None) -> bytes:  # type: ignore[type-arg]
+    result = {"message": message} if message is not None else {"status": "ok"}
+    return json.dumps({"jsonrpc": "2.0", "id": "1", "result": result}).encode()
+
+
+class TestParseRequest:
+    def test_single_parse_yields_id_context_and_query_ref(self) -> None:
+        body = json.dumps({
+            "jsonrpc": "2.0", "id": 7, "method": "message/send",
+            "params": {"message": {
+                "contextId": CONTEXT_ID, "role": "user",
+                "metadata": {QUERY_EXTENSION_METADATA_KEY: {"name": "q", "namespace": "ns"}},
+            }},
+        }).encode()
+
+        envelope = parse_request(body)
+
+        assert envelope.request_id == 7
+        assert envelope.context_id == CONTEXT_ID
+        assert envelope.body is body
+        assert envelope.query_ref is not None and envelope.query_ref.namespace == "ns"
+
+    def test_generated_context_id_spliced_without_reserializing(self) -> None:
+        # Non-default spacing and key order survive because the rest of the body is not re-dumped
+        body = b'{"id":"1",  "params": {"message": {"role":"user","parts":[{"text":"caf\\u00e9 {}"}]}}}'
+
+        envelope = parse_request(body)
+
+        assert envelope.is_new
+        assert envelope.body.endswith(b'"role":"user","parts":[{"text":"caf\\u00e9 {}"}]}}}')
+        assert json.loads(envelope.body)["params"]["message"]["contextId"] == envelope.context_id
+
+    def test_empty_context_id_replaced_in_place(self) -> None:
+        body = b'{"params":{"message":{"contextId":"  ","parts":[]}}}'
+
+        envelope = parse_request(body)
+
+        assert envelope.body.count(b"contextId") == 1
+        assert json.loads(envelope.body)["params"]["message"]["contextId"] == envelope.context_id
+
+    def test_invalid_context_id_reported_with_request_id(self) -> None:
+        envelope = parse_request(b'{"id":"9","params":{"message":{"contextId":"nope"}}}')
+
+        assert envelope.request_id == "9"
+        assert "Invalid contextId" in envelope.error
+
+
+class TestInjectResponseContextId:
+    def test_inserted_into_message(self) -> None:
+        body = _response({"role": "agent", "parts": [{"text": 'quote " and } brace'}]})
+
+        injected = inject_response_context_id(body, CONTEXT_ID)
+
+        assert json.loads(injected)["result"]["message"] == {
+            "contextId": CONTEXT_ID, "role": "agent", "parts": [{"text": 'quote " and } brace'}],
+        }
+
+    def test_empty_message_object(self) -> None:
+        injected = inject_response_context_id(_response({}), CONTEXT_ID)
+
+        assert json.loads(injected)["result"]["message"] == {"contextId": CONTEXT_ID}
+
+    def test_existing_value_replaced(self) -> None:
+        injected = inject_response_context_id(_response({"contextId": "other", "parts": []}), CONTEXT_ID)
+
+        assert injected.count(b"contextId") == 1
+        assert json.loads(injected)["result"]["message"]["contextId"] == CONTEXT_ID
+
+    def test_nested_context_id_elsewhere_does_not_count(self) -> None:
+        body = _response({"parts": [{"text": '"contextId"'}], "metadata": {"contextId": "nested"}})
+
+        injected = inject_response_context_id(body, CONTEXT_ID)
+
+        message = json.loads(injected)["result"]["message"]
+        assert message["contextId"] == CONTEXT_ID
+        assert message["metadata"] == {"contextId": "nested"}
+
+    def test_unchanged_payloads_returned_as_same_object(self) -> None:
+        for body in (_response(None), _response({"contextId": CONTEXT_ID}), b"[1, 2]"):
+            assert inject_response_context_id(body, CONTEXT_ID) is body
+
+    def test_large_tool_output_matches_full_parse(self) -> None:
+        output = "line with \"quotes\", {braces} and [brackets]\n" * 50_000
+        body = _response({"role": "agent", "parts": [{"kind": "text", "text": output}], "metadata": {"n": [1, 2.5, None]}})
+
+        injected = inject_response_context_id(body, CONTEXT_ID)
+
+        expected = json.loads(body)
+        expected["result"]["message"]["contextId"] = CONTEXT_ID
+        assert json.loads(injected) == expected
+
+    def test_unscannable_body_falls_back_unchanged(self) -> None:
+        body = b'{"result" {"message": {}}}'
+
+        assert inject_response_context_id(body, CONTEXT_ID) is body
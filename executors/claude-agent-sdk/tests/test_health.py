@@ -0,0 +1,241 @@
+"""Tests for sandbox health probing, circuit breaking and the response-header deadline."""
+
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.envelope import parse_request
+from claude_agent_scheduler.health import SandboxHealth
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.proxy import _header_timeout, create_proxy_app
+from claude_agent_scheduler.sandbox_manager import (
+    ANNOTATION_TURN,
+    LABEL_CONVERSATION_ID,
+    SandboxInfo,
+    SandboxManager,
+)
+
+READY = {"conditions": [{"type": "Ready", "status": "True"}]}
+
+
+class TestSandboxHealth:
+    def test_circuit_opens_at_threshold_and_closes_on_success(self) -> None:
+        health = SandboxHealth(SchedulerConfig(health_check_failure_threshold=2))
+
+        assert health.record_failure("sb-1") is False
+        assert health.record_failure("sb-1") is True
+        assert health.record_failure("sb-1") is False  # already open
+        assert health.is_open("sb-1") and health.open_count == 1
+
+        health.record_success("sb-1")
+
+        assert not health.is_open("sb-1")
+        assert health.record_failure("sb-1") is False
+
+    def test_forget_drops_state(self) -> None:
+        health = SandboxHealth(SchedulerConfig(health_check_failure_threshold=1))
+        health.record_failure("sb-1")
+
+        health.forget("sb-1")
+
+        assert health.open_count == 0
+
+
+def _index(*objects: dict) -> ResourceIndex:  # type: ignore[type-arg]
+    index = ResourceIndex(AsyncMock(), "g", "v1", "things", "test-ns")
+    for obj in objects:
+        index._apply({"type": "ADDED", "object": obj})
+    index._synced.set()
+    return index
+
+
+def _bound_claim(conversation_id: str, sandbox: str) -> dict:  # type: ignore[type-arg]
+    return {
+        "metadata": {"name": f"claim-{sandbox}", "labels": {LABEL_CONVERSATION_ID: conversation_id}},
+        "spec": {"sandboxTemplateRef": {"name": "claude-agent-sdk"}},
+        "status": {"sandbox": {"name": sandbox}},
+    }
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(namespace="test-ns", health_check_failure_threshold=2, health_check_timeout=0.05)
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config, health_prober=AsyncMock(return_value=True))
+        mgr._k8s = AsyncMock()
+        mgr._claims = _index(_bound_claim("conv-1", "sb-1"), _bound_claim("conv-2", "sb-2"))
+        mgr._sandboxes = _index(
+            {"metadata": {"name": "sb-1"}, "status": READY},
+            {"metadata": {"name": "sb-2"}, "status": {}},
+        )
+        return mgr
+
+
+class TestHealthChecks:
+    @pytest.mark.asyncio
+    async def test_only_ready_sandboxes_are_probed(self, manager: SandboxManager) -> None:
+        await manager._probe_once()
+
+        [call] = manager._health_prober.await_args_list  # type: ignore[union-attr]
+        assert call.args[0].sandbox_name == "sb-1"
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_recovers_in_background(self, manager: SandboxManager) -> None:
+        manager._health_prober = AsyncMock(return_value=False)
+        manager.recover_sandbox = AsyncMock()  # type: ignore[method-assign]
+
+        await manager._probe_once()
+        manager.recover_sandbox.assert_not_called()
+        await manager._probe_once()
+        await asyncio.gather(*manager._recovering)
+
+        manager.recover_sandbox.assert_awaited_once_with("conv-1", force=True)
+        assert not manager.is_healthy(SandboxInfo("claim-sb-1", "sb-1", "sb-1.test-ns.svc.cluster.local"))
+
+    @pytest.mark.asyncio
+    async def test_sandbox_running_a_turn_is_not_probed(self, manager: SandboxManager) -> None:
+        manager._health_prober = AsyncMock(return_value=False)
+        manager.recover_sandbox = AsyncMock()  # type: ignore[method-assign]
+
+        for _ in range(3):
+            await manager._probe_once(in_flight=lambda conversation_id: conversation_id == "conv-1")
+
+        manager._health_prober.assert_not_called()
+        manager.recover_sandbox.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sandbox_under_another_replicas_turn_lease_is_not_probed(self, manager: SandboxManager) -> None:
+        leased = _bound_claim("conv-1", "sb-1")
+        lease = {"holder": "other-replica/1", "expires": time.time() + 60}
+        leased["metadata"]["annotations"] = {ANNOTATION_TURN: json.dumps(lease)}
+        manager._claims._apply({"type": "MODIFIED", "object": leased})  # type: ignore[union-attr]
+        manager._health_prober = AsyncMock(return_value=False)
+
+        await manager._probe_once()
+
+        manager._health_prober.assert_not_called()
+        assert manager._health._failures == {}
+
+    @pytest.mark.asyncio
+    async def test_probe_timeout_counts_as_failure(self, manager: SandboxManager) -> None:
+        async def hang(info: SandboxInfo) -> bool:
+            await asyncio.sleep(10)
+            return True
+
+        manager._health_prober = hang
+
+        await manager._probe_once()
+
+        assert manager._health._failures == {"sb-1": 1}
+
+    @pytest.mark.asyncio
+    async def test_forced_recovery_replaces_a_ready_sandbox(self, manager: SandboxManager) -> None:
+        manager._k8s.get_sandbox_claim = AsyncMock(return_value=_bound_claim("conv-1", "sb-1"))
+        manager._k8s.get_sandbox = AsyncMock(return_value={"metadata": {"name": "sb-1"}, "status": READY})
+        manager.create_sandbox = AsyncMock()  # type: ignore[method-assign]
+
+        await manager.recover_sandbox("conv-1")
+        manager._k8s.delete_sandbox_claim.assert_not_called()
+
+        await manager.recover_sandbox("conv-1", force=True)
+        manager._k8s.delete_sandbox_claim.assert_awaited_once()
+
+
+OLD = SandboxInfo(claim_name="claim-1", sandbox_name="sb-old", service_fqdn="sb-old.test-ns.svc.cluster.local")
+NEW = SandboxInfo(claim_name="claim-1", sandbox_name="sb-new", service_fqdn="sb-new.test-ns.svc.cluster.local")
+
+
+def _proxy_manager(healthy: bool = True) -> MagicMock:
+    manager = MagicMock(spec=SandboxManager)
+    manager._config = SchedulerConfig(namespace="test-ns", response_header_timeout=1)
+    manager.update_last_activity = AsyncMock()
+    manager.get_sandbox = AsyncMock(return_value=OLD)
+    manager.recover_sandbox = AsyncMock(return_value=NEW)
+    manager.is_healthy = MagicMock(return_value=healthy)
+    return manager
+
+
+def _stream_request() -> dict:  # type: ignore[type-arg]
+    return {
+        "jsonrpc": "2.0", "id": "1", "method": "message/stream",
+        "params": {"message": {"contextId": str(uuid.uuid4()), "role": "user"}},
+    }
+
+
+class TestProxyHealth:
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_straight_to_recovery(self) -> None:
+        hosts: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hosts.append(request.url.host)
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": "1", "result": {}})
+
+        manager = _proxy_manager(healthy=False)
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=manager, http_client=http_client)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            response = await client.post("/", json=_stream_request())
+
+        assert response.status_code == 200
+        assert hosts == [NEW.address]
+        manager.recover_sandbox.assert_awaited_once()
+        assert manager.recover_sandbox.await_args.kwargs["force"] is True
+
+    @pytest.mark.asyncio
+    async def test_missing_response_headers_trigger_recovery(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == OLD.address:
+                await asyncio.sleep(10)  # connectable but hung
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": "1", "result": {}})
+
+        manager = _proxy_manager()
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=manager, http_client=http_client)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            response = await client.post("/", json=_stream_request())
+
+        assert response.status_code == 200
+        manager.record_forward_result.assert_any_call(OLD, ok=False)
+        # An isolated timeout leaves a sandbox Kubernetes reports Ready in place
+        assert manager.recover_sandbox.await_args.kwargs["force"] is False
+
+    @pytest.mark.asyncio
+    async def test_timeout_that_opens_the_circuit_forces_recovery(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == OLD.address:
+                await asyncio.sleep(10)
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": "1", "result": {}})
+
+        manager = _proxy_manager()
+        manager.is_healthy = MagicMock(side_effect=[True, False])
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=manager, http_client=http_client)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            response = await client.post("/", json=_stream_request())
+
+        assert response.status_code == 200
+        assert manager.recover_sandbox.await_args.kwargs["force"] is True
+
+    def test_blocking_send_has_no_header_deadline(self) -> None:
+        config = SchedulerConfig(response_header_timeout=30)
+
+        def envelope(method: str, **configuration: object) -> object:
+            params = {"message": {"role": "user"}, "configuration": configuration}
+            return parse_request(json.dumps({"jsonrpc": "2.0", "id": "1", "method": method, "params": params}).encode())
+
+        assert _header_timeout(config, envelope("message/send")) is None  # type: ignore[arg-type]
+        assert _header_timeout(config, envelope("message/send", blocking=True)) is None  # type: ignore[arg-type]
+        assert _header_timeout(config, envelope("message/send", blocking=False)) == 30.0  # type: ignore[arg-type]
+        assert _header_timeout(config, envelope("message/stream")) == 30.0  # type: ignore[arg-type]
+        disabled = SchedulerConfig(response_header_timeout=0)
+        assert _header_timeout(disabled, envelope("tasks/get")) is None  # type: ignore[arg-type]
@@ -0,0 +1,278 @@
+"""Tests for the list+watch ResourceIndex and SandboxManager reads served from it."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from kubernetes_asyncio.client import ApiException
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.informer import ResourceDeletedError, ResourceIndex
+from claude_agent_scheduler.sandbox_manager import (
+    ANNOTATION_LAST_ACTIVITY,
+    LABEL_CONVERSATION_ID,
+    LABEL_MANAGED_BY,
+    MANAGED_BY_VALUE,
+    SandboxInfo,
+    SandboxManager,
+)
+
+
+def _obj(name: str, rv: str, **extra: object) -> dict:  # type: ignore[type-arg]
+    return {"metadata": {"name": name, "resourceVersion": rv}, **extra}
+
+
+class FakeK8s:
+    """Serves scripted LIST responses and watch streams, recording resume points."""
+
+    def __init__(self, lists: list[dict], watches: list[list[dict] | Exception]) -> None:  # type: ignore[type-arg]
+        self._lists = lists
+        self._watches = watches
+        self.list_calls = 0
+        self.watch_resource_versions: list[str] = []
+        self.exhausted = asyncio.Event()
+
+    async def list_custom_objects(self, **kwargs: object) -> dict:  # type: ignore[type-arg]
+        self.list_calls += 1
+        return self._lists.pop(0)
+
+    async def watch_custom_objects(self, resource_version: str, **kwargs: object):  # type: ignore[no-untyped-def]
+        self.watch_resource_versions.append(resource_version)
+        if not self._watches:
+            self.exhausted.set()
+            await asyncio.Event().wait()
+        script = self._watches.pop(0)
+        if isinstance(script, Exception):
+            raise script
+        for event in script:
+            yield event
+
+
+async def _run_until_exhausted(k8s: FakeK8s) -> ResourceIndex:
+    index = ResourceIndex(k8s, "g", "v1", "things", "ns")
+    await index.start(sync_timeout=1.0)
+    await asyncio.wait_for(k8s.exhausted.wait(), timeout=1.0)
+    await index.stop()
+    return index
+
+
+class TestResourceIndex:
+    @pytest.mark.asyncio
+    async def test_list_then_watch_applies_events(self) -> None:
+        k8s = FakeK8s(
+            lists=[{"metadata": {"resourceVersion": "10"}, "items": [_obj("a", "5"), _obj("b", "6")]}],
+            watches=[[
+                {"type": "ADDED", "object": _obj("c", "11")},
+                {"type": "MODIFIED", "object": _obj("a", "12", status={"ready": True})},
+                {"type": "DELETED", "object": _obj("b", "13")},
+            ]],
+        )
+
+        index = await _run_until_exhausted(k8s)
+
+        assert index.synced
+        assert sorted(o["metadata"]["name"] for o in index.items()) == ["a", "c"]
+        assert index.get("a")["status"] == {"ready": True}  # type: ignore[index]
+        assert index.get("b") is None
+
+    @pytest.mark.asyncio
+    async def test_watch_resumes_from_last_resource_version(self) -> None:
+        k8s = FakeK8s(
+            lists=[{"metadata": {"resourceVersion": "10"}, "items": []}],
+            watches=[
+                [{"type": "ADDED", "object": _obj("a", "11")}],
+                [{"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "20"}}}],
+            ],
+        )
+
+        await _run_until_exhausted(k8s)
+
+        assert k8s.watch_resource_versions == ["10", "11", "20"]
+        assert k8s.list_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_resource_version_relists_and_reports_missed_deletes(self) -> None:
+        k8s = FakeK8s(
+            lists=[
+                {"metadata": {"resourceVersion": "10"}, "items": [_obj("a", "5"), _obj("b", "6")]},
+                {"metadata": {"resourceVersion": "30"}, "items": [_obj("a", "5")]},
+            ],
+            watches=[ApiException(status=410, reason="Gone")],
+        )
+        index = ResourceIndex(k8s, "g", "v1", "things", "ns")
+        deleted: list[str] = []
+        index.add_handler(lambda t, o: deleted.append(o["metadata"]["name"]) if t == "DELETED" else None)
+
+        await index.start(sync_timeout=1.0)
+        await asyncio.wait_for(k8s.exhausted.wait(), timeout=1.0)
+        await index.stop()
+
+        assert k8s.list_calls == 2
+        assert k8s.watch_resource_versions[-1] == "30"
+        assert index.get("b") is None
+        assert deleted == ["b"]
+
+
+def _ready(obj: dict) -> bool:  # type: ignore[type-arg]
+    return obj.get("status", {}).get("ready") is True
+
+
+class TestWaitFor:
+    @pytest.mark.asyncio
+    async def test_current_state_satisfies_immediately(self) -> None:
+        index = ResourceIndex(AsyncMock(), "g", "v1", "things", "ns")
+        index._apply({"type": "ADDED", "object": _obj("a", "1", status={"ready": True})})
+
+        obj = await index.wait_for("a", _ready, timeout=0.1)
+
+        assert obj["metadata"]["name"] == "a"
+
+    @pytest.mark.asyncio
+    async def test_waiters_resolved_by_shared_stream(self) -> None:
+        index = ResourceIndex(AsyncMock(), "g", "v1", "things", "ns")
+        waiters = [asyncio.create_task(index.wait_for(f"t-{i}", _ready, timeout=1.0)) for i in range(50)]
+        await asyncio.sleep(0)
+
+        for i in range(50):
+            index._apply({"type": "ADDED", "object": _obj(f"t-{i}", str(i))})
+            index._apply({"type": "MODIFIED", "object": _obj(f"t-{i}", str(i), status={"ready": True})})
+
+        results = await asyncio.gather(*waiters)
+        assert [r["metadata"]["name"] for r in results] == [f"t-{i}" for i in range(50)]
+        assert index._waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_deleted_while_waiting_raises(self) -> None:
+        index = ResourceIndex(AsyncMock(), "g", "v1", "things", "ns")
+        waiter = asyncio.create_task(index.wait_for("a", _ready, timeout=1.0))
+        await asyncio.sleep(0)
+
+        index._apply({"type": "DELETED", "object": _obj("a", "2")})
+
+        with pytest.raises(ResourceDeletedError):
+            await waiter
+
+    @pytest.mark.asyncio
+    async def test_timeout_unregisters_waiter(self) -> None:
+        index = ResourceIndex(AsyncMock(), "g", "v1", "things", "ns")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await index.wait_for("a", _ready, timeout=0.01)
+
+        assert index._waiters == {}
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(namespace="test-ns", session_idle_ttl=60)
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config)
+        mgr._k8s = AsyncMock()
+        return mgr
+
+
+def _synced_index(objects: list[dict]) -> ResourceIndex:  # type: ignore[type-arg]
+    index = ResourceIndex(AsyncMock(), "g", "v1", "things", "test-ns")
+    for obj in objects:
+        index._apply({"type": "ADDED", "object": obj})
+    index._synced.set()
+    return index
+
+
+def _claim(name: str, conversation_id: str, sandbox_name: str, last_activity: datetime) -> dict:  # type: ignore[type-arg]
+    return {
+        "metadata": {
+            "name": name,
+            "labels": {LABEL_CONVERSATION_ID: conversation_id, LABEL_MANAGED_BY: MANAGED_BY_VALUE},
+            "annotations": {ANNOTATION_LAST_ACTIVITY: last_activity.isoformat()},
+        },
+        "status": {"sandbox": {"name": sandbox_name}},
+    }
+
+
+class TestManagerServesFromIndex:
+    @pytest.mark.asyncio
+    async def test_get_sandbox_uses_index_without_get(self, manager: SandboxManager) -> None:
+        claim_name = manager._claim_name("conv-1")
+        manager._claims = _synced_index([_claim(claim_name, "conv-1", "sb-1", datetime.now(timezone.utc))])
+
+        info = await manager.get_sandbox("conv-1")
+
+        assert info is not None and info.sandbox_name == "sb-1"
+        manager._k8s.get_sandbox_claim.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_sandbox_index_miss_is_answered_from_index(self, manager: SandboxManager) -> None:
+        manager._claims = _synced_index([])
+
+        assert await manager.get_sandbox("conv-unknown") is None
+        manager._k8s.get_sandbox_claim.assert_not_called()
+        manager._k8s.list_sandbox_claims.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_sandbox_falls_back_to_get_until_synced(self, manager: SandboxManager) -> None:
+        manager._claims = ResourceIndex(AsyncMock(), "g", "v1", "things", "test-ns")
+        manager._k8s.get_sandbox_claim = AsyncMock(return_value=None)
+
+        assert await manager.get_sandbox("conv-unknown") is None
+        manager._k8s.get_sandbox_claim.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_reaper_and_admission_skip_list(self, manager: SandboxManager) -> None:
+        old = datetime.now(timezone.utc) - timedelta(seconds=120)
+        manager._claims = _synced_index([_claim("claim-old", "conv-old", "sb-old", old)])
+        manager._k8s.delete_sandbox_claim = AsyncMock()
+
+        assert await manager._count_active_claims() == 1
+        await manager._reap_once()
+
+        manager._k8s.list_sandbox_claims.assert_not_called()
+        manager._k8s.delete_sandbox_claim.assert_awaited_once_with("claim-old", "test-ns")
+
+    @pytest.mark.asyncio
+    async def test_empty_synced_index_serves_reads(self, manager: SandboxManager) -> None:
+        manager._claims = _synced_index([])
+
+        assert await manager._count_active_claims() == 0
+        assert await manager._list_managed_claims() == []
+        manager._k8s.list_sandbox_claims.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_warm_cache_reads_sandbox_readiness_from_index(self, manager: SandboxManager) -> None:
+        manager._claims = _synced_index([_claim("claim-1", "conv-1", "sb-1", datetime.now(timezone.utc))])
+        manager._sandboxes = _synced_index([
+            {"metadata": {"name": "sb-1"}, "status": {"conditions": [{"type": "Ready", "status": "True"}]}},
+        ])
+
+        await manager.warm_cache()
+
+        assert manager._cache.get("conv-1") is not None
+        manager._k8s.get_sandbox.assert_not_called()
+
+    def test_deleted_claim_event_evicts_cache(self, manager: SandboxManager) -> None:
+        info = SandboxInfo(claim_name="claim-1", sandbox_name="sb-1", service_fqdn="sb-1.test-ns.svc.cluster.local")
+        manager._cache.put("conv-1", info)
+
+        manager._on_claim_event("DELETED", _claim("claim-1", "conv-1", "sb-1", datetime.now(timezone.utc)))
+
+        assert manager._cache.get("conv-1") is None
+
+    @pytest.mark.asyncio
+    async def test_create_sandbox_waits_on_shared_watches(self, manager: SandboxManager) -> None:
+        manager._claims = _synced_index([])
+        manager._sandboxes = _synced_index([])
+        claim_name = manager._claim_name("conv-1")
+
+        task = asyncio.create_task(manager.create_sandbox("conv-1"))
+        await asyncio.sleep(0.01)
+        manager._claims._apply({"type": "ADDED", "object": {"metadata": {"name": claim_name}}})
+        manager._claims._apply({"type": "MODIFIED", "object": _claim(claim_name, "conv-1", "sb-1", datetime.now(timezone.utc))})
+        manager._sandboxes._apply({"type": "ADDED", "object": {
+            "metadata": {"name": "sb-1"}, "status": {"conditions": [{"type": "Ready", "status": "True"}]},
+        }})
+        info = await asyncio.wait_for(task, timeout=1.0)
+
+        assert info.sandbox_name == "sb-1"
+        manager._k8s.resolve_sandbox_name.assert_not_called()
+        manager._k8s.wait_for_sandbox_ready.assert_not_called()
@@ -0,0 +1,141 @@
+"""Tests for Lease-based leader election of the reaper."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from kubernetes_asyncio.client import ApiException
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.leader import LeaseElector
+from claude_agent_scheduler.sandbox_manager import SandboxManager
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _lease(holder: str, renew_time: str = "t0", transitions: int = 0, version: str = "1") -> SimpleNamespace:
+    return SimpleNamespace(
+        metadata=SimpleNamespace(resource_version=version),
+        spec=SimpleNamespace(
+            holder_identity=holder, renew_time=renew_time, acquire_time=None,
+            lease_duration_seconds=15, lease_transitions=transitions,
+        ),
+    )
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    clock = _Clock()
+    with patch("claude_agent_scheduler.leader.time.monotonic", clock):
+        yield clock  # type: ignore[misc]
+
+
+@pytest.fixture
+def api() -> AsyncMock:
+    return AsyncMock()
+
+
+def _elector(api: AsyncMock, identity: str = "replica-a") -> LeaseElector:
+    elector = LeaseElector(name="reaper", namespace="ns", identity=identity)
+    elector._api = api
+    return elector
+
+
+class TestLeaseElector:
+    @pytest.mark.asyncio
+    async def test_creates_missing_lease_and_leads(self, api: AsyncMock, clock: _Clock) -> None:
+        api.read_namespaced_lease.side_effect = ApiException(status=404)
+        elector = _elector(api)
+
+        assert await elector.try_acquire_or_renew() is True
+
+        body = api.create_namespaced_lease.await_args.kwargs["body"]
+        assert body["spec"]["holderIdentity"] == "replica-a"
+        assert body["spec"]["renewTime"].endswith("Z")
+        assert elector.is_leader
+
+    @pytest.mark.asyncio
+    async def test_live_holder_is_respected_while_renewing(self, api: AsyncMock, clock: _Clock) -> None:
+        elector = _elector(api)
+        for renewal in range(6):
+            api.read_namespaced_lease.return_value = _lease("replica-b", renew_time=f"t{renewal}")
+            assert await elector.try_acquire_or_renew() is False
+            clock.now += 5
+
+        api.replace_namespaced_lease.assert_not_called()
+        assert not elector.is_leader
+
+    @pytest.mark.asyncio
+    async def test_takes_over_after_holder_stops_renewing(self, api: AsyncMock, clock: _Clock) -> None:
+        api.read_namespaced_lease.return_value = _lease("replica-b", transitions=2, version="7")
+        elector = _elector(api)
+
+        assert await elector.try_acquire_or_renew() is False
+        clock.now += 16
+
+        assert await elector.try_acquire_or_renew() is True
+        body = api.replace_namespaced_lease.await_args.kwargs["body"]
+        assert body["metadata"]["resourceVersion"] == "7"
+        assert body["spec"]["holderIdentity"] == "replica-a"
+        assert body["spec"]["leaseTransitions"] == 3
+
+    @pytest.mark.asyncio
+    async def test_conflict_means_another_replica_won(self, api: AsyncMock, clock: _Clock) -> None:
+        api.read_namespaced_lease.return_value = _lease("")
+        api.replace_namespaced_lease.side_effect = ApiException(status=409)
+        elector = _elector(api)
+
+        assert await elector.try_acquire_or_renew() is False
+        assert not elector.is_leader
+
+    @pytest.mark.asyncio
+    async def test_leadership_lapses_without_renewal(self, api: AsyncMock, clock: _Clock) -> None:
+        api.read_namespaced_lease.return_value = _lease("replica-a")
+        elector = _elector(api)
+        assert await elector.try_acquire_or_renew() is True
+
+        api.read_namespaced_lease.side_effect = ApiException(status=500)
+        with pytest.raises(ApiException):
+            await elector.try_acquire_or_renew()
+        clock.now += 15
+
+        # Stops counting as leader exactly when another replica could take over
+        assert not elector.is_leader
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_held_lease(self, api: AsyncMock, clock: _Clock) -> None:
+        api.read_namespaced_lease.return_value = _lease("replica-a")
+        elector = _elector(api)
+        await elector.try_acquire_or_renew()
+
+        await elector.stop()
+
+        spec = api.replace_namespaced_lease.await_args.kwargs["body"]["spec"]
+        assert spec["holderIdentity"] == ""
+        assert not elector.is_leader
+
+
+class TestReaperGate:
+    @pytest.mark.asyncio
+    async def test_only_leader_reaps(self) -> None:
+        with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+            manager = SandboxManager(config=SchedulerConfig(namespace="test-ns"))
+        manager._reap_once = AsyncMock()  # type: ignore[method-assign]
+        follower = SimpleNamespace(is_leader=False)
+
+        with patch("claude_agent_scheduler.sandbox_manager.asyncio.sleep", AsyncMock(side_effect=[None, None, asyncio.CancelledError])):
+            with pytest.raises(asyncio.CancelledError):
+                await manager.run_reaper(follower)  # type: ignore[arg-type]
+        manager._reap_once.assert_not_called()
+
+        with patch("claude_agent_scheduler.sandbox_manager.asyncio.sleep", AsyncMock(side_effect=[None, asyncio.CancelledError])):
+            with pytest.raises(asyncio.CancelledError):
+                await manager.run_reaper(SimpleNamespace(is_leader=True))  # type: ignore[arg-type]
+        manager._reap_once.assert_awaited_once()
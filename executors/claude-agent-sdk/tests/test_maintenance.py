@@ -0,0 +1,158 @@
+"""Tests for session retention and transcript rotation."""
+
+import asyncio
+import os
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from claude_agent_sdk.types import ResultMessage
+from claude_agent_executor import maintenance, session_index
+from claude_agent_executor.clients import ClientRegistry
+from claude_agent_executor.executor import ClaudeAgentExecutor
+from claude_agent_executor.maintenance import Conversation
+
+
+@pytest.fixture(autouse=True)
+def projects_dir(tmp_path):
+    with patch("claude_agent_executor.maintenance.CLAUDE_PROJECTS_DIR", tmp_path / "projects"):
+        yield tmp_path / "projects"
+
+
+def _conversation(root, conversation_id, size=10, age=0.0):
+    workdir = root / conversation_id
+    workdir.mkdir(parents=True)
+    (workdir / "notes.txt").write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(workdir, (mtime, mtime))
+    return workdir
+
+
+class TestRetention:
+    def test_idle_conversations_expire_then_oldest_past_byte_budget(self):
+        now = time.time()
+        fresh = Conversation("fresh", MagicMock(), bytes=60, last_active=now)
+        older = Conversation("older", MagicMock(), bytes=60, last_active=now - 100)
+        idle = Conversation("idle", MagicMock(), bytes=60, last_active=now - 1000)
+
+        removals = maintenance.expired([fresh, older, idle], now, max_age=500, max_bytes=100)
+
+        assert [(c.conversation_id, reason) for c, reason in removals] == [("idle", "age"), ("older", "size")]
+
+    def test_nothing_expires_without_a_policy(self):
+        now = time.time()
+        idle = Conversation("idle", MagicMock(), bytes=60, last_active=0)
+
+        assert maintenance.expired([idle], now, max_age=0, max_bytes=0) == []
+
+    def test_scan_counts_working_directory_and_transcripts(self, tmp_path, projects_dir):
+        root = tmp_path / "sessions"
+        workdir = _conversation(root, "conv-1", size=10, age=50)
+        maintenance.project_dir(workdir).mkdir(parents=True)
+        (maintenance.project_dir(workdir) / "sess-1.jsonl").write_bytes(b"x" * 5)
+        session_index.write(root, "other", "sess-2")
+
+        conversations = maintenance.scan(root)
+
+        assert [(c.conversation_id, c.bytes) for c in conversations] == [("conv-1", 15)]
+        assert time.time() - conversations[0].last_active == pytest.approx(50, abs=5)
+
+    def test_remove_deletes_workdir_transcripts_and_index(self, tmp_path):
+        root = tmp_path / "sessions"
+        workdir = _conversation(root, "conv-1").resolve()
+        maintenance.project_dir(workdir).mkdir(parents=True)
+        session_index.write(root, "conv-1", "sess-1")
+        [conversation] = maintenance.scan(root)
+
+        maintenance.remove(root, conversation)
+
+        assert not workdir.exists()
+        assert not maintenance.project_dir(workdir).exists()
+        assert session_index.read(root, "conv-1") is None
+
+    @pytest.mark.asyncio
+    async def test_active_conversations_are_kept(self, tmp_path):
+        root = tmp_path / "sessions"
+        _conversation(root, "active", age=1000)
+        _conversation(root, "idle", age=1000)
+
+        with patch("claude_agent_executor.maintenance.SESSION_MAX_AGE", 500):
+            task = asyncio.create_task(maintenance.run_maintenance(root, lambda cid: cid == "active"))
+            for _ in range(100):
+                if not (root / "idle").exists():
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+
+        assert [p.name for p in root.iterdir()] == ["active"]
+
+
+class FakeClient:
+    queries = []
+    options = []
+
+    def __init__(self, options=None):
+        FakeClient.options.append(options)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def query(self, prompt):
+        FakeClient.queries.append(prompt)
+
+    async def receive_response(self):
+        if FakeClient.queries[-1] == maintenance.SUMMARY_PROMPT:
+            yield ResultMessage(session_id="sess-1", result="the summary")
+        else:
+            yield ResultMessage(session_id=f"sess-{len(FakeClient.options)}", result="done")
+
+
+def _request():
+    request = MagicMock()
+    request.conversationId = "conv-1"
+    request.userInput.content = "hello"
+    request.agent.name = "test-agent"
+    request.agent.prompt = ""
+    request.agent.model.name = "claude-sonnet-4-20250514"
+    request.agent.model.config = {"anthropic": {"apiKey": "sk-test"}}
+    request.mcpServers = []
+    return request
+
+
+class TestRotation:
+    @pytest.mark.asyncio
+    async def test_oversized_transcript_moves_to_a_seeded_session(self, tmp_path):
+        FakeClient.queries, FakeClient.options = [], []
+        executor = ClaudeAgentExecutor.__new__(ClaudeAgentExecutor)
+        executor._clients = ClientRegistry(idle_timeout=600, max_clients=4)
+        executor._rotations = set()
+        workdir = _conversation(tmp_path, "conv-1").resolve()
+        transcript = maintenance.project_dir(workdir) / "sess-1.jsonl"
+        transcript.parent.mkdir(parents=True)
+        transcript.write_bytes(b"x" * 100)
+        before = {c.conversation_id: c.bytes for c in maintenance.scan(tmp_path)}
+
+        with patch("claude_agent_executor.executor.SESSIONS_DIR", tmp_path), \
+             patch("claude_agent_executor.executor.ClaudeSDKClient", FakeClient), \
+             patch("claude_agent_executor.maintenance.SESSION_ROTATE_BYTES", 50):
+            await executor.execute_agent(_request())
+            await asyncio.gather(*executor._rotations)
+
+            entry = session_index.read(tmp_path, "conv-1")
+            assert (entry.session_id, entry.summary) == ("", "the summary")
+            assert not transcript.exists()
+            after = {c.conversation_id: c.bytes for c in maintenance.scan(tmp_path)}
+            assert after["conv-1"] == before["conv-1"] - 100
+
+            await executor.execute_agent(_request())
+
+        assert FakeClient.queries[:2] == ["hello", maintenance.SUMMARY_PROMPT]
+        assert FakeClient.queries[2] == maintenance.seeded("the summary", "hello")
+        assert FakeClient.options[1].resume is None
+        assert session_index.read(tmp_path, "conv-1").session_id == "sess-2"
+        executor._maintenance.cancel()
+        await executor._clients.close()
@@ -4,6 +4,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from ark_sdk.executor import MCPServerConfig, Message
+from claude_agent_executor.clients import ClientRegistry
 from claude_agent_executor.executor import ClaudeAgentExecutor
 
 
@@ -131,6 +132,7 @@ class TestExecuteAgentMcpIntegration:
     @pytest.mark.asyncio
     async def test_mcp_servers_passed_to_options(self, tmp_path):
         executor = ClaudeAgentExecutor.__new__(ClaudeAgentExecutor)
+        executor._clients = ClientRegistry()
 
         request = MagicMock()
         request.conversationId = "test-conv"
@@ -173,6 +175,7 @@ class TestExecuteAgentMcpIntegration:
     @pytest.mark.asyncio
     async def test_no_mcp_servers_no_extra_options(self, tmp_path):
         executor = ClaudeAgentExecutor.__new__(ClaudeAgentExecutor)
+        executor._clients = ClientRegistry()
 
         request = MagicMock()
         request.conversationId = "test-conv-2"
@@ -215,6 +218,7 @@ class TestExecuteAgentPrompt:
     @pytest.mark.asyncio
     async def test_prompt_passed_as_system_prompt_append(self, tmp_path):
         executor = ClaudeAgentExecutor.__new__(ClaudeAgentExecutor)
+        executor._clients = ClientRegistry()
 
         request = MagicMock()
         request.conversationId = "test-conv-prompt"
@@ -258,6 +262,7 @@ class TestExecuteAgentPrompt:
     @pytest.mark.asyncio
     async def test_empty_prompt_no_system_prompt(self, tmp_path):
         executor = ClaudeAgentExecutor.__new__(ClaudeAgentExecutor)
+        executor._clients = ClientRegistry()
 
         request = MagicMock()
         request.conversationId = "test-conv-no-prompt"
@@ -0,0 +1,59 @@
+"""Tests for the scheduler Prometheus metrics and /metrics endpoint."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from claude_agent_scheduler import metrics
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.proxy import create_proxy_app
+from claude_agent_scheduler.sandbox_manager import SandboxCache, SandboxInfo, SandboxManager
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestCacheLookups:
+    def test_hit_miss_and_expiry_counted(self) -> None:
+        before = {r: _sample("scheduler_sandbox_cache_lookups_total", result=r) for r in ("hit", "miss", "expired")}
+        cache = SandboxCache(ttl=0.01)
+        cache.put("conv-1", SandboxInfo("claim", "sb", "sb.ns.svc.cluster.local"))
+
+        cache.get("conv-1")
+        cache.get("conv-2")
+        time.sleep(0.02)
+        cache.get("conv-1")
+
+        for result in ("hit", "miss", "expired"):
+            assert _sample("scheduler_sandbox_cache_lookups_total", result=result) == before[result] + 1
+
+
+class TestObservePhase:
+    def test_error_outcome_recorded(self) -> None:
+        labels = {"phase": "test_phase", "outcome": "error"}
+        before = _sample("scheduler_sandbox_provision_phase_seconds_count", **labels)
+
+        with pytest.raises(RuntimeError), metrics.observe_phase("test_phase"):
+            raise RuntimeError("boom")
+
+        assert _sample("scheduler_sandbox_provision_phase_seconds_count", **labels) == before + 1
+
+
+class TestMetricsEndpoint:
+    def test_exposition_format(self) -> None:
+        manager = MagicMock(spec=SandboxManager)
+        manager._config = SchedulerConfig(namespace="test-ns")
+        manager.update_last_activity = AsyncMock()
+        client = TestClient(create_proxy_app(sandbox_manager=manager, http_client=httpx.AsyncClient()))
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "scheduler_sandbox_cache_lookups_total" in response.text
+        assert "scheduler_k8s_api_calls_total" in response.text
@@ -0,0 +1,131 @@
+"""Tests for pod-IP routing and connection warm-up for newly ready sandboxes."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.proxy import warm_connection
+from claude_agent_scheduler.sandbox_manager import LABEL_CONVERSATION_ID, SandboxInfo, SandboxManager
+
+
+def _sandbox(name: str, pod_ip: str = "10.1.2.3", ready: bool = True) -> dict:  # type: ignore[type-arg]
+    return {
+        "metadata": {"name": name},
+        "status": {"conditions": [{"type": "Ready", "status": str(ready)}], "podIPs": [pod_ip] if pod_ip else []},
+    }
+
+
+def _claim(name: str, sandbox: str, conversation_id: str = "conv-1") -> dict:  # type: ignore[type-arg]
+    return {
+        "metadata": {"name": name, "labels": {LABEL_CONVERSATION_ID: conversation_id}},
+        "status": {"sandbox": {"name": sandbox}},
+    }
+
+
+def _index(*objects: dict) -> ResourceIndex:  # type: ignore[type-arg]
+    index = ResourceIndex(AsyncMock(), "g", "v1", "things", "test-ns")
+    for obj in objects:
+        index._apply({"type": "ADDED", "object": obj})
+    index._synced.set()
+    return index
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(namespace="test-ns", pod_ip_routing=True, sandbox_ready_timeout=5)
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config, connection_warmer=AsyncMock())
+        mgr._k8s = AsyncMock()
+        return mgr
+
+
+class TestSandboxInfoAddress:
+    def test_defaults_to_service_fqdn(self) -> None:
+        info = SandboxInfo(claim_name="c", sandbox_name="sb", service_fqdn="sb.ns.svc.cluster.local")
+        assert info.address == "sb.ns.svc.cluster.local"
+
+    def test_ipv6_pod_ip_is_bracketed(self) -> None:
+        info = SandboxInfo(claim_name="c", sandbox_name="sb", service_fqdn="sb.ns.svc.cluster.local", pod_ip="fd00::5")
+        assert info.address == "[fd00::5]"
+
+
+class TestPodIpRouting:
+    @pytest.mark.asyncio
+    async def test_lookup_routes_to_pod_ip_from_sandbox_status(self, manager: SandboxManager) -> None:
+        claim_name = manager._claim_name("conv-1")
+        manager._claims, manager._sandboxes = _index(_claim(claim_name, "sb-1")), _index(_sandbox("sb-1"))
+
+        info = await manager.get_sandbox("conv-1")
+
+        assert info is not None and info.address == "10.1.2.3"
+
+    @pytest.mark.asyncio
+    async def test_disabled_routes_to_service_fqdn(self, manager: SandboxManager) -> None:
+        manager._config.pod_ip_routing = False
+        claim_name = manager._claim_name("conv-1")
+        manager._claims, manager._sandboxes = _index(_claim(claim_name, "sb-1")), _index(_sandbox("sb-1"))
+
+        info = await manager.get_sandbox("conv-1")
+
+        assert info is not None and info.address == "sb-1.test-ns.svc.cluster.local"
+
+    @pytest.mark.asyncio
+    async def test_pod_ip_change_invalidates_cached_route(self, manager: SandboxManager) -> None:
+        claim_name = manager._claim_name("conv-1")
+        sandboxes = _index()
+        sandboxes.add_handler(manager._on_sandbox_event)
+        sandboxes._apply({"type": "ADDED", "object": _sandbox("sb-1")})
+        manager._claims, manager._sandboxes = _index(_claim(claim_name, "sb-1")), sandboxes
+        assert (await manager.get_sandbox("conv-1")).address == "10.1.2.3"  # type: ignore[union-attr]
+
+        sandboxes._apply({"type": "MODIFIED", "object": _sandbox("sb-1", pod_ip="10.9.9.9")})
+
+        assert manager._cache.get("conv-1") is None
+        assert (await manager.get_sandbox("conv-1")).address == "10.9.9.9"  # type: ignore[union-attr]
+
+    @pytest.mark.asyncio
+    async def test_status_update_with_same_ip_keeps_cache(self, manager: SandboxManager) -> None:
+        sandboxes = _index()
+        sandboxes.add_handler(manager._on_sandbox_event)
+        sandboxes._apply({"type": "ADDED", "object": _sandbox("sb-1")})
+        info = SandboxInfo(claim_name="c", sandbox_name="sb-1", service_fqdn="f", pod_ip="10.1.2.3")
+        manager._cache.put("conv-1", info)
+
+        sandboxes._apply({"type": "MODIFIED", "object": _sandbox("sb-1")})
+
+        assert manager._cache.get("conv-1") is info
+
+
+class TestConnectionWarmup:
+    @pytest.mark.asyncio
+    async def test_new_sandbox_is_warmed_at_its_pod_ip(self, manager: SandboxManager) -> None:
+        claims, sandboxes = _index(), _index(_sandbox("sb-new"))
+        manager._claims, manager._sandboxes = claims, sandboxes
+
+        async def create_claim(name: str, **kwargs: object) -> None:
+            claims._apply({"type": "ADDED", "object": _claim(name, "sb-new")})
+
+        manager._k8s.create_sandbox_claim = AsyncMock(side_effect=create_claim)
+
+        info = await manager.create_sandbox("conv-1")
+        await asyncio.gather(*manager._warming)
+
+        manager._connection_warmer.assert_awaited_once_with(info)  # type: ignore[union-attr]
+        assert info.pod_ip == "10.1.2.3"
+
+    @pytest.mark.asyncio
+    async def test_warm_connection_requests_health_and_tolerates_failure(self) -> None:
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            raise httpx.ConnectError("refused")
+
+        info = SandboxInfo(claim_name="c", sandbox_name="sb", service_fqdn="f", pod_ip="10.1.2.3")
+        await warm_connection(httpx.AsyncClient(transport=httpx.MockTransport(handler)), info)
+
+        assert str(seen[0].url) == "http://10.1.2.3:8000/health"
@@ -125,7 +125,7 @@ class TestProxyQueryStatus:
         sandbox_manager.create_sandbox = AsyncMock(return_value=sandbox_info)
 
         mock_http = AsyncMock(spec=httpx.AsyncClient)
-        mock_http.request = AsyncMock(
+        mock_http.send = AsyncMock(
             return_value=httpx.Response(200, content=b'{"ok":true}', headers={"content-type": "application/json"}),
         )
 
@@ -155,7 +155,7 @@ class TestProxyQueryStatus:
         sandbox_manager.get_sandbox = AsyncMock(return_value=sandbox_info)
 
         mock_http = AsyncMock(spec=httpx.AsyncClient)
-        mock_http.request = AsyncMock(
+        mock_http.send = AsyncMock(
             return_value=httpx.Response(200, content=b'{"ok":true}', headers={"content-type": "application/json"}),
         )
 
@@ -184,7 +184,7 @@ class TestProxyQueryStatus:
         sandbox_manager.create_sandbox = AsyncMock(return_value=sandbox_info)
 
         mock_http = AsyncMock(spec=httpx.AsyncClient)
-        mock_http.request = AsyncMock(
+        mock_http.send = AsyncMock(
             return_value=httpx.Response(200, content=b'{"ok":true}', headers={"content-type": "application/json"}),
         )
 
@@ -233,7 +233,7 @@ class TestProxyPassThrough:
 
         error_body = json.dumps({"error": {"code": -32000, "message": "Agent CRD not found"}})
         mock_http_client = AsyncMock(spec=httpx.AsyncClient)
-        mock_http_client.request = AsyncMock(
+        mock_http_client.send = AsyncMock(
             return_value=httpx.Response(
                 400,
                 content=error_body.encode(),
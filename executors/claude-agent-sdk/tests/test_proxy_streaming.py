@@ -0,0 +1,194 @@
+"""Tests for streaming passthrough and incremental contextId injection in the proxy."""
+
+import asyncio
+import json
+import uuid
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.proxy import _relay_sse, create_proxy_app
+from claude_agent_scheduler.sandbox_manager import SandboxInfo, SandboxManager
+
+
+def _sse(payload: dict) -> bytes:  # type: ignore[type-arg]
+    return b"data: " + json.dumps(payload).encode() + b"\n\n"
+
+
+def _message_event(text: str) -> dict:  # type: ignore[type-arg]
+    return {"jsonrpc": "2.0", "id": "1", "result": {"message": {"role": "agent", "parts": [{"text": text}]}}}
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+class TestRelaySse:
+    @pytest.mark.asyncio
+    async def test_injects_context_id_per_event(self) -> None:
+        stream = _chunks(_sse(_message_event("a")), _sse(_message_event("b")))
+
+        events = [e async for e in _relay_sse(stream, "ctx-1")]
+
+        assert len(events) == 2
+        for event in events:
+            assert event.startswith(b"data: ") and event.endswith(b"\n\n")
+            assert json.loads(event[6:])["result"]["message"]["contextId"] == "ctx-1"
+
+    @pytest.mark.asyncio
+    async def test_event_split_across_chunks_is_reassembled(self) -> None:
+        raw = _sse(_message_event("split"))
+        stream = _chunks(raw[:10], raw[10:25], raw[25:])
+
+        events = [e async for e in _relay_sse(stream, "ctx-1")]
+
+        assert len(events) == 1
+        assert json.loads(events[0][6:])["result"]["message"]["contextId"] == "ctx-1"
+
+    @pytest.mark.asyncio
+    async def test_events_without_message_forwarded_byte_for_byte(self) -> None:
+        raw = b"event: status\r\ndata: {\"result\": {\"status\": {\"state\": \"working\"}}}\r\n\r\n: keep-alive\r\n\r\n"
+
+        events = [e async for e in _relay_sse(_chunks(raw), "ctx-1")]
+
+        assert b"".join(events) == raw
+
+    @pytest.mark.asyncio
+    async def test_multi_line_data_keeps_every_line_prefixed_and_field_order(self) -> None:
+        pretty = json.dumps(_message_event("multi"), indent=2).encode()
+        data = b"\n".join(b"data: " + line for line in pretty.split(b"\n"))
+        raw = b"event: message\n" + data + b"\nid: 7\n\n"
+
+        [event] = [e async for e in _relay_sse(_chunks(raw), "ctx-1")]
+
+        lines = event.removesuffix(b"\n\n").split(b"\n")
+        assert lines[0] == b"event: message" and lines[-1] == b"id: 7"
+        assert all(line.startswith(b"data: ") for line in lines[1:-1])
+        payload = json.loads(b"\n".join(line[6:] for line in lines[1:-1]))
+        assert payload["result"]["message"]["contextId"] == "ctx-1"
+
+    @pytest.mark.asyncio
+    async def test_events_are_yielded_before_upstream_finishes(self) -> None:
+        release = asyncio.Event()
+
+        async def slow_upstream() -> AsyncIterator[bytes]:
+            yield _sse(_message_event("first"))
+            await release.wait()
+            yield _sse(_message_event("second"))
+
+        relay = _relay_sse(slow_upstream(), "ctx-1")
+        first = await asyncio.wait_for(relay.__anext__(), timeout=1.0)
+
+        assert b"first" in first
+        release.set()
+        rest = [e async for e in relay]
+        assert len(rest) == 1
+
+
+class _SlowStream(httpx.AsyncByteStream):
+    def __init__(self, *parts: bytes) -> None:
+        self._parts = parts
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for part in self._parts:
+            yield part
+
+
+@pytest.fixture
+def sandbox_manager() -> MagicMock:
+    manager = MagicMock(spec=SandboxManager)
+    manager._config = SchedulerConfig(namespace="test-ns")
+    manager.update_last_activity = AsyncMock()
+    manager.get_sandbox = AsyncMock(return_value=SandboxInfo(
+        claim_name="claim-1", sandbox_name="sb-1", service_fqdn="sb-1.test-ns.svc.cluster.local",
+    ))
+    return manager
+
+
+class TestStreamingProxy:
+    def test_sse_response_streamed_with_context_id(self, sandbox_manager: MagicMock) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                stream=_SlowStream(_sse(_message_event("hel")), _sse(_message_event("lo"))),
+            )
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client = TestClient(create_proxy_app(sandbox_manager=sandbox_manager, http_client=http_client))
+        context_id = str(uuid.uuid4())
+
+        with client.stream("POST", "/", json={
+            "jsonrpc": "2.0", "id": "1", "method": "message/stream",
+            "params": {"message": {"contextId": context_id, "role": "user"}},
+        }) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            payloads = [json.loads(line[6:]) for line in response.iter_lines() if line.startswith("data: ")]
+
+        assert [p["result"]["message"]["parts"][0]["text"] for p in payloads] == ["hel", "lo"]
+        assert all(p["result"]["message"]["contextId"] == context_id for p in payloads)
+
+    def test_json_response_gets_context_id(self, sandbox_manager: MagicMock) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                headers={"content-type": "application/json"},
+                stream=_SlowStream(json.dumps(_message_event("done")).encode()),
+            )
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client = TestClient(create_proxy_app(sandbox_manager=sandbox_manager, http_client=http_client))
+        context_id = str(uuid.uuid4())
+
+        response = client.post("/", json={
+            "jsonrpc": "2.0", "id": "1", "method": "message/send",
+            "params": {"message": {"contextId": context_id, "role": "user"}},
+        })
+
+        assert response.status_code == 200
+        assert response.json()["result"]["message"]["contextId"] == context_id
+
+    @pytest.mark.asyncio
+    async def test_upstream_closed_when_client_leaves_before_the_body(self, sandbox_manager: MagicMock) -> None:
+        class _TrackedStream(_SlowStream):
+            closed = False
+
+            async def aclose(self) -> None:
+                _TrackedStream.closed = True
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, stream=_TrackedStream(_sse(_message_event("hi"))),
+            )
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=http_client)
+        body = json.dumps({
+            "jsonrpc": "2.0", "id": "1", "method": "message/stream",
+            "params": {"message": {"contextId": str(uuid.uuid4()), "role": "user"}},
+        }).encode()
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive() -> dict:  # type: ignore[type-arg]
+            return requests.pop() if requests else {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:  # type: ignore[type-arg]
+            # The client is gone by the time the response starts
+            raise OSError("connection reset")
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+            "headers": [(b"content-type", b"application/json")], "client": ("127.0.0.1", 1), "server": ("s", 80),
+        }
+        with pytest.raises(ClientDisconnect):
+            await app(scope, receive, send)
+
+        assert _TrackedStream.closed
@@ -0,0 +1,167 @@
+"""Tests for idempotent replay of retried message/send requests."""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.proxy import create_proxy_app
+from claude_agent_scheduler.replay import IDEMPOTENCY_HEADER, REPLAYED_HEADER, BufferedResponse, ReplayCache
+from claude_agent_scheduler.sandbox_manager import SandboxInfo, SandboxManager
+
+SANDBOX = SandboxInfo(claim_name="claim-1", sandbox_name="sb-1", service_fqdn="sb-1.test-ns.svc.cluster.local")
+
+
+def _send(context_id: str = "", text: str = "hi") -> dict:  # type: ignore[type-arg]
+    message = {"role": "user", "messageId": "m1", "parts": [{"kind": "text", "text": text}]}
+    if context_id:
+        message["contextId"] = context_id
+    return {"jsonrpc": "2.0", "id": "1", "method": "message/send", "params": {"message": message}}
+
+
+@pytest.fixture
+def sandbox_manager() -> MagicMock:
+    manager = MagicMock(spec=SandboxManager)
+    manager._config = SchedulerConfig(namespace="test-ns")
+    manager.get_sandbox = AsyncMock(return_value=SANDBOX)
+    manager.create_sandbox = AsyncMock(return_value=SANDBOX)
+    manager.update_last_activity = AsyncMock()
+    return manager
+
+
+class _Upstream:
+    """Sandbox stand-in that counts forwarded turns and can hold them until released."""
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+        self._status_code = status_code
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await self.release.wait()
+        return httpx.Response(
+            self._status_code, json={"jsonrpc": "2.0", "id": "1", "result": {"kind": "message", "n": self.calls}},
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def _client(app: object) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler")  # type: ignore[arg-type]
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_retry_during_turn_shares_the_upstream_call(self, sandbox_manager: MagicMock) -> None:
+        upstream = _Upstream()
+        upstream.release.clear()
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream.client())
+        request = _send(str(uuid.uuid4()))
+
+        async with _client(app) as client:
+            first = asyncio.create_task(client.post("/", json=request))
+            await asyncio.sleep(0.05)
+            retry = asyncio.create_task(client.post("/", json=request))
+            await asyncio.sleep(0.05)
+            upstream.release.set()
+            responses = await asyncio.gather(first, retry)
+
+        assert upstream.calls == 1
+        assert responses[0].json() == responses[1].json()
+        assert REPLAYED_HEADER not in responses[0].headers
+        assert responses[1].headers[REPLAYED_HEADER] == "true"
+
+    @pytest.mark.asyncio
+    async def test_retry_after_completion_is_replayed(self, sandbox_manager: MagicMock) -> None:
+        upstream = _Upstream()
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream.client())
+        request = _send(str(uuid.uuid4()))
+
+        async with _client(app) as client:
+            first = await client.post("/", json=request)
+            retry = await client.post("/", json=request)
+
+        assert upstream.calls == 1
+        assert retry.json() == first.json()
+        assert retry.headers[REPLAYED_HEADER] == "true"
+
+    @pytest.mark.asyncio
+    async def test_new_message_reusing_the_id_is_forwarded(self, sandbox_manager: MagicMock) -> None:
+        upstream = _Upstream()
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream.client())
+        context_id = str(uuid.uuid4())
+
+        async with _client(app) as client:
+            await client.post("/", json=_send(context_id, "hi"))
+            await client.post("/", json=_send(context_id, "and then?"))
+
+        assert upstream.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_new_conversation_needs_an_idempotency_key(self, sandbox_manager: MagicMock) -> None:
+        upstream = _Upstream()
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream.client())
+
+        async with _client(app) as client:
+            await client.post("/", json=_send())
+            await client.post("/", json=_send())
+            assert upstream.calls == 2
+
+            first = await client.post("/", json=_send(), headers={IDEMPOTENCY_HEADER: "retry-me"})
+            retry = await client.post("/", json=_send(), headers={IDEMPOTENCY_HEADER: "retry-me"})
+
+        assert upstream.calls == 3
+        assert retry.json() == first.json()
+
+    @pytest.mark.asyncio
+    async def test_failed_response_is_not_replayed(self, sandbox_manager: MagicMock) -> None:
+        upstream = _Upstream(status_code=500)
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream.client())
+        request = _send(str(uuid.uuid4()))
+
+        async with _client(app) as client:
+            await client.post("/", json=request)
+            await client.post("/", json=request)
+
+        assert upstream.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_forwards_every_retry(self, sandbox_manager: MagicMock) -> None:
+        sandbox_manager._config.replay_ttl = 0
+        upstream = _Upstream()
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream.client())
+        request = _send(str(uuid.uuid4()))
+
+        async with _client(app) as client:
+            await client.post("/", json=request)
+            await client.post("/", json=request)
+
+        assert upstream.calls == 2
+
+
+class TestReplayCache:
+    @pytest.mark.asyncio
+    async def test_oldest_entries_dropped_over_byte_budget(self) -> None:
+        cache = ReplayCache(SchedulerConfig(replay_cache_bytes=10))
+        for key in ("a", "b", "c"):
+            await cache.do(key, AsyncMock(return_value=BufferedResponse(200, b"12345")))
+
+        assert cache._get("a") is None
+        assert cache._get("b") is not None and cache._get("c") is not None
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self) -> None:
+        config = SchedulerConfig(replay_ttl=60)
+        cache = ReplayCache(config)
+        await cache.do("a", AsyncMock(return_value=BufferedResponse(200, b"{}")))
+
+        config.replay_ttl = 0
+
+        assert cache._get("a") is None
+        assert cache._bytes == 0
@@ -14,6 +14,26 @@ class TestSchedulerConfigDefaults:
         assert config.sandbox_template == "claude-agent-sdk"
         assert config.namespace == "default"
         assert config.max_active_sandboxes == 0
+        assert config.activity_flush_interval == 60
+        assert config.admission_queue_size == 0
+        assert config.capacity_eviction is False
+        assert config.eviction_protected_agents == []
+        assert config.claim_pool_size == 0
+        assert config.async_provisioning is False
+        assert config.async_task_ttl == 3600
+        assert config.turn_queue_size == 8
+        assert config.turn_queue_policy == "Reject"
+        assert config.turn_lease is False
+        assert config.pod_ip_routing is False
+        assert config.connection_warmup is True
+        assert config.drain_timeout == 600
+        assert config.sandbox_templates == []
+        assert config.health_check_interval == 0
+        assert config.health_check_timeout == 2.0
+        assert config.health_check_failure_threshold == 3
+        assert config.response_header_timeout == 30
+        assert config.replay_ttl == 300
+        assert config.replay_cache_bytes == 64 * 1024 * 1024
 
 
 class TestSchedulerConfigFromYaml:
@@ -25,6 +45,24 @@ sandboxReadyTimeout: 120
 sandboxTemplate: claude-agent-sdk-large
 namespace: my-namespace
 maxActiveSandboxes: 50
+activityFlushInterval: 120
+admissionQueueSize: 50
+admissionQueueTimeout: 20
+claimPoolSize: 3
+turnQueueSize: 2
+turnQueuePolicy: DropOldest
+turnLease: true
+podIPRouting: true
+drainTimeout: 120
+healthCheckInterval: 15
+healthCheckFailureThreshold: 2
+responseHeaderTimeout: 10
+replayTTL: 60
+replayCacheBytes: 1048576
+sandboxTemplates:
+  - name: claude-agent-sdk-xl
+    agents: [coder]
+    maxActiveSandboxes: 5
 """
         config = SchedulerConfig.from_yaml(yaml_str)
         assert config.session_idle_ttl == 3600
@@ -33,6 +71,22 @@ maxActiveSandboxes: 50
         assert config.sandbox_template == "claude-agent-sdk-large"
         assert config.namespace == "my-namespace"
         assert config.max_active_sandboxes == 50
+        assert config.activity_flush_interval == 120
+        assert config.admission_queue_size == 50
+        assert config.admission_queue_timeout == 20
+        assert config.claim_pool_size == 3
+        assert config.turn_queue_size == 2
+        assert config.turn_queue_policy == "DropOldest"
+        assert config.turn_lease is True
+        assert config.pod_ip_routing is True
+        assert config.drain_timeout == 120
+        assert config.health_check_interval == 15
+        assert config.health_check_failure_threshold == 2
+        assert config.response_header_timeout == 10
+        assert config.replay_ttl == 60
+        assert config.replay_cache_bytes == 1048576
+        assert config.sandbox_templates[0].name == "claude-agent-sdk-xl"
+        assert config.sandbox_templates[0].max_active_sandboxes == 5
 
     def test_partial_config_uses_defaults(self) -> None:
         yaml_str = "sessionIdleTTL: 900\n"
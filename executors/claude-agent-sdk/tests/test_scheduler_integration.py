@@ -38,7 +38,7 @@ class TestEndToEndA2ARoundTrip:
         }
 
         mock_http_client = AsyncMock(spec=httpx.AsyncClient)
-        mock_http_client.request = AsyncMock(
+        mock_http_client.send = AsyncMock(
             return_value=httpx.Response(200, content=json.dumps(a2a_response).encode(), headers={"content-type": "application/json"})
         )
 
@@ -65,7 +65,7 @@ class TestEndToEndA2ARoundTrip:
         a2a_response = {"jsonrpc": "2.0", "id": "2", "result": {"artifacts": [{"parts": [{"text": "Follow-up"}]}]}}
 
         mock_http_client = AsyncMock(spec=httpx.AsyncClient)
-        mock_http_client.request = AsyncMock(
+        mock_http_client.send = AsyncMock(
             return_value=httpx.Response(200, content=json.dumps(a2a_response).encode(), headers={"content-type": "application/json"})
         )
 
@@ -95,7 +95,7 @@ class TestEndToEndA2ARoundTrip:
         a2a_response = {"jsonrpc": "2.0", "id": "1", "result": {}}
 
         mock_http_client = AsyncMock(spec=httpx.AsyncClient)
-        mock_http_client.request = AsyncMock(
+        mock_http_client.send = AsyncMock(
             return_value=httpx.Response(200, content=json.dumps(a2a_response).encode(), headers={"content-type": "application/json"})
         )
 
@@ -0,0 +1,122 @@
+"""Tests for the per-conversation session index used to resume Claude sessions."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from claude_agent_sdk.types import ResultMessage
+from claude_agent_executor import session_index
+from claude_agent_executor.clients import ClientRegistry
+from claude_agent_executor.executor import ClaudeAgentExecutor
+
+
+def _request(conversation_id="conv-1"):
+    request = MagicMock()
+    request.conversationId = conversation_id
+    request.userInput.content = "hello"
+    request.agent.name = "test-agent"
+    request.agent.prompt = ""
+    request.agent.model.name = "claude-sonnet-4-20250514"
+    request.agent.model.config = {"anthropic": {"apiKey": "sk-test"}}
+    request.mcpServers = []
+    return request
+
+
+def _session(session_id):
+    session = MagicMock()
+    session.session_id = session_id
+    return session
+
+
+class FakeClient:
+    options = []
+    session_id = "sess-new"
+    fail = False
+
+    def __init__(self, options=None):
+        FakeClient.options.append(options)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def query(self, prompt):
+        if FakeClient.fail:
+            raise RuntimeError("session not found")
+
+    async def receive_response(self):
+        yield ResultMessage(session_id=FakeClient.session_id, result="done")
+
+
+@pytest.fixture
+def executor(tmp_path):
+    FakeClient.options, FakeClient.session_id, FakeClient.fail = [], "sess-new", False
+    executor = ClaudeAgentExecutor.__new__(ClaudeAgentExecutor)
+    executor._clients = ClientRegistry(idle_timeout=0)
+    with patch("claude_agent_executor.executor.SESSIONS_DIR", tmp_path), \
+         patch("claude_agent_executor.executor.ClaudeSDKClient", FakeClient):
+        yield executor
+
+
+class TestSessionIndex:
+    def test_write_then_read(self, tmp_path):
+        session_index.write(tmp_path, "conv-1", "sess-1")
+        session_index.record_turn(tmp_path, "conv-1", "sess-2")
+
+        entry = session_index.read(tmp_path, "conv-1")
+
+        assert entry.session_id == "sess-2"
+        assert entry.turns == 1
+        assert entry.updated_at > 0
+        assert [p.name for p in (tmp_path / session_index.INDEX_DIR).iterdir()] == ["conv-1.json"]
+
+    def test_unreadable_entry_is_ignored(self, tmp_path):
+        (tmp_path / session_index.INDEX_DIR).mkdir()
+        (tmp_path / session_index.INDEX_DIR / "conv-1.json").write_text("{not json")
+
+        assert session_index.read(tmp_path, "conv-1") is None
+        assert session_index.read(tmp_path, "conv-2") is None
+
+
+class TestExecutorResume:
+    @pytest.mark.asyncio
+    async def test_turn_records_its_session(self, executor, tmp_path):
+        await executor.execute_agent(_request())
+
+        assert session_index.read(tmp_path, "conv-1").session_id == "sess-new"
+
+    @pytest.mark.asyncio
+    async def test_resume_uses_the_index_without_scanning(self, executor, tmp_path):
+        (tmp_path / "conv-1").mkdir()
+        session_index.write(tmp_path, "conv-1", "sess-indexed")
+        list_sessions = MagicMock(return_value=[_session("sess-scanned")])
+
+        with patch("claude_agent_executor.executor.list_sessions", list_sessions):
+            await executor.execute_agent(_request())
+
+        assert FakeClient.options[0].resume == "sess-indexed"
+        list_sessions.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_entry_is_repaired_from_a_scan(self, executor, tmp_path):
+        (tmp_path / "conv-1").mkdir()
+        FakeClient.fail = True
+
+        with patch("claude_agent_executor.executor.list_sessions", return_value=[_session("sess-scanned")]), \
+             pytest.raises(RuntimeError):
+            await executor.execute_agent(_request())
+
+        assert FakeClient.options[0].resume == "sess-scanned"
+        assert session_index.read(tmp_path, "conv-1").session_id == "sess-scanned"
+
+    @pytest.mark.asyncio
+    async def test_failed_resume_from_the_index_forgets_it(self, executor, tmp_path):
+        (tmp_path / "conv-1").mkdir()
+        session_index.write(tmp_path, "conv-1", "sess-stale")
+        FakeClient.fail = True
+
+        with pytest.raises(RuntimeError):
+            await executor.execute_agent(_request())
+
+        assert session_index.read(tmp_path, "conv-1") is None
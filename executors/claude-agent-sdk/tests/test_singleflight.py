@@ -0,0 +1,119 @@
+"""Tests for single-flight coalescing of per-conversation sandbox lookups and provisioning."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.sandbox_manager import SandboxManager
+from claude_agent_scheduler.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self) -> None:
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work() -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        waiters = [asyncio.create_task(flights.do("k", work)) for _ in range(10)]
+        await asyncio.sleep(0)
+        assert flights.in_flight("k")
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["result"] * 10
+        assert calls == 1
+        assert not flights.in_flight("k")
+
+    @pytest.mark.asyncio
+    async def test_exception_shared_by_all_waiters(self) -> None:
+        flights = SingleFlight()
+
+        async def work() -> None:
+            await asyncio.sleep(0)
+            raise TimeoutError("not ready")
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(r, TimeoutError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_work(self) -> None:
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flights.do("k", work))
+        second = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
+
+    @pytest.mark.asyncio
+    async def test_new_call_after_completion_runs_again(self) -> None:
+        flights = SingleFlight()
+        work = AsyncMock(return_value=1)
+
+        await flights.do("k", work)
+        await flights.do("k", work)
+
+        assert work.await_count == 2
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(namespace="test-ns", sandbox_ready_timeout=5)
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config)
+        mgr._k8s = AsyncMock()
+        return mgr
+
+
+class TestManagerCoalescing:
+    @pytest.mark.asyncio
+    async def test_concurrent_creates_provision_once(self, manager: SandboxManager) -> None:
+        async def slow_resolve(**kwargs: object) -> str:
+            await asyncio.sleep(0.01)
+            return "sb-1"
+
+        manager._k8s.resolve_sandbox_name = AsyncMock(side_effect=slow_resolve)
+
+        infos = await asyncio.gather(*(manager.create_sandbox("conv-1") for _ in range(20)))
+
+        assert {i.sandbox_name for i in infos} == {"sb-1"}
+        manager._k8s.create_sandbox_claim.assert_awaited_once()
+        manager._k8s.resolve_sandbox_name.assert_awaited_once()
+        manager._k8s.wait_for_sandbox_ready.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_issue_one_get(self, manager: SandboxManager) -> None:
+        async def slow_get(name: str, namespace: str) -> dict:  # type: ignore[type-arg]
+            await asyncio.sleep(0.01)
+            return {"metadata": {"name": name}, "status": {"sandbox": {"name": "sb-1"}}}
+
+        manager._k8s.get_sandbox_claim = AsyncMock(side_effect=slow_get)
+
+        infos = await asyncio.gather(*(manager.get_sandbox("conv-1") for _ in range(20)))
+
+        assert all(i is not None and i.sandbox_name == "sb-1" for i in infos)
+        manager._k8s.get_sandbox_claim.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_different_conversations_are_not_coalesced(self, manager: SandboxManager) -> None:
+        manager._k8s.resolve_sandbox_name = AsyncMock(return_value="sb")
+
+        await asyncio.gather(manager.create_sandbox("conv-a"), manager.create_sandbox("conv-b"))
+
+        assert manager._k8s.create_sandbox_claim.await_count == 2
@@ -3,7 +3,9 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from claude_agent_sdk.types import AssistantMessage, TextBlock, ThinkingBlock
+from claude_agent_sdk.types import (
+    AssistantMessage, StreamEvent, TextBlock, ThinkingBlock, ToolResultBlock, ToolUseBlock, UserMessage,
+)
 from ark_sdk.executor import Message
 from claude_agent_executor.executor import ClaudeAgentExecutor
 
@@ -32,6 +34,11 @@ def _make_assistant_message(*texts):
     )
 
 
+def _text_delta(text):
+    event = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}}
+    return StreamEvent(uuid="u", session_id="s", event=event)
+
+
 def _make_result_message(result="final answer"):
     msg = MagicMock()
     msg.result = result
@@ -177,3 +184,84 @@ class TestStreaming:
             await executor.execute_agent(_request())
 
         assert chunks == []
+
+
+class TestPartialMessages:
+    @pytest.mark.asyncio
+    async def test_text_deltas_streamed_once(self, tmp_path):
+        executor = ClaudeAgentExecutor()
+        chunks = []
+        captured = {}
+
+        async def capture_chunk(text):
+            chunks.append(text)
+
+        executor.stream_chunk = capture_chunk
+
+        class FakeClient:
+            def __init__(self, options=None):
+                captured["options"] = options
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                pass
+
+            async def query(self, prompt):
+                pass
+
+            async def receive_response(self):
+                yield StreamEvent(uuid="u", session_id="s", event={"type": "message_start"})
+                yield _text_delta("Hel")
+                yield _text_delta("lo")
+                yield _make_assistant_message("Hello")
+                yield _make_result_message("Hello")
+
+        with patch("claude_agent_executor.executor.SESSIONS_DIR", tmp_path), \
+             patch("claude_agent_executor.executor.ClaudeSDKClient", FakeClient):
+            result = await executor.execute_agent(_request())
+
+        assert captured["options"].include_partial_messages is True
+        assert chunks == ["Hel", "lo"]
+        assert result == [Message(role="assistant", content="Hello", name="test-agent")]
+
+    @pytest.mark.asyncio
+    async def test_tool_progress_streamed_when_enabled(self, tmp_path):
+        executor = ClaudeAgentExecutor()
+        chunks = []
+
+        async def capture_chunk(text):
+            chunks.append(text)
+
+        executor.stream_chunk = capture_chunk
+
+        class FakeClient:
+            def __init__(self, options=None):
+                pass
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                pass
+
+            async def query(self, prompt):
+                pass
+
+            async def receive_response(self):
+                yield AssistantMessage(
+                    content=[ToolUseBlock(id="t1", name="Bash", input={"command": "ls"})],
+                    model="claude-sonnet-4-20250514",
+                )
+                yield UserMessage(content=[ToolResultBlock(tool_use_id="t1", content="a.txt")])
+                yield _text_delta("Done")
+                yield _make_assistant_message("Done")
+                yield _make_result_message("Done")
+
+        with patch("claude_agent_executor.executor.SESSIONS_DIR", tmp_path), \
+             patch("claude_agent_executor.executor.ClaudeSDKClient", FakeClient), \
+             patch("claude_agent_executor.executor.STREAM_TOOL_PROGRESS", True):
+            await executor.execute_agent(_request())
+
+        assert chunks == ["\n[Bash started]\n", "[Bash finished]\n", "Done"]
@@ -0,0 +1,135 @@
+"""Tests for workload-aware SandboxTemplate selection and per-template admission."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from ark_sdk.extensions.query import QueryRef
+
+from claude_agent_scheduler.config import SandboxTemplateRule, SchedulerConfig
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.pool import LABEL_POOL
+from claude_agent_scheduler.sandbox_manager import SandboxCapacityError, SandboxManager
+from claude_agent_scheduler.templates import TEMPLATE_HINT_KEY, select_template, template_hint
+
+LARGE = SandboxTemplateRule(name="large", agents=["coder"], max_active_sandboxes=1)
+GPU = SandboxTemplateRule(name="gpu", query_annotations={"workload": "gpu"})
+HINT_ONLY = SandboxTemplateRule(name="tiny")
+
+
+def _config(**overrides: object) -> SchedulerConfig:
+    return SchedulerConfig(sandbox_templates=[LARGE, GPU, HINT_ONLY], **overrides)  # type: ignore[arg-type]
+
+
+class TestSelectTemplate:
+    def test_no_match_uses_default(self) -> None:
+        assert select_template(_config(), agent="helper") == "claude-agent-sdk"
+
+    def test_agent_rule(self) -> None:
+        assert select_template(_config(), agent="coder") == "large"
+
+    def test_query_annotation_rule(self) -> None:
+        assert select_template(_config(), annotations={"workload": "gpu", "other": "x"}) == "gpu"
+
+    def test_all_criteria_must_match(self) -> None:
+        config = SchedulerConfig(sandbox_templates=[
+            SandboxTemplateRule(name="both", agents=["coder"], query_annotations={"workload": "gpu"}),
+        ])
+
+        assert select_template(config, agent="coder") == "claude-agent-sdk"
+        assert select_template(config, agent="coder", annotations={"workload": "gpu"}) == "both"
+
+    def test_hint_selects_configured_template_only(self) -> None:
+        assert select_template(_config(), agent="coder", hint="tiny") == "tiny"
+        assert select_template(_config(), hint="claude-agent-sdk") == "claude-agent-sdk"
+        assert select_template(_config(), agent="coder", hint="someone-elses-template") == "large"
+
+    def test_hint_read_from_message_metadata(self) -> None:
+        assert template_hint({"metadata": {TEMPLATE_HINT_KEY: "tiny"}}) == "tiny"
+        assert template_hint({"metadata": {TEMPLATE_HINT_KEY: 3}}) == ""
+        assert template_hint(None) == ""
+
+    def test_rules_parse_from_camel_case_yaml(self) -> None:
+        config = SchedulerConfig.from_yaml(
+            "sandboxTemplates:\n"
+            "  - name: large\n"
+            "    agents: [coder]\n"
+            "    queryAnnotations: {workload: heavy}\n"
+            "    maxActiveSandboxes: 4\n"
+        )
+
+        [rule] = config.sandbox_templates
+        assert rule.query_annotations == {"workload": "heavy"}
+        assert rule.max_active_sandboxes == 4
+
+
+def _claim(name: str, template: str, pooled: bool = False) -> dict:  # type: ignore[type-arg]
+    labels = {LABEL_POOL: "true"} if pooled else {}
+    return {"metadata": {"name": name, "labels": labels}, "spec": {"sandboxTemplateRef": {"name": template}}}
+
+
+def _index(*claims: dict) -> ResourceIndex:  # type: ignore[type-arg]
+    index = ResourceIndex(AsyncMock(), "g", "v1", "sandboxclaims", "test-ns")
+    for claim in claims:
+        index._apply({"type": "ADDED", "object": claim})
+    index._synced.set()
+    return index
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=_config(namespace="test-ns", sandbox_ready_timeout=5))
+        mgr._k8s = AsyncMock()
+        mgr._k8s.get_query = AsyncMock(return_value={"spec": {"target": {"type": "agent", "name": "coder"}}})
+        mgr._resolve_sandbox_name = AsyncMock(return_value="sb-1")  # type: ignore[method-assign]
+        mgr._wait_for_sandbox_ready = AsyncMock()  # type: ignore[method-assign]
+        return mgr
+
+
+class TestManagerTemplates:
+    @pytest.mark.asyncio
+    async def test_claim_created_from_selected_template(self, manager: SandboxManager) -> None:
+        manager._claims = _index()
+
+        await manager.create_sandbox("conv-1", query_ref=QueryRef(name="q", namespace="team-a"))
+
+        assert manager._k8s.create_sandbox_claim.await_args.kwargs["template"] == "large"
+
+    @pytest.mark.asyncio
+    async def test_template_limit_counts_only_its_own_claims(self, manager: SandboxManager) -> None:
+        manager._claims = _index(_claim("default-1", "claude-agent-sdk"), _claim("large-1", "large"))
+
+        with pytest.raises(SandboxCapacityError, match="template 'large'"):
+            await manager.create_sandbox("conv-1", query_ref=QueryRef(name="q", namespace="team-a"))
+
+        # Other templates are not held back by the large template's limit
+        await manager.create_sandbox("conv-2", template_hint="tiny")
+        assert manager._k8s.create_sandbox_claim.await_args.kwargs["template"] == "tiny"
+
+    @pytest.mark.asyncio
+    async def test_template_limit_is_hot_reloaded(self, manager: SandboxManager) -> None:
+        manager._claims = _index(_claim("large-1", "large"))
+        query_ref = QueryRef(name="q", namespace="team-a")
+        with pytest.raises(SandboxCapacityError):
+            await manager.create_sandbox("conv-1", query_ref=query_ref)
+
+        manager._config.sandbox_templates = [LARGE.model_copy(update={"max_active_sandboxes": 2}), GPU, HINT_ONLY]
+
+        await manager.create_sandbox("conv-1", query_ref=query_ref)
+
+    @pytest.mark.asyncio
+    async def test_pooled_claims_do_not_count_against_a_template(self, manager: SandboxManager) -> None:
+        manager._config.sandbox_templates = [SandboxTemplateRule(name="claude-agent-sdk", max_active_sandboxes=1)]
+        manager._claims = _index(_claim("pool-1", "claude-agent-sdk", pooled=True))
+
+        await manager.create_sandbox("conv-1")
+
+        manager._k8s.create_sandbox_claim.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_recovery_recreates_from_the_same_template(self, manager: SandboxManager) -> None:
+        manager._k8s.get_sandbox_claim = AsyncMock(return_value=_claim("old", "tiny"))
+
+        await manager.recover_sandbox("conv-1")
+
+        assert manager._k8s.create_sandbox_claim.await_args.kwargs["template"] == "tiny"
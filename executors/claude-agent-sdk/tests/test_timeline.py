@@ -0,0 +1,144 @@
+"""Tests for provisioning timelines — phase recording, the claim annotation and /debug/sandboxes."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.proxy import create_proxy_app
+from claude_agent_scheduler.sandbox_manager import LABEL_CONVERSATION_ID, SandboxManager
+from claude_agent_scheduler.timeline import (
+    ANNOTATION_TIMELINE,
+    ProvisioningTimelines,
+    decode,
+    encode,
+    phase_durations,
+)
+
+
+class TestTimeline:
+    def test_durations_run_from_phase_to_phase(self) -> None:
+        timeline = {"requested": 100.0, "claim_created": 100.5, "sandbox_resolved": 102.0, "ready": 110.0,
+                    "first_forward": 110.25}
+
+        assert phase_durations(timeline) == {
+            "claim_created": 0.5, "sandbox_resolved": 1.5, "ready": 8.0, "first_forward": 0.25, "total": 10.25,
+        }
+
+    def test_annotation_round_trip(self) -> None:
+        timeline = {"requested": 1700000000.0, "bound": 1700000000.125, "first_forward": 1700000000.5}
+
+        assert decode(encode(timeline)) == timeline
+        assert list(json.loads(encode(timeline))) == ["requested", "bound", "first_forward"]
+
+    def test_unreadable_annotation_is_empty(self) -> None:
+        assert decode("") == {}
+        assert decode("not json") == {}
+        assert decode('{"requested": "yesterday"}') == {}
+
+    def test_summary_reports_percentiles_of_finished_timelines(self) -> None:
+        timelines = ProvisioningTimelines()
+        for i in range(10):
+            timelines.start(f"c{i}")
+            timelines._open[f"c{i}"] = {"requested": 0.0, "ready": float(i + 1)}
+            timelines.finish(f"c{i}")
+        timelines.start("still-provisioning")
+
+        summary = timelines.summary()
+
+        assert summary["count"] == 10
+        assert summary["phases"]["ready"] == {"count": 10, "p50": 5.0, "p90": 9.0, "p99": 10.0}
+
+    def test_finish_without_open_timeline_is_noop(self) -> None:
+        timelines = ProvisioningTimelines()
+
+        assert timelines.finish("resumed") is None
+        assert timelines.summary()["count"] == 0
+
+
+def _index(*objects: dict) -> ResourceIndex:  # type: ignore[type-arg]
+    index = ResourceIndex(AsyncMock(), "g", "v1", "things", "test-ns")
+    for obj in objects:
+        index._apply({"type": "ADDED", "object": obj})
+    index._synced.set()
+    return index
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(namespace="test-ns", sandbox_ready_timeout=5)
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config)
+        mgr._k8s = AsyncMock()
+        mgr._activity._k8s = mgr._k8s
+        return mgr
+
+
+class TestManagerTimeline:
+    @pytest.mark.asyncio
+    async def test_cold_start_records_every_phase_on_the_claim(self, manager: SandboxManager) -> None:
+        claim_name = manager._claim_name("conv-1")
+        manager._claims = _index({"metadata": {"name": claim_name}, "status": {"sandbox": {"name": "sb-1"}}})
+        manager._sandboxes = _index({
+            "metadata": {"name": "sb-1"},
+            "status": {"conditions": [{"type": "Ready", "status": "True"}], "podIPs": ["10.1.2.3"]},
+        })
+
+        info = await manager.create_sandbox("conv-1")
+        manager.record_forwarded("conv-1")
+        await manager._activity.flush()
+
+        name, _, annotations = manager._k8s.patch_claim_annotation.await_args.args
+        assert name == info.claim_name
+        timeline = decode(annotations[ANNOTATION_TIMELINE])
+        assert list(timeline) == [
+            "requested", "claim_created", "sandbox_resolved", "pod_scheduled", "ready", "first_forward",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_provisioning_leaves_no_timeline(self, manager: SandboxManager) -> None:
+        manager._resolve_sandbox_name = AsyncMock(side_effect=TimeoutError("no sandbox"))  # type: ignore[method-assign]
+
+        with pytest.raises(TimeoutError):
+            await manager.create_sandbox("conv-1")
+
+        assert manager._timelines.get("conv-1") is None
+
+    @pytest.mark.asyncio
+    async def test_describe_lists_live_mappings(self, manager: SandboxManager) -> None:
+        timeline = {"requested": 1700000000.0, "claim_created": 1700000001.0, "first_forward": 1700000003.0}
+        claim = {
+            "metadata": {
+                "name": "claim-1",
+                "labels": {LABEL_CONVERSATION_ID: "conv-1"},
+                "annotations": {ANNOTATION_TIMELINE: encode(timeline)},
+            },
+            "status": {"sandbox": {"name": "sb-1"}},
+        }
+        pooled = {"metadata": {"name": "pooled-1", "labels": {}}}
+        manager._claims = _index(claim, pooled)
+
+        described = await manager.describe_sandboxes()
+
+        [entry] = described["sandboxes"]
+        assert entry["conversationId"] == "conv-1" and entry["sandbox"] == "sb-1"
+        assert entry["phaseSeconds"] == {"claim_created": 1.0, "first_forward": 2.0, "total": 3.0}
+        assert "provisioning" in described
+
+
+class TestDebugEndpoint:
+    @pytest.mark.asyncio
+    async def test_serves_manager_description(self) -> None:
+        sandbox_manager = MagicMock(spec=SandboxManager)
+        sandbox_manager._config = SchedulerConfig(namespace="test-ns")
+        sandbox_manager.describe_sandboxes = AsyncMock(return_value={"sandboxes": [], "provisioning": {"count": 0}})
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=AsyncMock())
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            response = await client.get("/debug/sandboxes")
+
+        assert response.status_code == 200
+        assert response.json()["provisioning"] == {"count": 0}
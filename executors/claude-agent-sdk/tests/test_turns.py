@@ -0,0 +1,251 @@
+"""Tests for per-conversation turn serialization — local queue, claim lease and proxy wiring."""
+
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from kubernetes_asyncio.client import ApiException
+
+from claude_agent_scheduler.config import SchedulerConfig
+from claude_agent_scheduler.informer import ResourceIndex
+from claude_agent_scheduler.proxy import create_proxy_app
+from claude_agent_scheduler.sandbox_manager import ANNOTATION_TURN, SandboxInfo, SandboxManager
+from claude_agent_scheduler.turns import TurnCoordinator, TurnRejectedError
+
+CONTEXT_ID = str(uuid.uuid4())
+SANDBOX = SandboxInfo(claim_name="claim-1", sandbox_name="sb-1", service_fqdn="sb-1.test-ns.svc.cluster.local")
+
+
+def _coordinator(**overrides: object) -> TurnCoordinator:
+    return TurnCoordinator(SchedulerConfig(**overrides), lease=AsyncMock())  # type: ignore[arg-type]
+
+
+class TestLocalQueue:
+    @pytest.mark.asyncio
+    async def test_turns_are_admitted_in_arrival_order(self) -> None:
+        turns = _coordinator()
+        first = await turns.acquire("c")
+        assert turns.in_flight("c") and not turns.in_flight("other")
+        order: list[str] = []
+
+        async def wait(name: str) -> None:
+            turn = await turns.acquire("c")
+            order.append(name)
+            await turn.release()
+
+        waiting = [asyncio.create_task(wait("second")), asyncio.create_task(wait("third"))]
+        await asyncio.sleep(0)
+        assert turns.queue_depth == 2 and order == []
+
+        await first.release()
+        await asyncio.gather(*waiting)
+
+        assert order == ["second", "third"]
+        assert turns.queue_depth == 0 and not turns.in_flight("c")
+
+    @pytest.mark.asyncio
+    async def test_other_conversations_do_not_wait(self) -> None:
+        turns = _coordinator(turn_queue_size=0)
+        await turns.acquire("a")
+
+        turn = await asyncio.wait_for(turns.acquire("b"), timeout=1.0)
+
+        assert turn.conversation_id == "b"
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_new_message(self) -> None:
+        turns = _coordinator(turn_queue_size=0)
+        await turns.acquire("c")
+
+        with pytest.raises(TurnRejectedError) as exc_info:
+            await turns.acquire("c")
+
+        assert exc_info.value.reason == "queue_full"
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_supersedes_longest_waiting(self) -> None:
+        turns = _coordinator(turn_queue_size=1, turn_queue_policy="DropOldest")
+        first = await turns.acquire("c")
+        oldest = asyncio.create_task(turns.acquire("c"))
+        await asyncio.sleep(0)
+
+        newest = asyncio.create_task(turns.acquire("c"))
+        await asyncio.sleep(0)
+        with pytest.raises(TurnRejectedError) as exc_info:
+            await oldest
+        assert exc_info.value.reason == "superseded"
+
+        await first.release()
+        assert (await newest).conversation_id == "c"
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self) -> None:
+        turns = _coordinator(turn_queue_timeout=0)
+        await turns.acquire("c")
+
+        with pytest.raises(TurnRejectedError) as exc_info:
+            await turns.acquire("c")
+
+        assert exc_info.value.reason == "timeout"
+        assert turns.queue_depth == 0
+
+
+def _claim(lease: dict | None = None) -> dict:  # type: ignore[type-arg]
+    annotations = {ANNOTATION_TURN: json.dumps(lease)} if lease else {}
+    return {"metadata": {"name": "claim-1", "resourceVersion": "rv-1", "annotations": annotations}}
+
+
+@pytest.fixture
+def manager() -> SandboxManager:
+    config = SchedulerConfig(namespace="test-ns")
+    with patch("claude_agent_scheduler.sandbox_manager._AsyncK8sHelper"):
+        mgr = SandboxManager(config=config)
+        mgr._k8s = AsyncMock()
+        mgr._claim_name_of = lambda conversation_id: "claim-1"  # type: ignore[method-assign]
+        return mgr
+
+
+def _attach(manager: SandboxManager, claim: dict) -> ResourceIndex:  # type: ignore[type-arg]
+    index = ResourceIndex(AsyncMock(), "g", "v1", "things", "test-ns")
+    index._apply({"type": "ADDED", "object": claim})
+    index._synced.set()
+    manager._claims = index
+    return index
+
+
+class TestClaimLease:
+    @pytest.mark.asyncio
+    async def test_free_claim_is_taken_with_resource_version_precondition(self, manager: SandboxManager) -> None:
+        _attach(manager, _claim())
+
+        assert await manager.acquire_turn_lease("c", "replica-a/1", timeout=1.0)
+
+        name, _, annotations = manager._k8s.patch_claim_annotation.await_args.args
+        assert name == "claim-1"
+        assert json.loads(annotations[ANNOTATION_TURN])["holder"] == "replica-a/1"
+        assert manager._k8s.patch_claim_annotation.await_args.kwargs["resource_version"] == "rv-1"
+
+    @pytest.mark.asyncio
+    async def test_lease_held_elsewhere_waits_then_gives_up(self, manager: SandboxManager) -> None:
+        _attach(manager, _claim({"holder": "replica-b/1", "expires": time.time() + 60}))
+
+        assert not await manager.acquire_turn_lease("c", "replica-a/1", timeout=0.05)
+
+        manager._k8s.patch_claim_annotation.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_release_by_other_replica_wakes_waiter(self, manager: SandboxManager) -> None:
+        index = _attach(manager, _claim({"holder": "replica-b/1", "expires": time.time() + 60}))
+        waiting = asyncio.create_task(manager.acquire_turn_lease("c", "replica-a/1", timeout=5.0))
+        await asyncio.sleep(0)
+
+        released = _claim()
+        released["metadata"]["resourceVersion"] = "rv-2"
+        index._apply({"type": "MODIFIED", "object": released})
+
+        assert await waiting
+        assert manager._k8s.patch_claim_annotation.await_args.kwargs["resource_version"] == "rv-2"
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_taken_over(self, manager: SandboxManager) -> None:
+        _attach(manager, _claim({"holder": "replica-b/1", "expires": time.time() - 1}))
+
+        assert await manager.acquire_turn_lease("c", "replica-a/1", timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_lost_race_rereads_claim(self, manager: SandboxManager) -> None:
+        _attach(manager, _claim())
+        manager._k8s.patch_claim_annotation = AsyncMock(side_effect=ApiException(status=409))
+        manager._k8s.get_sandbox_claim = AsyncMock(
+            return_value=_claim({"holder": "replica-b/1", "expires": time.time() + 60}),
+        )
+
+        assert not await manager.acquire_turn_lease("c", "replica-a/1", timeout=0)
+
+        manager._k8s.patch_claim_annotation.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_release_only_removes_own_lease(self, manager: SandboxManager) -> None:
+        _attach(manager, _claim({"holder": "replica-b/1", "expires": time.time() + 60}))
+
+        await manager.release_turn_lease("c", "replica-a/1")
+        manager._k8s.patch_claim_annotation.assert_not_called()
+
+        await manager.release_turn_lease("c", "replica-b/1")
+        assert manager._k8s.patch_claim_annotation.await_args.args[2] == {ANNOTATION_TURN: None}
+
+
+def _send(text: str) -> dict:  # type: ignore[type-arg]
+    message = {"role": "user", "messageId": text, "contextId": CONTEXT_ID, "parts": [{"kind": "text", "text": text}]}
+    return {"jsonrpc": "2.0", "id": text, "method": "message/send", "params": {"message": message}}
+
+
+class TestProxySerialization:
+    @pytest.fixture
+    def sandbox_manager(self) -> MagicMock:
+        manager = MagicMock(spec=SandboxManager)
+        manager._config = SchedulerConfig(namespace="test-ns")
+        manager.get_sandbox = AsyncMock(return_value=SANDBOX)
+        manager.update_last_activity = AsyncMock()
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_second_message_forwarded_after_first_response(self, sandbox_manager: MagicMock) -> None:
+        in_flight, peak = 0, 0
+        finish_first = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            if json.loads(request.content)["id"] == "first":
+                await finish_first.wait()
+            in_flight -= 1
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": "x", "result": {"kind": "message"}})
+
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            first = asyncio.create_task(client.post("/", json=_send("first")))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(client.post("/", json=_send("second")))
+            await asyncio.sleep(0.05)
+            assert not second.done()
+
+            finish_first.set()
+            responses = await asyncio.gather(first, second)
+
+        assert [r.status_code for r in responses] == [200, 200]
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_busy_conversation_rejected_with_429(self, sandbox_manager: MagicMock) -> None:
+        sandbox_manager._config.turn_queue_size = 0
+        finish_first = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await finish_first.wait()
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": "x", "result": {"kind": "message"}})
+
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        app = create_proxy_app(sandbox_manager=sandbox_manager, http_client=upstream)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://scheduler") as client:
+            first = asyncio.create_task(client.post("/", json=_send("first")))
+            await asyncio.sleep(0.05)
+            rejected = await client.post("/", json=_send("second"))
+            finish_first.set()
+            await first
+
+            # The turn is free again once the first response has been relayed
+            accepted = await client.post("/", json=_send("third"))
+
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "5"
+        assert rejected.json()["error"]["code"] == -32000
+        assert accepted.status_code == 200
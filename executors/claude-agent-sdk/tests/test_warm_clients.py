@@ -0,0 +1,201 @@
+"""Tests for keeping a connected ClaudeSDKClient warm per conversation between turns."""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from claude_agent_executor.app import ClaudeAgentExecutorApp
+from claude_agent_executor.clients import ClientRegistry, default_max_clients
+from claude_agent_executor.executor import ClaudeAgentExecutor
+
+
+def _model_config(name="claude-sonnet-4-20250514", api_key="sk-test"):
+    model = MagicMock()
+    model.name = name
+    model.config = {"anthropic": {"apiKey": api_key}}
+    return model
+
+
+def _request(conversation_id="conv-1", user_input="hello", model=None):
+    request = MagicMock()
+    request.conversationId = conversation_id
+    request.userInput.content = user_input
+    request.agent.name = "test-agent"
+    request.agent.prompt = ""
+    request.agent.model = model or _model_config()
+    request.mcpServers = []
+    return request
+
+
+class FakeClient:
+    """Records every client connected, disconnected and queried."""
+
+    connected = []
+    disconnected = []
+    fail_next_query = False
+
+    def __init__(self, options=None):
+        self.options = options
+        self.queries = []
+
+    async def __aenter__(self):
+        FakeClient.connected.append(self)
+        return self
+
+    async def __aexit__(self, *args):
+        FakeClient.disconnected.append(self)
+
+    async def query(self, prompt):
+        if FakeClient.fail_next_query:
+            FakeClient.fail_next_query = False
+            raise ConnectionError("CLI exited")
+        self.queries.append(prompt)
+
+    async def receive_response(self):
+        msg = MagicMock()
+        msg.result = "done"
+        yield msg
+
+
+@pytest.fixture(autouse=True)
+def fake_client(tmp_path):
+    FakeClient.connected, FakeClient.disconnected, FakeClient.fail_next_query = [], [], False
+    with patch("claude_agent_executor.executor.SESSIONS_DIR", tmp_path), \
+         patch("claude_agent_executor.executor.ClaudeSDKClient", FakeClient):
+        yield
+
+
+def _executor(**kwargs):
+    executor = ClaudeAgentExecutor.__new__(ClaudeAgentExecutor)
+    executor._clients = ClientRegistry(**{"idle_timeout": 600, "max_clients": 4, **kwargs})
+    return executor
+
+
+class TestWarmClients:
+    @pytest.mark.asyncio
+    async def test_follow_up_turn_reuses_the_client(self):
+        executor = _executor()
+
+        await executor.execute_agent(_request(user_input="first"))
+        await executor.execute_agent(_request(user_input="second"))
+
+        assert len(FakeClient.connected) == 1
+        assert FakeClient.connected[0].queries == ["first", "second"]
+        assert FakeClient.disconnected == []
+        await executor._clients.close()
+
+    @pytest.mark.asyncio
+    async def test_changed_model_replaces_the_client(self):
+        executor = _executor()
+
+        await executor.execute_agent(_request())
+        await executor.execute_agent(_request(model=_model_config(name="claude-opus-4-20250514")))
+
+        assert len(FakeClient.connected) == 2
+        assert FakeClient.disconnected == [FakeClient.connected[0]]
+        assert FakeClient.connected[1].options.model == "claude-opus-4-20250514"
+        await executor._clients.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_turn_discards_the_client(self):
+        executor = _executor()
+        FakeClient.fail_next_query = True
+
+        with pytest.raises(ConnectionError):
+            await executor.execute_agent(_request())
+        await executor.execute_agent(_request())
+
+        assert len(FakeClient.connected) == 2
+        assert FakeClient.disconnected == [FakeClient.connected[0]]
+        await executor._clients.close()
+
+    @pytest.mark.asyncio
+    async def test_dead_warm_client_is_reconnected(self):
+        executor = _executor()
+        await executor.execute_agent(_request(user_input="first"))
+        FakeClient.fail_next_query = True
+
+        result = await executor.execute_agent(_request(user_input="second"))
+
+        assert result[0].content == "done"
+        assert len(FakeClient.connected) == 2
+        assert FakeClient.connected[1].queries == ["second"]
+        await executor._clients.close()
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_client_evicted_over_cap(self):
+        executor = _executor(max_clients=2)
+
+        for conversation_id in ("a", "b", "a", "c"):
+            await executor.execute_agent(_request(conversation_id=conversation_id))
+
+        assert len(executor._clients) == 2
+        assert [c.options.cwd.rsplit("/", 1)[-1] for c in FakeClient.disconnected] == ["b"]
+        await executor._clients.close()
+
+    @pytest.mark.asyncio
+    async def test_idle_client_disconnected(self):
+        executor = _executor()
+        await executor.execute_agent(_request())
+        executor._clients._clients["conv-1"].last_used = time.monotonic() - 601
+
+        await executor._clients._evict_idle()
+
+        assert len(executor._clients) == 0
+        assert FakeClient.disconnected == FakeClient.connected
+        await executor._clients.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_connects_per_turn(self):
+        executor = _executor(idle_timeout=0)
+
+        await executor.execute_agent(_request())
+        await executor.execute_agent(_request())
+
+        assert len(FakeClient.connected) == 2
+        assert FakeClient.disconnected == FakeClient.connected
+
+
+class TestLifespan:
+    @pytest.mark.asyncio
+    async def test_shutdown_disconnects_clients_and_stops_maintenance(self):
+        executor = ClaudeAgentExecutor()
+        executor._clients = ClientRegistry(idle_timeout=600, max_clients=4)
+        app = ClaudeAgentExecutorApp(executor, "ClaudeAgentSDK").build()
+        messages = asyncio.Queue()
+        sent = []
+        started = asyncio.Event()
+
+        async def send(message):
+            sent.append(message["type"])
+            started.set()
+
+        lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, messages.get, send))
+        await messages.put({"type": "lifespan.startup"})
+        await started.wait()
+        with patch("claude_agent_executor.maintenance.SESSION_MAINTENANCE_INTERVAL", 600):
+            await executor.execute_agent(_request())
+        maintenance_task = executor._maintenance
+        await messages.put({"type": "lifespan.shutdown"})
+        await lifespan
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        assert len(FakeClient.connected) == 1
+        assert FakeClient.disconnected == FakeClient.connected
+        assert maintenance_task.cancelled()
+
+
+class TestDefaultMaxClients:
+    def test_configured_value_wins(self, monkeypatch):
+        monkeypatch.setenv("MAX_WARM_CLIENTS", "3")
+
+        assert default_max_clients() == 3
+
+    def test_derived_from_memory_limit(self, monkeypatch):
+        monkeypatch.delenv("MAX_WARM_CLIENTS", raising=False)
+
+        with patch("claude_agent_executor.clients._memory_limit", return_value=4 * 1024 ** 3), \
+             patch("claude_agent_executor.clients.WARM_CLIENT_MEMORY_MB", 512):
+            assert default_max_clients() == 7